@@ -1,10 +1,16 @@
 from collections import OrderedDict
+from ctypes import POINTER, c_double, c_float, c_int, c_long
+from hashlib import sha1
+import json
+import os
 import sys
 
 import numpy as np
 import click
 
-from devito import clear_cache, configuration, mode_develop, mode_benchmark, warning
+from devito import (Eq, Function, Grid, Operator, clear_cache, configuration,
+                    mode_develop, mode_benchmark, info, warning)
+from devito.compiler import jit_compile, load
 from devito.tools import as_tuple, sweep
 from examples.seismic.acoustic.acoustic_example import run as acoustic_run, acoustic_setup
 from examples.seismic.tti.tti_example import run as tti_run, tti_setup
@@ -21,7 +27,8 @@ def benchmark():
     bench: complete benchmark with multiple DSE/DLE levels
     test: tests numerical correctness with different parameters
 
-    Further, this script can generate a roofline plot from a benchmark
+    Further, this script can measure the machine ceilings (`ceilings`) and
+    generate a roofline plot from a benchmark
     """
     pass
 
@@ -204,12 +211,14 @@ def bench(problem, **kwargs):
 @click.option('-r', '--resultsdir', default='results',
               help='Directory containing results')
 @click.option('--max-bw', type=float,
-              help='Max GB/s of the DRAM')
+              help='Max GB/s of the DRAM. Defaults to the bandwidth measured '
+                   'through `ceilings`, if available')
 @click.option('--flop-ceil', type=(float, str), multiple=True,
               help='Max GFLOPS/s of the CPU. A 2-tuple (float, str)'
                    'is expected, where the float is the performance'
                    'ceil (GFLOPS/s) and the str indicates how the'
-                   'ceil was obtained (ideal peak, linpack, ...)')
+                   'ceil was obtained (ideal peak, linpack, ...). Defaults '
+                   'to the peak measured through `ceilings`, if available')
 @click.option('--point-runtime', is_flag=True, default=True,
               help='Annotate points with runtime values')
 def cli_plot(problem, **kwargs):
@@ -230,6 +239,17 @@ def plot(problem, **kwargs):
     point_runtime = kwargs.pop('point_runtime')
 
     arch = kwargs['arch']
+
+    # Unless provided, use the measured machine ceilings
+    if max_bw is None or not flop_ceils:
+        ceilings = load_ceilings(resultsdir, arch)
+        if ceilings is None:
+            warning("No machine ceilings available for `%s`; run `ceilings` first, "
+                    "or provide `--max-bw` and `--flop-ceil`" % arch)
+            sys.exit(0)
+        max_bw = max_bw or ceilings['bandwidth']
+        flop_ceils = flop_ceils or [(ceilings['flops'], 'FMA peak')]
+
     space_order = "[%s]" % ",".join(str(i) for i in kwargs['space_order'])
     time_order = kwargs['time_order']
     shape = "[%s]" % ",".join(str(i) for i in kwargs['shape'])
@@ -310,6 +330,147 @@ def plot(problem, **kwargs):
                            oi_annotate=oi_annotate, point_annotate=point_annotate)
 
 
+@benchmark.command(name='ceilings')
+@click.option('-r', '--resultsdir', default='results',
+              help='Directory where the ceilings are stored')
+@click.option('--arch', default=None,
+              help='Name under which the ceilings are stored. Defaults to the '
+                   'target platform')
+@click.option('-n', '--size', default=2**26,
+              help='Number of items of each array of the bandwidth kernel')
+@click.option('-x', '--repeats', default=10,
+              help='Number of repetitions of each kernel')
+def cli_ceilings(**kwargs):
+    """
+    Measure the machine ceilings for roofline plots.
+    """
+    mode_benchmark()
+    ceilings(**kwargs)
+
+
+def ceilings(resultsdir, arch, size, repeats):
+    """
+    Measure the machine ceilings for roofline plots, that is the sustainable
+    memory bandwidth and the peak flop rate, and store them in ``resultsdir``.
+    """
+    arch = arch or str(configuration['platform'])
+
+    bandwidth = measure_bandwidth(size, repeats)
+    info("Memory bandwidth (STREAM triad): %.2f GB/s" % bandwidth)
+
+    flops = measure_flops(repeats)
+    info("Peak performance (FMA): %.2f GFlops/s" % flops)
+
+    filename = os.path.join(resultsdir, 'ceilings.json')
+    try:
+        with open(filename) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        data = {}
+    data[arch] = {'bandwidth': bandwidth, 'flops': flops}
+    os.makedirs(resultsdir, exist_ok=True)
+    with open(filename, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def load_ceilings(resultsdir, arch):
+    """
+    Return the machine ceilings stored in ``resultsdir`` for ``arch``, falling
+    back to those of the target platform. Return None if unavailable.
+    """
+    try:
+        with open(os.path.join(resultsdir, 'ceilings.json')) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    return data.get(arch, data.get(str(configuration['platform'])))
+
+
+def measure_bandwidth(size, repeats):
+    """
+    Measure the sustainable memory bandwidth, in GB/s, through a STREAM-like
+    triad generated by a Devito Operator. As in STREAM, the write-allocate
+    traffic isn't accounted for.
+    """
+    grid = Grid(shape=(size,), dtype=np.float64)
+    a, b, c = [Function(name=i, grid=grid, space_order=0) for i in 'abc']
+    b.data[:] = 1.
+    c.data[:] = 2.
+
+    op = Operator(Eq(a, b + 3.*c), dse='noop', name='Triad')
+    time = min(sum(op.apply().timings.values()) for _ in range(repeats))
+
+    return 3*size*np.dtype(grid.dtype).itemsize/time/10**9
+
+
+fmapeak_template = """\
+#include <time.h>
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+
+double fmapeak(const long niters, float * out, int * nthreads)
+{
+  struct timespec start, end;
+  clock_gettime(CLOCK_MONOTONIC, &start);
+  #pragma omp parallel
+  {
+    float acc[%(nchains)d][%(nlanes)d];
+    for (int j = 0; j < %(nchains)d; j++)
+      for (int k = 0; k < %(nlanes)d; k++)
+        acc[j][k] = (float) (j + k);
+    const float a = 0.999999F, b = 0.000001F;
+    for (long i = 0; i < niters; i++)
+      for (int j = 0; j < %(nchains)d; j++)
+        #pragma omp simd
+        for (int k = 0; k < %(nlanes)d; k++)
+          acc[j][k] = acc[j][k]*a + b;
+    float sum = 0.F;
+    for (int j = 0; j < %(nchains)d; j++)
+      for (int k = 0; k < %(nlanes)d; k++)
+        sum += acc[j][k];
+    #pragma omp atomic
+    *out += sum;
+    #pragma omp atomic
+    *nthreads += 1;
+  }
+  clock_gettime(CLOCK_MONOTONIC, &end);
+  return (end.tv_sec - start.tv_sec) + 1e-9*(end.tv_nsec - start.tv_nsec);
+}
+"""
+"""
+A kernel performing independent chains of fused multiply-adds. There are
+enough chains to hide the FMA latency, while each chain spans a few SIMD
+registers.
+"""
+
+
+def measure_flops(repeats, nchains=8, nlanes=16):
+    """
+    Measure the peak single-precision flop rate, in GFlops/s, through a kernel
+    performing independent fused multiply-adds, JIT-compiled by Devito.
+    """
+    compiler = configuration['compiler']
+    code = fmapeak_template % {'nchains': nchains, 'nlanes': nlanes}
+    soname = 'fmapeak_%s' % sha1((code + str(compiler)).encode()).hexdigest()
+    jit_compile(soname, code, compiler)
+    kernel = load(soname).fmapeak
+    kernel.argtypes = [c_long, POINTER(c_float), POINTER(c_int)]
+    kernel.restype = c_double
+
+    def run(niters):
+        out, nthreads = c_float(), c_int()
+        time = kernel(niters, out, nthreads)
+        return 2.*nchains*nlanes*niters*nthreads.value/time/10**9, time
+
+    # Calibrate the number of iterations so that a run lasts enough
+    niters = 2**16
+    while run(niters)[1] < 0.1:
+        niters *= 2
+
+    return max(run(niters)[0] for _ in range(repeats))
+
+
 def get_ob_bench(problem, resultsdir, parameters):
     """Return a special :class:`opescibench.Benchmark` to manage performance runs."""
     try:
@@ -7,6 +7,8 @@ from devito.builtins import *  # noqa
 from devito.data.allocators import *  # noqa
 from devito.equation import *  # noqa
 from devito.finite_differences import *  # noqa
+from devito.metrics import *  # noqa
+from devito.operator import precompile  # noqa
 from devito.types import NODE, CELL, Buffer, SubDomain, SubDomainSet  # noqa
 from devito.types.dimension import *  # noqa
 
@@ -35,6 +37,11 @@ configuration.add('backend', 'core', list(backends_registry), callback=init_back
 # Should Devito run a first-touch Operator upon data allocation?
 configuration.add('first-touch', 0, [0, 1], lambda i: bool(i), False)
 
+# Should Devito pad the innermost Dimension of Functions, unless an explicit
+# `padding` is given, so that each row of the domain starts at an address aligned
+# to the SIMD register size? This enables aligned vector loads and stores
+configuration.add('autopadding', 0, [0, 1], lambda i: bool(i), False)
+
 # Should Devito ignore any unknown runtime arguments supplied to Operator.apply(),
 # or rather raise an exception (the default behaviour)?
 configuration.add('ignore-unknowns', 0, [0, 1], lambda i: bool(i), False)
@@ -51,6 +58,27 @@ configuration.add('log-level', 'INFO', list(logger_registry),
 # and will instead use the custom kernel
 configuration.add('jit-backdoor', 0, [0, 1], lambda i: bool(i), False)
 
+# Should Devito store lowered Operators in a persistent, on-disk cache? Any later
+# construction of the same Operator, even from a different process, would then
+# skip the lowering pipeline altogether. The cached Operators are stored in
+# `operator-cache-dir`, or in a temporary directory if unset. The cache size is
+# capped at `operator-cache-size` MBs (0 means unlimited) through LRU eviction
+configuration.add('operator-cache', 0, [0, 1], lambda i: bool(i), False)
+configuration.add('operator-cache-dir', None, impacts_jit=False)
+configuration.add('operator-cache-size', 0, callback=lambda i: float(i),
+                  impacts_jit=False)
+
+# Should Devito JIT-compile the Operator kernel and each of its elemental functions
+# as separate translation units? These are compiled concurrently and individually
+# cached, and eventually linked into a single shared object
+configuration.add('jit-split', 0, [0, 1], lambda i: bool(i), False)
+
+# A directory, possibly on a shared file system, in which JIT-compiled shared
+# objects are cached by content and reused across processes and nodes. The cache
+# size is capped at `jit-cache-size` MBs (0 means unlimited) through LRU eviction
+configuration.add('jit-cache-dir', None, impacts_jit=False)
+configuration.add('jit-cache-size', 0, callback=lambda i: float(i), impacts_jit=False)
+
 # Execution mode setup
 def _reinit_compiler(val):  # noqa
     # Force re-build the compiler
@@ -62,7 +90,7 @@ configuration.add('mpi', 0, [0, 1, 'basic', 'diag', 'overlap', 'overlap2', 'full
                   callback=_reinit_compiler)
 
 # Autotuning setup
-at_levels = ['off', 'basic', 'aggressive', 'max']
+at_levels = ['off', 'basic', 'aggressive', 'max', 'guided']
 at_modes = ['preemptive', 'destructive', 'runtime']
 at_default_mode = {'core': 'preemptive', 'yask': 'runtime', 'ops': 'runtime'}
 at_setup = namedtuple('at_setup', 'level mode')
@@ -78,6 +106,15 @@ def _at_callback(val):  # noqa
 configuration.add('autotuning', 'off', at_accepted, callback=_at_callback,  # noqa
                   impacts_jit=False)
 
+# A JSON file, possibly on a shared file system, in which the autotuning outcomes
+# are recorded and from which they are reused by later runs, thus skipping the
+# autotuning phase. If `autotuning-db-validate` is greater than 0, a stored outcome
+# is timed again before being reused, and discarded if it turns out to be slower,
+# by more than the given fraction, than when it was tuned
+configuration.add('autotuning-db', None, impacts_jit=False)
+configuration.add('autotuning-db-validate', 0, callback=lambda i: float(i),
+                  impacts_jit=False)
+
 # Should Devito emit the JIT compilation commands?
 configuration.add('debug-compiler', 0, [0, 1], lambda i: bool(i), False)
 
@@ -95,6 +132,9 @@ configuration.add('dle-options', {})
 
 # Setup Operator profiling
 configuration.add('profiling', 'basic', list(profiler_registry), impacts_jit=False)
+# The number of executions of each profiled section traced by the `trace` profiler
+configuration.add('profiling-ntraces', 10000, callback=lambda i: int(i),
+                  impacts_jit=False)
 
 # Initialize `configuration`. This will also trigger the backend initialization
 init_configuration()
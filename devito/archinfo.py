@@ -149,6 +149,11 @@ class Platform(object):
         """Size in bytes of a SIMD register."""
         return isa_registry.get(self.isa, 0)
 
+    @property
+    def simd_reg_count(self):
+        """Number of SIMD registers."""
+        return isa_nregisters.get(self.isa, 16)
+
     def simd_items_per_reg(self, dtype):
         """Number of items of type ``dtype`` that can fit in a SIMD register."""
         assert self.simd_reg_size % np.dtype(dtype).itemsize == 0
@@ -196,12 +201,13 @@ class Device(Platform):
 # CPUs
 CPU64 = Cpu64('cpu64')
 INTEL64 = Intel64('intel64')
-SNB = Intel64('snb')
-IVB = Intel64('ivb')
-HSW = Intel64('hsw')
-BDW = Intel64('bdw')
-SKX = Intel64('skx')
-KNL = Intel64('knl')
+# The micro-architectures below imply the ISA, so it isn't sniffed from the host
+SNB = Intel64('snb', isa='avx')
+IVB = Intel64('ivb', isa='avx')
+HSW = Intel64('hsw', isa='avx2')
+BDW = Intel64('bdw', isa='avx2')
+SKX = Intel64('skx', isa='avx512')
+KNL = Intel64('knl', isa='avx512')
 KNL7210 = Intel64('knl', cores_logical=256, cores_physical=64, isa='avx512')
 ARM = Arm('arm')
 POWER8 = Power('power8')
@@ -241,3 +247,9 @@ isa_registry = {
     'altivec': 16
 }
 """Size in bytes of a SIMD register in known ISAs."""
+
+isa_nregisters = {
+    'avx512': 32,
+    'altivec': 32
+}
+"""Number of SIMD registers in known ISAs, if other than 16."""
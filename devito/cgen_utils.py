@@ -4,7 +4,8 @@ import numpy as np
 import cgen as c
 
 from mpmath.libmp import prec_to_dps, to_str
-from sympy import Function
+from sympy import Function, Mod
+from sympy.functions.elementary.miscellaneous import MinMaxBase
 from sympy.printing.ccode import C99CodePrinter
 from devito.types.basic import SymbolicArray
 
@@ -118,6 +119,49 @@ class CodePrinter(C99CodePrinter):
         result = '%'.join(args)
         return result
 
+    def _print_Max(self, expr):
+        """
+        Print a Max as a C-like ternary operation if all of its operands are
+        integers, such as loop bounds, so that they aren't round-tripped through
+        floating-point by ``fmax``.
+        """
+        if not all(self._is_integer(i) for i in expr.args):
+            return super(CodePrinter, self)._print_Max(expr)
+        return self._print_minmax(expr.args, '>')
+
+    def _print_Min(self, expr):
+        """
+        Print a Min as a C-like ternary operation if all of its operands are
+        integers, or through ``fmin`` otherwise.
+        """
+        if not all(self._is_integer(i) for i in expr.args):
+            return super(CodePrinter, self)._print_Min(expr)
+        return self._print_minmax(expr.args, '<')
+
+    def _print_minmax(self, args, op):
+        # Pairwise nesting over the two halves of `args`, so that the nesting
+        # depth, and therefore the duplication of the nested operations, only
+        # grows logarithmically with the number of operands
+        if len(args) == 1:
+            return self._print(args[0])
+        half = len(args) // 2
+        a = self._print_minmax(args[:half], op)
+        b = self._print_minmax(args[half:], op)
+        return '((%s) %s (%s) ? (%s) : (%s))' % (a, op, b, a, b)
+
+    def _is_integer(self, expr):
+        """True if ``expr`` is made of integer numbers and symbols only."""
+        if expr.is_Number:
+            return expr.is_Integer
+        elif expr.is_Symbol or expr.is_Indexed:
+            dtype = getattr(getattr(expr, 'function', expr), 'dtype', None)
+            if dtype is None:
+                return bool(expr.is_integer)
+            return np.issubdtype(dtype, np.integer)
+        elif expr.is_Add or expr.is_Mul or isinstance(expr, (Mod, MinMaxBase)):
+            return all(self._is_integer(i) for i in expr.args)
+        return False
+
     def _print_Float(self, expr):
         """Print a Float in C-like scientific notation."""
         prec = expr._prec
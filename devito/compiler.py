@@ -1,6 +1,7 @@
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 from hashlib import sha1
-from os import environ, path
+from os import cpu_count, environ, getpid, path, replace
 from time import time
 from distutils import version
 from subprocess import DEVNULL, CalledProcessError, check_output, check_call
@@ -8,18 +9,22 @@ import platform
 import warnings
 import sys
 
+import numpy as np
 import numpy.ctypeslib as npct
 from codepy.jit import compile_from_string
 from codepy.toolchain import GCCToolchain
 
 from devito.archinfo import NVIDIAX, SKX, POWER8, POWER9
 from devito.exceptions import CompilationError
+from devito.jitcache import get_jit_cache
 from devito.logger import debug, warning, error
+from devito.mpi import MPI
 from devito.parameters import configuration
 from devito.tools import (as_tuple, change_directory, filter_ordered,
                           memoized_func, make_tempdir)
 
-__all__ = ['jit_compile', 'load', 'make', 'GNUCompiler']
+__all__ = ['jit_compile', 'jit_compile_units', 'jit_broadcast', 'load', 'make',
+           'GNUCompiler']
 
 
 def sniff_compiler_version(cc):
@@ -154,6 +159,8 @@ class Compiler(GCCToolchain):
 
         self.src_ext = 'c' if kwargs.get('cpp', False) is False else 'cpp'
 
+        self.o_ext = '.o'
+
         if platform.system() == "Linux":
             self.so_ext = '.so'
         elif platform.system() == "Darwin":
@@ -384,19 +391,57 @@ def save(soname, binary, compiler):
         debug("%s: `%s` was not saved in `%s` as it already exists"
               % (compiler, sofile.name, get_jit_dir()))
     else:
-        with open(str(sofile), 'wb') as f:
+        # Write to a temporary file first, so that concurrent processes (e.g.,
+        # MPI ranks sharing a file system) never load a partially written file
+        tmp = "%s.%d.tmp" % (sofile, getpid())
+        with open(tmp, 'wb') as f:
             f.write(binary)
+        replace(tmp, str(sofile))
         debug("%s: `%s` successfully saved in `%s`"
               % (compiler, sofile.name, get_jit_dir()))
 
 
+def jit_cached(soname, code, compiler, build):
+    """
+    Retrieve the shared object ``soname`` from the shared JIT cache, if any.
+    On cache miss, invoke ``build`` and store the resulting shared object in
+    the shared JIT cache.
+
+    Parameters
+    ----------
+    soname : str
+        Name of the .so file (w/o the suffix).
+    code : str
+        The source code to be JIT compiled.
+    compiler : Compiler
+        The toolchain used for JIT compilation.
+    build : callable
+        Produce the .so file.
+    """
+    cache = get_jit_cache()
+    if cache is None or configuration['jit-backdoor']:
+        build()
+        return
+
+    key = cache.key(code, compiler)
+    sofile = get_jit_dir().joinpath(soname).with_suffix(compiler.so_ext)
+    # Only one process (e.g., one MPI rank per job) compiles, while all others
+    # wait and then map the shared object from the cache
+    with cache.lock(key):
+        if not cache.fetch(key, sofile):
+            build()
+            cache.store(key, sofile)
+
+
 def jit_compile(soname, code, compiler):
     """
     JIT compile some source code given as a string.
 
     This function relies upon codepy's ``compile_from_string``, which performs
     caching of compilation units and avoids potential race conditions due to
-    multiple processing trying to compile the same object.
+    multiple processing trying to compile the same object. If a shared JIT
+    cache is in use (see ``configuration['jit-cache-dir']``), the shared
+    object is retrieved from there, if available.
 
     Parameters
     ----------
@@ -407,6 +452,10 @@ def jit_compile(soname, code, compiler):
     compiler : Compiler
         The toolchain used for JIT compilation.
     """
+    jit_cached(soname, code, compiler, partial(_jit_compile, soname, code, compiler))
+
+
+def _jit_compile(soname, code, compiler):
     target = str(get_jit_dir().joinpath(soname))
     src_file = "%s.%s" % (target, compiler.src_ext)
 
@@ -453,6 +502,166 @@ def jit_compile(soname, code, compiler):
         debug("%s: cache hit `%s` [%.2f s]" % (compiler, src_file, toc-tic))
 
 
+def jit_compile_units(soname, units, compiler, nworkers=None):
+    """
+    JIT compile some source code given as a collection of translation units,
+    and link the resulting object files into a single shared object.
+
+    The translation units are compiled concurrently, each one through codepy's
+    ``compile_from_string``. The object files are cached based on the content
+    of the translation units, so that a change to a translation unit doesn't
+    trigger the recompilation of the others.
+
+    Parameters
+    ----------
+    soname : str
+        Name of the .so file (w/o the suffix).
+    units : dict
+        A mapper from names to the source code of the translation units.
+    compiler : Compiler
+        The toolchain used for JIT compilation.
+    nworkers : int, optional
+        The number of translation units compiled concurrently. Defaults to the
+        number of available cores.
+    """
+    if configuration['jit-backdoor']:
+        raise ValueError("The JIT backdoor isn't supported when compiling `%s` "
+                         "as separate translation units" % soname)
+    code = ''.join(units.values())
+    jit_cached(soname, code, compiler,
+               partial(_jit_compile_units, soname, units, compiler, nworkers))
+
+
+def _jit_compile_units(soname, units, compiler, nworkers):
+
+    def _compile(item):
+        name, code = item
+        # The object file name depends on the code, not on `soname`, so that
+        # different Operators can share the same object files
+        uname = sha1(code.encode()).hexdigest()
+        target = str(get_jit_dir().joinpath(uname))
+        src_file = "%s.%s" % (target, compiler.src_ext)
+
+        cache_dir = get_codepy_dir().joinpath(uname[:7])
+        cache_dir.mkdir(parents=True, exist_ok=True)
+
+        tic = time()
+        sleep_delay = 0 if configuration['mpi'] else 1
+        _, _, obj_file, recompiled = compile_from_string(
+            compiler, target, code, src_file, cache_dir=cache_dir,
+            debug=configuration['debug-compiler'], sleep_delay=sleep_delay,
+            object=True
+        )
+        toc = time()
+
+        if recompiled:
+            debug("%s: compiled `%s` (%s) [%.2f s]"
+                  % (compiler, src_file, name, toc-tic))
+        else:
+            debug("%s: cache hit `%s` (%s) [%.2f s]"
+                  % (compiler, src_file, name, toc-tic))
+
+        return obj_file
+
+    nworkers = nworkers or cpu_count() or 1
+
+    # See `jit_compile` as to why `catch_warnings` is needed
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+
+        tic = time()
+        # Compilation happens in child processes, hence threads are enough
+        # to drive many compilers at once
+        with ThreadPoolExecutor(max_workers=min(nworkers, len(units))) as executor:
+            obj_files = list(executor.map(_compile, units.items()))
+
+        # Link into a temporary file first, so that concurrent processes
+        # (e.g., MPI ranks) never load a partially written shared object
+        target = "%s%s" % (get_jit_dir().joinpath(soname), compiler.so_ext)
+        tmp = "%s.%d.tmp" % (target, getpid())
+        compiler.link_extension(tmp, obj_files, debug=configuration['debug-compiler'])
+        replace(tmp, target)
+        toc = time()
+
+    debug("%s: built `%s` out of %d translation units [%.2f s]"
+          % (compiler, target, len(units), toc-tic))
+
+
+def jit_broadcast(soname, compiler, comm, build):
+    """
+    JIT compile on a single MPI rank, and then distribute the resulting shared
+    object to all other ranks in ``comm``.
+
+    Only rank 0 invokes ``build``. The shared object is then broadcast to one
+    rank per node (the "node leaders"), which store it in the local JIT
+    directory via ``save``. All other ranks wait for their node leader to be
+    done. This avoids thousands of ranks contending on the same codepy lock,
+    which is particularly harmful on shared file systems.
+
+    This is a collective operation, so it must be invoked by all ranks in
+    ``comm``.
+
+    Parameters
+    ----------
+    soname : str
+        Name of the .so file (w/o the suffix).
+    compiler : Compiler
+        The toolchain used for JIT compilation.
+    comm : MPI communicator
+        The set of processes that will load the shared object.
+    build : callable
+        Produce the .so file.
+    """
+    node = comm.Split_type(MPI.COMM_TYPE_SHARED, key=comm.rank)
+    leaders = comm.Split(0 if node.rank == 0 else MPI.UNDEFINED, key=comm.rank)
+
+    # Note: thanks to the ordering key, rank 0 in `comm` is also rank 0 in
+    # both `node` and `leaders`
+    try:
+        exc = None
+        if leaders != MPI.COMM_NULL:
+            binary = None
+            if leaders.rank == 0:
+                tic = time()
+                try:
+                    build()
+                    sofile = get_jit_dir().joinpath(soname).with_suffix(compiler.so_ext)
+                    with open(str(sofile), 'rb') as f:
+                        binary = np.frombuffer(f.read(), dtype=np.uint8)
+                    size = binary.size
+                except Exception as e:
+                    # Don't leave the other ranks hanging
+                    exc = e
+                    size = -1
+            else:
+                size = None
+
+            size = leaders.bcast(size, root=0)
+            if size >= 0:
+                if leaders.rank != 0:
+                    binary = np.empty(size, dtype=np.uint8)
+                leaders.Bcast([binary, MPI.BYTE], root=0)
+                if leaders.rank == 0:
+                    debug("%s: broadcast `%s` to %d nodes [%.2f s]"
+                          % (compiler, soname, leaders.size, time()-tic))
+                else:
+                    save(soname, binary.tobytes(), compiler)
+        else:
+            size = None
+
+        # Wait until the node leader has made the shared object available locally
+        size = node.bcast(size, root=0)
+    finally:
+        if leaders != MPI.COMM_NULL:
+            leaders.Free()
+        node.Free()
+
+    if exc is not None:
+        raise exc
+    elif size < 0:
+        raise CompilationError("JIT compilation of `%s` failed on rank 0" % soname)
+
+
 def make(loc, args):
     """Invoke the ``make`` command from within ``loc`` with arguments ``args``."""
     hash_key = sha1((loc + str(args)).encode()).hexdigest()
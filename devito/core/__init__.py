@@ -6,7 +6,8 @@ backend as well) are used to run Devito on standard CPU architectures.
 
 from devito.archinfo import Cpu64, Intel64, Arm, Power, Device
 from devito.dle import (CPU64Rewriter, Intel64Rewriter, ArmRewriter, PowerRewriter,
-                        SpeculativeRewriter, DeviceOffloadingRewriter, modes)
+                        SpeculativeRewriter, TimeTilingRewriter,
+                        DeviceOffloadingRewriter, modes)
 from devito.parameters import Parameters, add_sub_configuration
 
 core_configuration = Parameters('core')
@@ -15,15 +16,20 @@ add_sub_configuration(core_configuration, env_vars_mapper)
 
 # Add core-specific DLE modes
 modes.add(Cpu64, {'advanced': CPU64Rewriter,
-                  'speculative': SpeculativeRewriter})
+                  'speculative': SpeculativeRewriter,
+                  'timetiling': TimeTilingRewriter})
 modes.add(Intel64, {'advanced': Intel64Rewriter,
-                    'speculative': SpeculativeRewriter})
+                    'speculative': SpeculativeRewriter,
+                    'timetiling': TimeTilingRewriter})
 modes.add(Arm, {'advanced': ArmRewriter,
-                'speculative': SpeculativeRewriter})
+                'speculative': SpeculativeRewriter,
+                'timetiling': TimeTilingRewriter})
 modes.add(Power, {'advanced': PowerRewriter,
-                  'speculative': SpeculativeRewriter})
+                  'speculative': SpeculativeRewriter,
+                  'timetiling': TimeTilingRewriter})
 modes.add(Device, {'advanced': DeviceOffloadingRewriter,
-                   'speculative': DeviceOffloadingRewriter})
+                   'speculative': DeviceOffloadingRewriter,
+                   'timetiling': DeviceOffloadingRewriter})
 
 # The following used by backends.backendSelector
 from devito.core.operator import OperatorCore as Operator  # noqa
@@ -3,11 +3,14 @@ from itertools import combinations, product
 from functools import total_ordering
 import resource
 
+import numpy as np
 import psutil
 
 from devito.archinfo import KNL
+from devito.core.tuningdb import get_tuning_db
 from devito.dle import BlockDimension
-from devito.ir import Backward, retrieve_iteration_tree
+from devito.ir import (Backward, Call, ExpressionBundle, FindNodes, Iteration,
+                       TimedList, retrieve_iteration_tree)
 from devito.logger import perf, warning as _warning
 from devito.mpi.distributed import MPI, MPINeighborhood
 from devito.mpi.routines import MPIMsgEnriched
@@ -31,7 +34,9 @@ def autotune(operator, args, level, mode):
     level : str
         The autotuning aggressiveness (basic, aggressive, max). A more
         aggressive autotuning might eventually result in higher runtime
-        performance, but the autotuning phase will take longer.
+        performance, but the autotuning phase will take longer. Alternatively,
+        the `guided` level searches the same space as `max`, but only times
+        the variants deemed most promising by a cache-footprint model.
     mode : str
         The autotuning mode (preemptive, runtime). In preemptive mode, the
         output runtime values supplied by the user to `operator.apply` are
@@ -72,31 +77,66 @@ def autotune(operator, args, level, mode):
     roots = [operator.body] + [i.root for i in operator._func_table.values()]
     trees = filter_ordered(retrieve_iteration_tree(roots), key=lambda i: i.root)
 
-    # Detect the time-stepping Iteration; shrink its iteration range so that
-    # each autotuning run only takes a few iterations
-    steppers = {i for i in flatten(trees) if i.dim.is_Time}
-    if len(steppers) == 0:
-        stepper = None
-        timesteps = 1
-    elif len(steppers) == 1:
-        stepper = steppers.pop()
-        timesteps = init_time_bounds(stepper, at_args)
-        if timesteps is None:
-            return args, {}
-    else:
-        warning("cannot perform autotuning unless there is one time loop; skipping")
+    # Detect the time-stepping Iterations; shrink their iteration range so that
+    # each autotuning run only takes a few iterations. Time loops over the same
+    # Dimension share the same runtime bounds, so we only need one of them
+    steppers = OrderedDict()
+    for i in flatten(trees):
+        if i.dim.is_Time:
+            steppers.setdefault(i.dim.root, []).append(i)
+    if any(len({i.direction for i in v}) > 1 for v in steppers.values()):
+        warning("cannot perform autotuning with time loops iterating in opposite "
+                "directions over the same Dimension; skipping")
+        return args, {}
+    steppers = [v[0] for v in steppers.values()]
+    timesteps = init_time_bounds(steppers, at_args)
+    if timesteps is None:
         return args, {}
 
-    # Perform autotuning
-    timings = {}
+    # Each blocked tree is tuned independently, and is timed through the
+    # profiled sections enclosing it
+    blockables = OrderedDict()
     for n, tree in enumerate(trees):
         blockable = [i.dim for i in tree if isinstance(i.dim, BlockDimension)]
+        if blockable:
+            blockables[n] = blockable
+    sections = {n: find_sections(operator, trees[n]) for n in blockables}
+
+    def measure(*ns):
+        timer = operator._profiler.timer
+        if all(sections[n] for n in ns):
+            return sum(getattr(timer.value._obj, i) for n in ns for i in sections[n])
+        else:
+            return timer.total
+
+    # Reuse the outcome of a previous autotuning session, if any
+    db = get_tuning_db()
+    if db is not None:
+        dbkey = db.key(operator, args)
+        entry = db.lookup(dbkey, level)
+        if entry is not None:
+            retval = reuse(operator, entry, args, at_args, steppers, timesteps, mode,
+                           lambda: measure(*blockables))
+            if retval is not None:
+                return args, retval
+            db.invalidate(dbkey)
+
+    # Perform autotuning
+    timings = {}
+    runs = 0
+    for n, blockable in blockables.items():
+        tree = trees[n]
 
         # Tunable arguments
         try:
             tunable = []
-            tunable.append(generate_block_shapes(blockable, args, level))
-            tunable.append(generate_nthreads(operator.nthreads, args, level))
+            if level == 'guided':
+                # The model-guided search picks from the widest candidate space
+                tunable.append(generate_block_shapes(blockable, args, 'aggressive'))
+                tunable.append(generate_nthreads(operator.nthreads, args, 'max'))
+            else:
+                tunable.append(generate_block_shapes(blockable, args, level))
+                tunable.append(generate_nthreads(operator.nthreads, args, level))
             tunable = list(product(*tunable))
         except ValueError:
             # Some arguments are cumpolsory, otherwise autotuning is skipped
@@ -105,10 +145,16 @@ def autotune(operator, args, level, mode):
         # Symbolic number of loop-blocking blocks per thread
         nblocks_per_thread = calculate_nblocks(tree, blockable) / operator.nthreads
 
-        for bs, nt in tunable:
+        def feasible():
             # Can we safely autotune over the given time range?
-            if not check_time_bounds(stepper, at_args, args, mode):
-                break
+            return check_time_bounds(steppers, at_args, args, mode)
+
+        def attempt(bs, nt):
+            """
+            Run the Operator with the block shape ``bs`` and the number of threads
+            ``nt``. Return the elapsed time, or None if the run had to be dropped.
+            """
+            nonlocal runs
 
             # Update `at_args` to use the new tunable arguments
             run = [(k, v) for k, v in bs + nt if k in at_args]
@@ -116,41 +162,53 @@ def autotune(operator, args, level, mode):
 
             # Drop run if not at least one block per thread
             if not configuration['develop-mode'] and nblocks_per_thread.subs(at_args) < 1:
-                continue
+                return None
 
             # Make sure we remain within stack bounds, otherwise skip run
             try:
                 stack_footprint = operator._mem_summary['stack']
                 if int(evaluate(stack_footprint, **at_args)) > options['stack_limit']:
-                    continue
+                    return None
             except TypeError:
-                warning("couldn't determine stack size; skipping run %s" % str(i))
-                continue
+                warning("couldn't determine stack size; skipping run %s" % str(run))
+                return None
             except AttributeError:
                 assert stack_footprint == 0
 
             # Run the Operator
             operator.cfunction(*list(at_args.values()))
-            elapsed = operator._profiler.timer.total
+            elapsed = measure(n)
+            runs += 1
 
-            timings.setdefault(nt, OrderedDict()).setdefault(n, {})[bs] = elapsed
+            # Repeated runs keep the best turnaround time
+            record = timings.setdefault(nt, OrderedDict()).setdefault(n, {})
+            record[bs] = min(elapsed, record.get(bs, elapsed))
             log("run <%s> took %f (s) in %d timesteps" %
                 (','.join('%s=%s' % i for i in run), elapsed, timesteps))
 
             # Prepare for the next autotuning run
-            update_time_bounds(stepper, at_args, timesteps, mode)
+            update_time_bounds(steppers, at_args, mode)
 
             # Reset profiling timers
             operator._profiler.timer.reset()
 
+            return elapsed
+
+        if level == 'guided':
+            model = FootprintModel(tree, blockable, args)
+            guided_search(attempt, feasible, model, tunable)
+        else:
+            for bs, nt in tunable:
+                if not feasible():
+                    break
+                attempt(bs, nt)
+
     # The best variant is the one that for a given number of threads had the minium
     # turnaround time
     try:
-        runs = 0
         mapper = {}
         for k, v in timings.items():
             for i in v.values():
-                runs += len(i)
                 record = mapper.setdefault(k, Record())
                 record.add(min(i, key=i.get), min(i.values()))
         best = min(mapper, key=mapper.get)
@@ -161,12 +219,16 @@ def autotune(operator, args, level, mode):
         warning("couldn't perform any runs")
         return args, {}
 
+    # Record the tuned arguments for later runs
+    if db is not None:
+        db.store(dbkey, best, min(mapper.values()).time / timesteps, level)
+
     # Update the argument list with the tuned arguments
     args.update(best)
 
     # In `runtime` mode, some timesteps have been executed already, so we must
     # adjust the time range
-    finalize_time_bounds(stepper, at_args, args, mode)
+    finalize_time_bounds(steppers, at_args, args, mode)
 
     # Autotuning summary
     summary = {}
@@ -177,6 +239,43 @@ def autotune(operator, args, level, mode):
     return args, summary
 
 
+def reuse(operator, entry, args, at_args, steppers, timesteps, mode, measure):
+    """
+    Apply the tuned arguments stored in the tuning database ``entry``. If
+    requested, these are first validated by timing a single run, ``measure``
+    returning the time spent in the tuned sections of the Operator.
+
+    Returns
+    -------
+    dict or None
+        The autotuning summary, or None if ``entry`` turned out to be stale.
+    """
+    best = OrderedDict(entry['best'])
+
+    runs = 0
+    tolerance = configuration['autotuning-db-validate']
+    if tolerance > 0 and check_time_bounds(steppers, at_args, args, mode):
+        at_args.update({k: v for k, v in best.items() if k in at_args})
+
+        operator.cfunction(*list(at_args.values()))
+        elapsed = measure() / timesteps
+        operator._profiler.timer.reset()
+        update_time_bounds(steppers, at_args, mode)
+        runs = 1
+
+        if elapsed > entry['time']*(1 + tolerance):
+            log("stored <%s> is stale, took %f (s) per timestep rather than %f (s)" %
+                (','.join('%s=%s' % i for i in best.items()), elapsed, entry['time']))
+            return None
+
+    log("reusing <%s>" % (','.join('%s=%s' % i for i in best.items())))
+
+    args.update(best)
+    finalize_time_bounds(steppers, at_args, args, mode)
+
+    return {'runs': runs, 'tpr': timesteps, 'tuned': dict(best), 'cached': True}
+
+
 @total_ordering
 class Record(object):
 
@@ -198,61 +297,239 @@ class Record(object):
         return self.time < other.time
 
 
-def init_time_bounds(stepper, at_args):
-    if stepper is None:
-        return
-    dim = stepper.dim.root
-    if stepper.direction is Backward:
-        at_args[dim.min_name] = at_args[dim.max_name] - options['squeezer']
-        if at_args[dim.max_name] < at_args[dim.min_name]:
-            warning("too few time iterations; skipping")
-            return False
-    else:
-        at_args[dim.max_name] = at_args[dim.min_name] + options['squeezer']
-        if at_args[dim.min_name] > at_args[dim.max_name]:
-            warning("too few time iterations; skipping")
-            return False
-
-    return stepper.size(at_args[dim.min_name], at_args[dim.max_name])
-
-
-def check_time_bounds(stepper, at_args, args, mode):
-    if mode != 'runtime' or stepper is None:
+def init_time_bounds(steppers, at_args):
+    timesteps = 1
+    for stepper in steppers:
+        dim = stepper.dim.root
+        if stepper.direction is Backward:
+            at_args[dim.min_name] = at_args[dim.max_name] - options['squeezer']
+            if at_args[dim.max_name] < at_args[dim.min_name]:
+                warning("too few time iterations; skipping")
+                return None
+        else:
+            at_args[dim.max_name] = at_args[dim.min_name] + options['squeezer']
+            if at_args[dim.min_name] > at_args[dim.max_name]:
+                warning("too few time iterations; skipping")
+                return None
+        timesteps = max(timesteps, stepper.size(at_args[dim.min_name],
+                                                at_args[dim.max_name]))
+    return timesteps
+
+
+def check_time_bounds(steppers, at_args, args, mode):
+    if mode != 'runtime':
         return True
-    dim = stepper.dim.root
-    if stepper.direction is Backward:
-        if at_args[dim.min_name] < args[dim.min_name]:
-            warning("too few time iterations; stopping")
-            return False
-    else:
-        if at_args[dim.max_name] > args[dim.max_name]:
-            warning("too few time iterations; stopping")
-            return False
+    for stepper in steppers:
+        dim = stepper.dim.root
+        if stepper.direction is Backward:
+            if at_args[dim.min_name] < args[dim.min_name]:
+                warning("too few time iterations; stopping")
+                return False
+        else:
+            if at_args[dim.max_name] > args[dim.max_name]:
+                warning("too few time iterations; stopping")
+                return False
     return True
 
 
-def update_time_bounds(stepper, at_args, timesteps, mode):
-    if mode != 'runtime' or stepper is None:
+def update_time_bounds(steppers, at_args, mode):
+    if mode != 'runtime':
         return
-    dim = stepper.dim.root
-    if stepper.direction is Backward:
-        at_args[dim.max_name] -= timesteps
-        at_args[dim.min_name] -= timesteps
-    else:
-        at_args[dim.min_name] += timesteps
-        at_args[dim.max_name] += timesteps
+    for stepper in steppers:
+        dim = stepper.dim.root
+        timesteps = stepper.size(at_args[dim.min_name], at_args[dim.max_name])
+        if stepper.direction is Backward:
+            at_args[dim.max_name] -= timesteps
+            at_args[dim.min_name] -= timesteps
+        else:
+            at_args[dim.min_name] += timesteps
+            at_args[dim.max_name] += timesteps
 
 
-def finalize_time_bounds(stepper, at_args, args, mode):
-    if mode != 'runtime' or stepper is None:
+def finalize_time_bounds(steppers, at_args, args, mode):
+    if mode != 'runtime':
         return
-    dim = stepper.dim.root
-    if stepper.direction is Backward:
-        args[dim.max_name] = at_args[dim.max_name]
-        args[dim.min_name] = args[dim.min_name]
-    else:
-        args[dim.min_name] = at_args[dim.min_name]
-        args[dim.max_name] = args[dim.max_name]
+    for stepper in steppers:
+        dim = stepper.dim.root
+        if stepper.direction is Backward:
+            args[dim.max_name] = at_args[dim.max_name]
+            args[dim.min_name] = args[dim.min_name]
+        else:
+            args[dim.min_name] = at_args[dim.min_name]
+            args[dim.max_name] = args[dim.max_name]
+
+
+def find_sections(operator, tree):
+    """
+    The names of the profiled sections within ``tree`` or enclosing it, either
+    directly or through a Call to the elemental function in which ``tree`` lives.
+    """
+    owners = [k for k, v in operator._func_table.items()
+              if v.root is not None and tree.root in FindNodes(Iteration).visit(v.root)]
+    inner = FindNodes(TimedList).visit(tree.root)
+    ret = []
+    for i in FindNodes(TimedList).visit(operator.body):
+        if i in inner or tree.root in FindNodes(Iteration).visit(i) or \
+                any(c.name in owners for c in FindNodes(Call).visit(i)):
+            ret.append(i.name)
+    return ret
+
+
+def guided_search(attempt, feasible, model, tunable):
+    """
+    Search the ``tunable`` (block shape, nthreads) space for the fastest variant,
+    timing only a fraction of it.
+
+    The candidate block shapes are ranked through the cache-footprint ``model``,
+    and only the most promising ones are timed. These are then narrowed down
+    by successive halving -- the slower half of the candidates is dropped, the
+    faster half is timed again -- and the winner is eventually refined through
+    a local search over its neighbouring block shapes.
+
+    Returns
+    -------
+    2-tuple or None
+        The fastest (block shape, nthreads) attempted, or None if no runs could
+        be performed.
+    """
+    block_shapes = model.rank(filter_ordered(bs for bs, _ in tunable))
+    nthreads = filter_ordered(nt for _, nt in tunable)
+
+    trials = {}
+
+    def timed(bs, nt):
+        elapsed = attempt(bs, nt)
+        if elapsed is not None:
+            trials[(bs, nt)] = min(elapsed, trials.get((bs, nt), elapsed))
+
+    # Successive halving
+    candidates = list(product(block_shapes[:options['guided_candidates']], nthreads))
+    while candidates:
+        for bs, nt in candidates:
+            if not feasible():
+                return min(trials, key=trials.get, default=None)
+            timed(bs, nt)
+        survivors = sorted([i for i in candidates if i in trials], key=trials.get)
+        candidates = survivors[:len(survivors) // 2] if len(survivors) > 2 else []
+    if not trials:
+        return None
+
+    # Local search
+    best = min(trials, key=trials.get)
+    for _ in range(options['guided_steps']):
+        bs, nt = best
+        for i in model.neighbours(bs):
+            if (i, nt) in trials:
+                continue
+            if not feasible():
+                return min(trials, key=trials.get)
+            timed(i, nt)
+        if min(trials, key=trials.get) == best:
+            break
+        best = min(trials, key=trials.get)
+
+    return best
+
+
+class FootprintModel(object):
+
+    """
+    A model of the cache footprint of a loop-blocked iteration tree.
+
+    For a given block shape, the footprint is the amount of data accessed by
+    a single block, that is the block itself extended by the stencil radius,
+    for each Function in the compulsory traffic of the tree. The smaller the
+    stencil halo relative to the block, the fewer redundant loads; but the
+    larger the block, the more likely it is to spill out of cache. With
+    hierarchical blocking, the footprint is that of the innermost blocks.
+
+    Parameters
+    ----------
+    tree : IterationTree
+        The loop-blocked iteration tree.
+    blockable : list of BlockDimension
+        The blocked Dimensions in ``tree``.
+    args : dict_like
+        The runtime arguments, to determine the iteration space extent.
+    """
+
+    def __init__(self, tree, blockable, args):
+        # Note: `blockable` goes from the outermost to the innermost blocking level
+        steps = {d.root: d.step.name for d in blockable}
+        self.max_bs = {d.step.name: int(d.max_step.subs(args)) for d in blockable
+                       if not isinstance(d.parent, BlockDimension)}
+        self.parents = {d.step.name: d.parent.step.name for d in blockable
+                        if isinstance(d.parent, BlockDimension)}
+        self.steps = list(steps.values())
+
+        # For each Function, the item size and the accessed region, as a list
+        # of (block size or extent, stencil diameter) 2-tuples
+        self.regions = []
+        self.extents = {}
+        seen = set()
+        for bundle in FindNodes(ExpressionBundle).visit(tree.root):
+            for (f, _), intervals in bundle.traffic.items():
+                if f in seen:
+                    continue
+                seen.add(f)
+                region = []
+                for i in intervals:
+                    d = i.dim.root
+                    if d.is_Time:
+                        continue
+                    if d not in steps:
+                        extent = (d.symbolic_max - d.symbolic_min + 1).subs(args)
+                        self.extents[d] = int(extent)
+                    region.append((steps.get(d, self.extents.get(d)),
+                                   getattr(i, 'min_size', 0)))
+                self.regions.append((np.dtype(f.dtype).itemsize, region))
+
+    def footprint(self, bs):
+        """The bytes accessed by a block of shape ``bs``."""
+        bs = dict(bs)
+        return sum(itemsize*prod(bs.get(k, k) + diameter for k, diameter in region)
+                   for itemsize, region in self.regions)
+
+    def redundancy(self, bs):
+        """The bytes accessed per point of a block of shape ``bs``."""
+        bs = dict(bs)
+        points = prod(bs[k] for k in self.steps)*prod(self.extents.values())
+        return self.footprint(bs) / points
+
+    def rank(self, block_shapes):
+        """
+        Sort ``block_shapes`` from the most to the least promising. Those whose
+        footprint fits in cache come first, by increasing redundancy; then the
+        others, by increasing footprint.
+        """
+        fits = [i for i in block_shapes if self.footprint(i) <= options['cache_size']]
+        spills = [i for i in block_shapes if i not in fits]
+        return sorted(fits, key=self.redundancy) + sorted(spills, key=self.footprint)
+
+    def neighbours(self, bs):
+        """
+        The block shapes obtained by halving or doubling, one at a time, each
+        of the block sizes in ``bs``, provided they fit in cache at least as
+        well as ``bs`` does.
+        """
+        capacity = max(options['cache_size'], self.footprint(bs))
+        ret = []
+        for n, (k, v) in enumerate(bs):
+            for i in [v // 2, v*2]:
+                candidate = bs[:n] + ((k, i),) + bs[n+1:]
+                if i >= min(options['blocksize']) and self.legal(candidate) and \
+                        self.footprint(candidate) <= capacity:
+                    ret.append(candidate)
+        return ret
+
+    def legal(self, bs):
+        """
+        True if no block in ``bs`` exceeds the iteration space extent or, with
+        hierarchical blocking, the enclosing block.
+        """
+        bs = dict(bs)
+        return all(bs[k] <= v for k, v in self.max_bs.items()) and \
+            all(bs[k] <= bs[v] for k, v in self.parents.items())
 
 
 def calculate_nblocks(tree, blockable):
@@ -269,6 +546,11 @@ def generate_block_shapes(blockable, args, level):
     if not blockable:
         raise ValueError
 
+    # With hierarchical blocking, the nested block shapes are derived from
+    # those of the outermost blocking level
+    nested = [d for d in blockable if isinstance(d.parent, BlockDimension)]
+    blockable = [d for d in blockable if d not in nested]
+
     # Max attemptable block shape
     max_bs = tuple((d.step.name, d.max_step.subs(args)) for d in blockable)
 
@@ -305,9 +587,32 @@ def generate_block_shapes(blockable, args, level):
     # 2) Redundant block shapes
     ret = filter_ordered(ret)
 
+    # Attach the nested block shapes
+    if nested:
+        ret = filter_ordered([bs + i for bs in ret
+                              for i in generate_nested_block_shapes(nested, bs)])
+
     return ret
 
 
+def generate_nested_block_shapes(nested, bs):
+    """
+    The block shapes of the nested blocking levels ``nested``, given the block
+    shape ``bs`` of the enclosing blocking level. Nested blocks are as large as,
+    or smaller than, the enclosing ones.
+    """
+    ret = []
+    for v in options['blocksize'] + [None]:
+        sizes = dict(bs)
+        handle = []
+        for d in nested:
+            limit = sizes[d.parent.step.name]
+            sizes[d.step.name] = limit if v is None else min(v, limit)
+            handle.append((d.step.name, sizes[d.step.name]))
+        ret.append(tuple(handle))
+    return filter_ordered(ret)
+
+
 def generate_nthreads(nthreads, args, level):
     if nthreads == 1:
         return [((None, 1),)]
@@ -332,7 +637,14 @@ def generate_nthreads(nthreads, args, level):
 options = {
     'squeezer': 4,
     'blocksize': sorted({8, 16, 24, 32, 40, 64, 128}),
-    'stack_limit': resource.getrlimit(resource.RLIMIT_STACK)[0] / 4
+    'stack_limit': resource.getrlimit(resource.RLIMIT_STACK)[0] / 4,
+    # The per-core cache capacity, in bytes, targeted by the `guided` level
+    'cache_size': 1024**2,
+    # The number of block shapes timed by the `guided` level before successive
+    # halving kicks in
+    'guided_candidates': 8,
+    # The maximum number of local search steps performed by the `guided` level
+    'guided_steps': 4
 }
 """Autotuning options."""
 
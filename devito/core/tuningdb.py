@@ -0,0 +1,138 @@
+"""
+A persistent database of autotuning outcomes.
+
+Autotuning an Operator may take a significant amount of time, and in ``runtime``
+mode it even consumes actual timesteps. The tuning database, which lives in the
+JSON file ``configuration['autotuning-db']``, records the best runtime arguments
+(block shapes, number of threads) found by the autotuner, so that any later run,
+even from a different process, may apply them straight away.
+
+An entry is keyed on the Operator's shared object name, which uniquely identifies
+the generated code, as well as on the local grid shape, the target platform and
+the requested number of threads, since all of these impact the optimal choice.
+Each entry also carries the per-timestep execution time of the best variant;
+if ``configuration['autotuning-db-validate']`` is set, a stored entry is timed
+once more before being reused, and invalidated if it turns out to be slower
+than the stored time by more than the given tolerance.
+"""
+
+from pathlib import Path
+from time import time
+import json
+import os
+
+from devito.logger import debug, warning
+from devito.parameters import configuration
+from devito.tools import lock_file
+
+__all__ = ['TuningDB', 'get_tuning_db']
+
+
+class TuningDB(object):
+
+    """
+    A multi-process database of autotuning outcomes, stored as a JSON file.
+
+    Parameters
+    ----------
+    path : str
+        The database file.
+    """
+
+    _levels = ('basic', 'guided', 'aggressive', 'max')
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def key(self, operator, args):
+        """The database key for ``operator`` run with the arguments ``args``."""
+        grids = sorted({tuple(i.grid.shape_local) for i in operator.input
+                        if getattr(i, 'grid', None) is not None})
+        platform = configuration['platform']
+        platform = '%s-%s-%d' % (platform, platform.isa, platform.cores_physical)
+        nthreads = operator.nthreads
+        nthreads = 1 if nthreads == 1 else args[nthreads.name]
+        return '%s:%s:%s:nt%d' % (operator._soname, ','.join(str(i) for i in grids),
+                                  platform, nthreads)
+
+    def _locked(self):
+        return lock_file(self.path.with_name('%s.lock' % self.path.name))
+
+    def _load(self):
+        try:
+            with open(str(self.path), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _dump(self, db):
+        # Write to a process-private temporary file and then atomically rename
+        tmp = self.path.with_name('%s.%d.tmp' % (self.path.name, os.getpid()))
+        with open(str(tmp), 'w') as f:
+            json.dump(db, f, indent=1)
+        os.replace(str(tmp), str(self.path))
+
+    def lookup(self, key, level):
+        """
+        Retrieve the entry ``key``, provided that it was produced by an
+        autotuning session at least as aggressive as ``level``.
+
+        Returns
+        -------
+        dict or None
+            The entry, that is the tuned arguments (``best``), the per-timestep
+            execution time (``time``) and the autotuning ``level``, or None if
+            no suitable entry exists.
+        """
+        entry = self._load().get(key)
+        if entry is None:
+            return None
+        if self._levels.index(entry['level']) < self._levels.index(level):
+            debug("TuningDB: `%s` tuned at level `%s`, but `%s` requested"
+                  % (key, entry['level'], level))
+            return None
+        debug("TuningDB: hit `%s`" % key)
+        return entry
+
+    def store(self, key, best, elapsed, level):
+        """
+        Store the tuned arguments ``best``, whose execution took ``elapsed``
+        seconds per timestep, as the entry ``key``.
+        """
+        entry = {'best': [(k, int(v)) for k, v in best.items()],
+                 'time': elapsed,
+                 'level': level,
+                 'timestamp': time()}
+        try:
+            with self._locked():
+                db = self._load()
+                db[key] = entry
+                self._dump(db)
+        except OSError as e:
+            warning("Couldn't store `%s` in the tuning database [%s]" % (key, e))
+            return
+        debug("TuningDB: stored `%s`" % key)
+
+    def invalidate(self, key):
+        """Drop the entry ``key``, if any."""
+        try:
+            with self._locked():
+                db = self._load()
+                if db.pop(key, None) is not None:
+                    self._dump(db)
+        except OSError as e:
+            warning("Couldn't invalidate `%s` in the tuning database [%s]" % (key, e))
+            return
+        debug("TuningDB: invalidated `%s`" % key)
+
+    def __contains__(self, key):
+        return key in self._load()
+
+
+def get_tuning_db():
+    """The TuningDB, or None if no ``configuration['autotuning-db']`` is set."""
+    path = configuration['autotuning-db']
+    if not path:
+        return None
+    return TuningDB(path)
@@ -1,4 +1,6 @@
 from devito.dle.blocking_utils import *  # noqa
+from devito.dle.fusion_utils import *  # noqa
 from devito.dle.parallelizer import NThreads, Ompizer  # noqa
 from devito.dle.rewriters import *  # noqa
 from devito.dle.transformer import *  # noqa
+from devito.dle.vectorizer import Vectorizer  # noqa
@@ -1,16 +1,20 @@
+from collections import OrderedDict
+
 import cgen as c
 import numpy as np
 from cached_property import cached_property
 
-from devito.ir.iet import (Expression, Iteration, List, FindAdjacent,
-                           FindNodes, IsPerfectIteration, Transformer,
+from devito.ir.iet import (Call, Conditional, Expression, HaloSpot, Iteration, List,
+                           FindAdjacent, FindNodes, IsPerfectIteration, Transformer,
                            compose_nodes, retrieve_iteration_tree)
+from devito.ir.support import Forward, Scope
 from devito.logger import warning
 from devito.symbolics import as_symbol, xreplace_indices
-from devito.tools import as_tuple, flatten
-from devito.types import IncrDimension, Scalar
+from devito.tools import as_tuple, flatten, is_integer
+from devito.types import Dimension, IncrDimension, Scalar
 
-__all__ = ['BlockDimension', 'fold_blockable_tree', 'unfold_blocked_tree']
+__all__ = ['BlockDimension', 'TileDimension', 'fold_blockable_tree',
+           'unfold_blocked_tree', 'skewing_factors']
 
 
 def fold_blockable_tree(node, blockinner=True):
@@ -301,3 +305,111 @@ class BlockDimension(IncrDimension):
             else:
                 # Avoid OOB
                 return {self.step.name: 1}
+
+
+class TileDimension(IncrDimension):
+
+    """
+    Dimension symbol representing the tiles of a time-tiled Iteration space.
+    Unlike a BlockDimension, the tile size is not subjected to autotuning.
+    """
+
+    @property
+    def _arg_names(self):
+        return (self.step.name,) + self.parent._arg_names
+
+    def _arg_defaults(self, **kwargs):
+        # The timesteps of a time tile should be enough to amortize the skewing
+        # overhead, while the space tiles must be large enough for the skewed
+        # tiles not to degenerate
+        return {self.step.name: 8 if self.root.is_Time else 32}
+
+    def _arg_values(self, args, interval, grid, **kwargs):
+        value = kwargs.pop(self.step.name, self._arg_defaults()[self.step.name])
+        if value <= 0:
+            raise ValueError("Illegal tile size `%s=%d` (it should be > 0)"
+                             % (self.step.name, value))
+        return {self.step.name: value}
+
+
+def skewing_factors(root, blockinner=False):
+    """
+    Determine whether the time-stepping Iteration ``root`` can be time-tiled
+    and, if so, by how much the space Iterations must be skewed.
+
+    Time tiling is only attempted if ``root`` is a sequential, forward Iteration
+    embedding a single, perfect nest of PARALLEL, AFFINE Iterations in which
+    TimeFunctions are read only at timesteps preceding the written one, as in
+    explicit time-marching schemes.
+
+    Parameters
+    ----------
+    root : Iteration
+        The time-stepping Iteration.
+    blockinner : bool, optional
+        If True, the innermost space Iteration is also tiled. Defaults to False.
+
+    Returns
+    -------
+    OrderedDict
+        A mapper from the space Iterations to be tiled to their skewing factor,
+        that is the largest absolute distance along them of all dependences
+        carried by ``root``. Empty if time tiling is illegal or unsupported.
+    """
+    if not (root.dim.is_Time and root.is_Sequential and root.direction is Forward):
+        return OrderedDict()
+
+    trees = retrieve_iteration_tree(root)
+    if len(trees) != 1 or FindNodes((Call, Conditional, HaloSpot)).visit(root):
+        return OrderedDict()
+    nest = trees[0][1:]
+    if not nest or not all(i.is_Parallel and i.is_Affine for i in nest) or\
+            not IsPerfectIteration().visit(nest[0]):
+        return OrderedDict()
+    tileable = nest if blockinner else nest[:-1]
+    if not tileable:
+        return OrderedDict()
+
+    # Only scalar temporaries may be computed outside of the nest
+    exprs = FindNodes(Expression).visit(nest[0])
+    if any(i.is_tensor for i in FindNodes(Expression).visit(root) if i not in exprs):
+        return OrderedDict()
+
+    # All tensor writes must be non-incremental writes to TimeFunctions
+    writes = [i for i in exprs if i.is_tensor]
+    if any(i.is_Increment or not i.write.is_TimeFunction for i in writes):
+        return OrderedDict()
+
+    # Dependence analysis. This is carried out on the expressions as they were
+    # before the lowering of the SteppingDimensions (e.g., `u[t1, x]` ->
+    # `u[t + 1, x]`), so that the distances along time are retrieved too
+    written = {i.write for i in writes}
+    exprs = [e.expr for e in exprs]
+    mapper = {d: d.origin for d in set().union(*[i.free_symbols for i in exprs])
+              if isinstance(d, Dimension) and d.is_Modulo}
+    try:
+        scope = Scope([i.xreplace(mapper) for i in exprs])
+    except (AttributeError, TypeError, ValueError):
+        return OrderedDict()
+
+    skews = OrderedDict([(i, 0) for i in tileable])
+    for dep in scope.d_all:
+        f = dep.function
+        if f not in written:
+            continue
+        if dep.is_irregular:
+            return OrderedDict()
+        distances = [[v for k, v in dep.distance_mapper.items() if k.root is d.root]
+                     for d in [root.dim] + [i.dim for i in tileable]]
+        if any(len(i) != 1 or not is_integer(i[0]) for i in distances):
+            return OrderedDict()
+        distances = [int(i[0]) for i in distances]
+        # Any dependence must be carried by `root`, that is reads may only fetch
+        # values from previous timesteps, which must not have been overwritten
+        # yet in a circular buffer
+        if distances[0] <= 0 or (f._time_buffering and distances[0] >= f._time_size):
+            return OrderedDict()
+        for i, d in zip(tileable, distances[1:]):
+            skews[i] = max(skews[i], abs(d))
+
+    return skews
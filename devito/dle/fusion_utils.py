@@ -0,0 +1,272 @@
+from collections import OrderedDict
+from functools import reduce
+from operator import mul
+
+import numpy as np
+from cached_property import cached_property
+
+from devito.ir.iet import ExpressionBundle, Iteration, compose_nodes
+from devito.ir.support import Scope
+from devito.symbolics import estimate_cost, retrieve_indexed
+from devito.tools import flatten
+from devito.types import Dimension
+
+__all__ = ['Nest', 'NestCost']
+
+
+class NestCost(object):
+
+    """
+    A static cost model for the body of a perfect Iteration nest.
+
+    As for the profiled sections (see ``Profiler.instrument``), the model relies
+    on the compulsory memory traffic, here computed per iteration point. On top
+    of it, the register pressure is estimated from the values -- scalar
+    temporaries as well as loaded array values -- live across two consecutive
+    expressions. The body is made of independent chains of expressions, the
+    atoms, which the backend compiler may interleave; hence, the pressure of
+    the atoms adds up, while the array values read by multiple atoms are
+    assumed to stay live throughout.
+
+    Parameters
+    ----------
+    exprs : list of Expression
+        The body of the nest, in program order.
+    dims : list of Dimension
+        The Dimensions of the Iterations in the nest.
+    """
+
+    def __init__(self, exprs, dims):
+        self.exprs = tuple(exprs)
+        self.dims = frozenset(dims)
+
+    def _field(self, indexed):
+        # Accesses differing only along the nest Dimensions (e.g., `u[t0, x, y]`
+        # and `u[t0, x + 1, y]`) are within the same field, while others (e.g.,
+        # `u[t0, x, y]` and `u[t1, x, y]`) are not
+        indices = [i for i in indexed.indices if not any(isinstance(d, Dimension) and
+                                                         d.root in self._roots
+                                                         for d in i.free_symbols)]
+        return (indexed.function, tuple(indices))
+
+    @cached_property
+    def _roots(self):
+        return frozenset(d.root for d in self.dims)
+
+    @cached_property
+    def traffic(self):
+        """
+        The compulsory traffic per iteration point, in bytes. The fields read
+        after being written within the nest are not accounted for, as they
+        are most likely still in cache.
+        """
+        written = set()
+        accesses = set()
+        for e in self.exprs:
+            reads = list(retrieve_indexed(e.expr.rhs))
+            if e.is_Increment and e.is_tensor:
+                reads.append(e.expr.lhs)
+            for i in reads:
+                field = self._field(i)
+                if field not in written:
+                    accesses.add((field, 'r'))
+            if e.is_tensor:
+                field = self._field(e.expr.lhs)
+                written.add(field)
+                accesses.add((field, 'w'))
+        return sum(np.dtype(f.dtype).itemsize for (f, _), _ in accesses)
+
+    @cached_property
+    def loads(self):
+        """The array values loaded into registers per iteration point, in bytes."""
+        reads = set()
+        for e in self.exprs:
+            reads.update(retrieve_indexed(e.expr.rhs))
+            if e.is_Increment and e.is_tensor:
+                reads.add(e.expr.lhs)
+        return sum(np.dtype(i.function.dtype).itemsize for i in reads)
+
+    @cached_property
+    def _uses(self):
+        temps = {e.expr.lhs for e in self.exprs if e.is_scalar}
+        uses = OrderedDict()
+        for n, e in enumerate(self.exprs):
+            values = set(retrieve_indexed(e.expr)) | (e.expr.free_symbols & temps)
+            for i in values:
+                uses.setdefault(i, []).append(n)
+        return uses, temps
+
+    @cached_property
+    def split_points(self):
+        """
+        The positions at which the body may be split, that is those crossed
+        by no scalar temporaries.
+        """
+        uses, temps = self._uses
+        return [n for n in range(1, len(self.exprs))
+                if not any(uses[i][0] < n <= uses[i][-1] for i in temps if i in uses)]
+
+    @cached_property
+    def atoms(self):
+        """The chains of expressions delimited by the split points."""
+        points = [0] + self.split_points + [len(self.exprs)]
+        return [self.exprs[m:n] for m, n in zip(points, points[1:])]
+
+    @cached_property
+    def pressure(self):
+        """The estimated register pressure."""
+        uses, _ = self._uses
+        points = [0] + self.split_points + [len(self.exprs)]
+        pressure = 0
+        shared = set(uses)
+        for m, n in zip(points, points[1:]):
+            local = {k: v for k, v in uses.items() if m <= v[0] and v[-1] < n}
+            shared -= set(local)
+            pressure += max([len([v for v in local.values() if v[0] < i <= v[-1]])
+                             for i in range(m + 1, n)] + [0])
+        return pressure + len(shared)
+
+    def spills(self, nregs):
+        """
+        The register spills per iteration point, in bytes, given ``nregs``
+        registers. Each value beyond ``nregs`` is stored and then reloaded.
+        """
+        itemsize = max([np.dtype(e.dtype).itemsize for e in self.exprs] + [0])
+        return 2*itemsize*max(self.pressure - nregs, 0)
+
+
+class Nest(object):
+
+    """
+    A perfect nest of Iterations whose innermost Iteration only contains
+    ExpressionBundles.
+
+    Parameters
+    ----------
+    iterations : list of Iteration
+        The Iterations in the nest, from the outermost to the innermost.
+    bundles : list of ExpressionBundle
+        The body of the innermost Iteration.
+    node : Node, optional
+        The IET node represented by the Nest, if any.
+    """
+
+    def __init__(self, iterations, bundles, node=None):
+        self.iterations = tuple(iterations)
+        self.bundles = tuple(bundles)
+        self._node = node
+
+    @classmethod
+    def make(cls, node):
+        """Return a Nest for ``node``, or None if ``node`` isn't a suitable nest."""
+        iterations = []
+        handle = node
+        while isinstance(handle, Iteration) and not handle.uindices:
+            iterations.append(handle)
+            if len(handle.nodes) == 1 and isinstance(handle.nodes[0], Iteration):
+                handle = handle.nodes[0]
+            else:
+                break
+        if not iterations or iterations[-1] is not handle:
+            return None
+        bundles = handle.nodes
+        if not all(i.is_ExpressionBundle for i in bundles):
+            return None
+        if not all(i.is_Expression and not i.is_ForeignExpression
+                   for i in flatten(i.exprs for i in bundles)):
+            return None
+        return Nest(iterations, bundles, node)
+
+    @property
+    def root(self):
+        """The IET node represented by the Nest."""
+        if self._node is None:
+            self._node = compose_nodes(list(self.iterations) + [self.bundles])
+        return self._node
+
+    @property
+    def dimensions(self):
+        return [i.dim for i in self.iterations]
+
+    @property
+    def exprs(self):
+        return flatten(i.exprs for i in self.bundles)
+
+    @cached_property
+    def cost(self):
+        return NestCost(self.exprs, self.dimensions)
+
+    def _signature(self):
+        return [(i.dim, i.limits, i.offsets, i.direction, frozenset(i.properties))
+                for i in self.iterations]
+
+    def is_fusible(self, other, outer):
+        """
+        True if ``self`` and ``other`` can legally be fused, False otherwise.
+
+        Parameters
+        ----------
+        other : Nest
+            The Nest following ``self`` in program order.
+        outer : list of Dimension
+            The Dimensions of the Iterations enclosing both Nests.
+        """
+        if self._signature() != other._signature():
+            return False
+
+        # The scalars written in a Nest must not be accessed by the other one
+        for a, b in [(self, other), (other, self)]:
+            scalars = {e.write for e in a.exprs if e.is_scalar}
+            if any(scalars & set(e.functions) for e in b.exprs):
+                return False
+
+        # Within the fused Nest, for any data dependence between the two Nests,
+        # the sink must still follow the source. This is guaranteed if either
+        # the dependence is carried by an outer Iteration (e.g., a timestepping
+        # loop) or it lives within the same iteration point. The analysis is
+        # carried out on the expressions as they were before the lowering of
+        # the SteppingDimensions (e.g., `u[t1, x]` -> `u[t + 1, x]`)
+        exprs = [e.expr for e in self.exprs + other.exprs]
+        mapper = {d: d.origin for d in set().union(*[i.free_symbols for i in exprs])
+                  if isinstance(d, Dimension) and d.is_Modulo}
+        n = len(self.exprs)
+        try:
+            scope = Scope([i.xreplace(mapper) for i in exprs])
+            for dep in scope.d_all:
+                if (dep.source.timestamp < n) == (dep.sink.timestamp < n):
+                    continue
+                elif any(dep.is_carried(d) for d in outer):
+                    continue
+                elif dep.is_indep():
+                    continue
+                return False
+        except (AttributeError, TypeError, ValueError):
+            # Conservatively assume a dependence we can't honour
+            return False
+        return True
+
+    def fuse(self, other):
+        """Return a new Nest fusing ``self`` and ``other``."""
+        return Nest(self.iterations, self.bundles + other.bundles)
+
+    def fission(self, groups):
+        """
+        Return a list of Nests, one for each group of consecutive expressions
+        in ``groups``.
+        """
+        nests = []
+        for group in groups:
+            bundles = []
+            for b in self.bundles:
+                exprs = [e for e in b.exprs if e in group]
+                if not exprs:
+                    continue
+                ops = reduce(mul, b.shape, 1)*sum(estimate_cost(e.expr) for e in exprs)
+                accessed = set()
+                for e in exprs:
+                    accessed.update((i, 'r') for i in e.reads)
+                    accessed.add((e.write, 'w'))
+                traffic = {k: v for k, v in b.traffic.items() if k in accessed}
+                bundles.append(ExpressionBundle(b.shape, ops, traffic, body=exprs))
+            nests.append(Nest(self.iterations, bundles))
+        return nests
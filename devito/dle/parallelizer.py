@@ -10,6 +10,7 @@ from devito.ir import (Call, Conditional, Block, Expression, List, Prodder,
                        IsPerfectIteration, retrieve_iteration_tree, filter_iterations)
 from devito.symbolics import CondEq
 from devito.parameters import configuration
+from devito.profiling import RegionTimer, SampledList
 from devito.tools import is_integer, prod
 from devito.types import Constant, Symbol
 
@@ -35,10 +36,11 @@ class NThreads(Constant):
 
 class ParallelRegion(Block):
 
-    def __init__(self, body, nthreads, private=None):
+    def __init__(self, body, nthreads, private=None, timer=None):
         header = ParallelRegion._make_header(nthreads, private)
         super(ParallelRegion, self).__init__(header=header, body=body)
         self.nthreads = nthreads
+        self.timer = timer
 
     @classmethod
     def _make_header(cls, nthreads, private):
@@ -49,6 +51,10 @@ class ParallelRegion(Block):
     def functions(self):
         return (self.nthreads,)
 
+    @property
+    def free_symbols(self):
+        return (self.timer,) if self.timer is not None else ()
+
 
 class SingleThreadProdder(Conditional, Prodder):
 
@@ -107,6 +113,11 @@ class Ompizer(object):
         else:
             self.key = lambda i: i.is_ParallelRelaxed and not i.is_Vectorizable
         self.nthreads = NThreads(name='nthreads')
+        # Per-thread timers, to profile the load balance of the parallel regions
+        if configuration['profiling'] == 'threads':
+            self.timer = RegionTimer(name='rtimers')
+        else:
+            self.timer = None
 
     def _make_atomic_incs(self, partree):
         if not partree.is_ParallelAtomic:
@@ -183,7 +194,24 @@ class Ompizer(object):
         private = [i for i in FindSymbols().visit(partree)
                    if i.is_Array and i._mem_stack]
         private = sorted(set([i.name for i in private]))
-        return ParallelRegion(partree, self.nthreads, private)
+        return ParallelRegion(partree, self.nthreads, private, self.timer)
+
+    def _make_timed(self, partree):
+        # Each thread times the work it performs within the parallel region, up
+        # to, but excluding, the implicit barrier at the end of the region.
+        # `nowait` is safe, since the end of the region synchronizes anyway
+        pragma = c.Pragma('%s nowait' % partree.pragmas[-1].value)
+        partree = partree._rebuild(pragmas=partree.pragmas[:-1] + (pragma,))
+
+        index = len(self.timer.regions)
+        self.timer.regions.append('region%d' % index)
+
+        mapper = {'tn': self.timer.name, 'tid': 'omp_get_thread_num()', 'n': index}
+        start = c.Initializer(c.Value('double', 'tstart'), 'omp_get_wtime()')
+        update = c.If('%(tid)s < %(tn)s->maxthreads' % mapper,
+                      c.Statement(('%(tn)s->busy[%(tn)s->maxthreads*%(n)d + %(tid)s] += '
+                                   'omp_get_wtime() - tstart') % mapper))
+        return List(header=start, body=partree, footer=update)
 
     def _make_guard(self, partree, collapsed):
         # Do not enter the parallel region if the step increment is 0; this
@@ -261,6 +289,10 @@ class Ompizer(object):
             # Ensure single-thread prodders are atomic
             partree = self._make_atomic_prodders(partree)
 
+            # Instrument for load-balance profiling, if requested
+            if self.timer is not None:
+                partree = self._make_timed(partree)
+
             # Wrap within a parallel region, declaring private and shared variables
             parregion = self._make_parregion(partree)
 
@@ -271,5 +303,16 @@ class Ompizer(object):
 
         iet = Transformer(mapper).visit(iet)
 
-        return iet, {'args': [self.nthreads] if mapper else [],
-                     'includes': ['omp.h']}
+        # Any hardware counters sampled around the parallel regions, possibly
+        # within already parallelized callees, are those of `nthreads` threads
+        calls = FindNodes(Call).visit(iet)
+        if mapper or any(self.nthreads in i.arguments for i in calls):
+            sampled = FindNodes(SampledList).visit(iet)
+            iet = Transformer({i: i._rebuild(nthreads=self.nthreads)
+                               for i in sampled}).visit(iet)
+
+        args = [self.nthreads] if mapper else []
+        if mapper and self.timer is not None:
+            args.append(self.timer)
+
+        return iet, {'args': args, 'includes': ['omp.h']}
@@ -5,24 +5,29 @@ from functools import partial
 from time import time
 
 import cgen
+from sympy import Max, Min
 
 from devito.cgen_utils import ccode
-from devito.dle.blocking_utils import (BlockDimension, fold_blockable_tree,
-                                       unfold_blocked_tree)
+from devito.dle.blocking_utils import (BlockDimension, TileDimension,
+                                       fold_blockable_tree, unfold_blocked_tree,
+                                       skewing_factors)
+from devito.dle.fusion_utils import Nest, NestCost
 from devito.dle.parallelizer import Ompizer
+from devito.dle.vectorizer import Vectorizer
 from devito.exceptions import DLEException
-from devito.ir.iet import (Call, Expression, Iteration, List, HaloSpot, Prodder, PARALLEL,
-                           AFFINE, FindSymbols, FindNodes, FindAdjacent, MapNodes,
-                           Transformer, compose_nodes, filter_iterations, make_efunc,
-                           retrieve_iteration_tree)
+from devito.ir.iet import (Call, Expression, Iteration, List, HaloSpot, Prodder, Section,
+                           PARALLEL, SEQUENTIAL, AFFINE, FindSymbols, FindNodes,
+                           FindAdjacent, MapNodes, Transformer, compose_nodes,
+                           filter_iterations, make_efunc, retrieve_iteration_tree)
 from devito.logger import dle, perf_adv
 from devito.mpi import HaloExchangeBuilder
 from devito.parameters import configuration
+from devito.profiling import MPITimer
 from devito.tools import DAG, as_tuple, filter_ordered, flatten
 
 __all__ = ['PlatformRewriter', 'CPU64Rewriter', 'Intel64Rewriter', 'PowerRewriter',
-           'ArmRewriter', 'SpeculativeRewriter', 'DeviceOffloadingRewriter',
-           'CustomRewriter']
+           'ArmRewriter', 'SpeculativeRewriter', 'TimeTilingRewriter',
+           'DeviceOffloadingRewriter', 'CustomRewriter']
 
 
 class State(object):
@@ -267,9 +272,14 @@ class PlatformRewriter(AbstractRewriter):
     def _loop_blocking(self, iet):
         """
         Apply loop blocking to PARALLEL Iteration trees.
+
+        With ``blocklevels > 1``, hierarchical blocking is applied: each block
+        is in turn blocked, e.g. to target different levels of the memory
+        hierarchy. The block size of each level is a distinct runtime argument.
         """
         blockinner = bool(self.params.get('blockinner'))
         blockalways = bool(self.params.get('blockalways'))
+        blocklevels = max(int(self.params.get('blocklevels') or 1), 1)
 
         # Make sure loop blocking will span as many Iterations as possible
         iet = fold_blockable_tree(iet, blockinner)
@@ -279,6 +289,9 @@ class PlatformRewriter(AbstractRewriter):
         block_dims = []
         for tree in retrieve_iteration_tree(iet):
             # Is the Iteration tree blockable ?
+            if any(isinstance(i.dim, TileDimension) for i in tree):
+                # Already time-tiled
+                continue
             iterations = filter_iterations(tree, lambda i: i.is_Parallel)
             if not blockinner:
                 iterations = iterations[:-1]
@@ -294,18 +307,40 @@ class PlatformRewriter(AbstractRewriter):
 
             # Apply loop blocking to `tree`
             interb = []
+            nested = []
             intrab = []
             for i in iterations:
-                d = BlockDimension(i.dim, name="%s%d_blk" % (i.dim.name, len(mapper)))
-                block_dims.append(d)
-                # Build Iteration over blocks
                 properties = (PARALLEL,) + ((AFFINE,) if i.is_Affine else ())
-                interb.append(Iteration([], d, d.symbolic_max, properties=properties))
-                # Build Iteration within a block
-                intrab.append(i._rebuild([], limits=(d, d+d.step-1, 1), offsets=(0, 0)))
+                # Build Iterations over blocks, from the outermost to the
+                # innermost blocking level
+                handle = []
+                for level in range(blocklevels):
+                    name = "%s%d_blk" % (i.dim.name, len(mapper))
+                    if blocklevels > 1:
+                        name = "%s%d" % (name, level)
+                    if not handle:
+                        d = BlockDimension(i.dim, name=name)
+                        handle.append(Iteration([], d, d.symbolic_max,
+                                                properties=properties))
+                    else:
+                        parent = handle[-1].dim
+                        d = BlockDimension(parent, name=name)
+                        limits = (parent, parent + parent.step - 1, d.step)
+                        handle.append(Iteration([], d, limits, properties=properties))
+                    block_dims.append(d)
+                interb.append(handle[0])
+                nested.append(handle[1:])
+                # Build Iteration within a block. Nested blocks may not tile
+                # the enclosing block exactly, hence the clamping
+                if len(handle) == 1:
+                    limits = (d, d+d.step-1, 1)
+                else:
+                    limits = (d, Min(d+d.step-1, parent+parent.step-1), 1)
+                intrab.append(i._rebuild([], limits=limits, offsets=(0, 0)))
+            nested = [i for level in zip(*nested) for i in level]
 
             # Construct the blocked tree
-            blocked = compose_nodes(interb + intrab + [iterations[-1].nodes])
+            blocked = compose_nodes(interb + nested + intrab + [iterations[-1].nodes])
             blocked = unfold_blocked_tree(blocked)
 
             # Promote to a separate Callable
@@ -337,20 +372,175 @@ class PlatformRewriter(AbstractRewriter):
         return iet, {'dimensions': block_dims, 'efuncs': efuncs,
                      'args': [i.step for i in block_dims]}
 
+    @dle_pass
+    def _loop_fusion(self, iet):
+        """
+        Fuse adjacent Iteration nests, or split an Iteration nest into multiple
+        nests, based on a cost model accounting for the memory traffic and the
+        register pressure of the nests (see :class:`NestCost`).
+
+        A nest is split, at points crossed by no scalar temporaries, if the
+        register pressure exceeds the number of SIMD registers and the spills
+        saved outweigh the loads and the memory traffic added by re-reading the
+        values shared by the resulting nests. Adjacent nests over the same
+        iteration space are then fused if the fusion is legal, cuts the memory
+        traffic (e.g., because the nests read the same fields) and doesn't raise
+        the register pressure beyond the number of SIMD registers. Only nests
+        within the same Section are considered, so that the profiled sections
+        are left unchanged.
+        """
+        nregs = self.platform.simd_reg_count
+
+        # The Dimensions of the Iterations enclosing each Section
+        outer = OrderedDict()
+        for k, v in MapNodes(Iteration, Section).visit(iet).items():
+            for i in v:
+                outer.setdefault(i, []).append(k.dim)
+
+        mapper = {}
+        for section in FindNodes(Section).visit(iet):
+            # Fission
+            body = []
+            for i in section.body:
+                nest = Nest.make(i)
+                if nest is None:
+                    body.append(i)
+                    continue
+                cost = nest.cost
+                parallel = all(j.is_Parallel for j in nest.iterations)
+                if cost.pressure <= nregs or not parallel:
+                    body.append(nest)
+                    continue
+                atoms = list(cost.atoms)
+                groups = [atoms.pop(0)]
+                for atom in atoms:
+                    candidate = NestCost(groups[-1] + atom, nest.dimensions)
+                    if candidate.pressure <= nregs:
+                        groups[-1] = groups[-1] + atom
+                    else:
+                        groups.append(atom)
+                # Splitting cuts the register spills, but the array values read
+                # by multiple groups get reloaded, and the fields read by multiple
+                # groups get streamed in again from memory
+                costs = [NestCost(g, nest.dimensions) for g in groups]
+                gain = cost.spills(nregs) - sum(i.spills(nregs) for i in costs)
+                gain -= sum(i.loads for i in costs) - cost.loads
+                extra = sum(i.traffic for i in costs) - cost.traffic
+                if len(groups) > 1 and gain > extra:
+                    body.extend(nest.fission(groups))
+                else:
+                    body.append(nest)
+
+            # Fusion
+            processed = []
+            for i in body:
+                if isinstance(i, Nest) and processed and isinstance(processed[-1], Nest):
+                    a, b = processed[-1], i
+                    fused = a.fuse(b)
+                    test0 = a.is_fusible(b, outer.get(section, []))
+                    test1 = fused.cost.traffic < a.cost.traffic + b.cost.traffic
+                    test2 = fused.cost.pressure <= max(nregs, a.cost.pressure,
+                                                       b.cost.pressure)
+                    if test0 and test1 and test2:
+                        processed[-1] = fused
+                        continue
+                processed.append(i)
+            processed = [i.root if isinstance(i, Nest) else i for i in processed]
+
+            if any(i is not j for i, j in zip(processed, section.body)) or\
+                    len(processed) != len(section.body):
+                mapper[section] = section._rebuild(body=processed)
+
+        iet = Transformer(mapper).visit(iet)
+
+        return iet, {}
+
+    @dle_pass
+    def _time_tiling(self, iet):
+        """
+        Apply time tiling to the time-stepping Iterations embedding a single nest
+        of PARALLEL Iterations, as typical of explicit time-marching schemes.
+
+        The space Iterations are skewed with respect to time, by as much as the
+        largest dependence distance along them, and then tiled along with time.
+        Each tile thus computes multiple timesteps over a portion of the grid,
+        which can be sized to fit in cache: ::
+
+            for time                 for time_tile
+              for x                    for x_tile
+                for y      ---->         for time in time_tile
+                                           for x in x_tile (skewed)
+                                             for y
+
+        The tiles are executed in sequence, while the parallelism within each
+        timestep of a tile is retained.
+        """
+        blockinner = bool(self.params.get('blockinner'))
+
+        mapper = {}
+        tile_dims = []
+        for root in FindNodes(Iteration).visit(iet):
+            skews = skewing_factors(root, blockinner)
+            if not skews:
+                continue
+            n = len(mapper)
+
+            # The Iteration over time tiles
+            tt = TileDimension(root.dim, name="%s%d_tile" % (root.dim.name, n))
+            tiles = [Iteration([], tt, (root.symbolic_min, root.symbolic_max, tt.step),
+                               properties=SEQUENTIAL)]
+            shift = root.dim - tt
+
+            tile_dims.append(tt)
+
+            # The Iterations over the (skewed) space tiles
+            intrat = []
+            for i, skew in skews.items():
+                d = TileDimension(i.dim, name="%s%d_tile" % (i.dim.name, n))
+                _max = i.symbolic_max + skew*(tt.step - 1)
+                tiles.append(Iteration([], d, (i.symbolic_min, _max, d.step),
+                                       properties=SEQUENTIAL))
+                limits = (Max(d - skew*shift, i.symbolic_min),
+                          Min(d + d.step - 1 - skew*shift, i.symbolic_max), 1)
+                intrat.append(i._rebuild([], limits=limits, offsets=(0, 0)))
+                tile_dims.append(d)
+            iterations = list(skews)
+            intrat = compose_nodes(intrat + [iterations[-1].nodes])
+
+            # The time-stepping Iteration within a time tile. Anything else
+            # within `root` (e.g., the profiling Sections) is left untouched
+            limits = (tt, Min(tt + tt.step - 1, root.symbolic_max), root.step)
+            intrat = Transformer({iterations[0]: intrat}).visit(root)
+            intrat = intrat._rebuild(limits=limits, offsets=(0, 0))
+
+            mapper[root] = compose_nodes(tiles + [intrat])
+
+        iet = Transformer(mapper).visit(iet)
+
+        return iet, {'dimensions': tile_dims, 'args': [i.step for i in tile_dims]}
+
     @dle_pass
     def _dist_parallelize(self, iet):
         """
         Add MPI routines performing halo exchanges to emit distributed-memory
         parallel code.
         """
-        sync_heb = HaloExchangeBuilder('basic')
-        user_heb = HaloExchangeBuilder(self.params['mpi'])
+        # Instrument the halo exchanges for communication profiling, if requested
+        if configuration['profiling'] == 'mpi':
+            timer = MPITimer(name='mtimers')
+        else:
+            timer = None
+
+        sync_heb = HaloExchangeBuilder('basic', timer)
+        user_heb = HaloExchangeBuilder(self.params['mpi'], timer)
         mapper = {}
         for i, hs in enumerate(FindNodes(HaloSpot).visit(iet)):
             heb = user_heb if hs.is_Overlappable else sync_heb
             mapper[hs] = heb.make(hs, i)
         efuncs = sync_heb.efuncs + user_heb.efuncs
         objs = sync_heb.objs + user_heb.objs
+        if mapper and timer is not None:
+            objs.append(timer)
         iet = Transformer(mapper, nested=True).visit(iet)
 
         return iet, {'includes': ['mpi.h'], 'efuncs': efuncs, 'args': objs}
@@ -359,11 +549,18 @@ class PlatformRewriter(AbstractRewriter):
     def _simdize(self, iet):
         """
         Add pragmas to the Iteration/Expression tree to enforce SIMD auto-vectorization
-        by the backend compiler.
+        by the backend compiler. With the ``intrinsics`` option, the Iterations
+        that can be vectorized through explicit SIMD intrinsics are turned into
+        a vector loop followed by a (pragma-decorated) remainder loop.
         """
         ignore_deps = as_tuple(self._backend_compiler_pragma('ignore-deps'))
+        if self.params.get('intrinsics'):
+            vectorizer = Vectorizer(self.platform)
+        else:
+            vectorizer = None
 
         mapper = {}
+        includes = []
         for tree in retrieve_iteration_tree(iet):
             vector_iterations = [i for i in tree if i.is_Vectorizable]
             for i in vector_iterations:
@@ -375,11 +572,19 @@ class PlatformRewriter(AbstractRewriter):
                                     self.platform.simd_reg_size))
                 else:
                     simd = as_tuple(Ompizer.lang['simd-for'])
-                mapper[i] = i._rebuild(pragmas=i.pragmas + ignore_deps + simd)
+                pragmas = i.pragmas + ignore_deps + simd
+
+                handle = vectorizer.make_simd(i) if vectorizer else None
+                if handle is None:
+                    mapper[i] = i._rebuild(pragmas=pragmas)
+                else:
+                    vector, remainder = handle
+                    mapper[i] = List(body=[vector, remainder._rebuild(pragmas=pragmas)])
+                    includes = [Vectorizer.header]
 
         processed = Transformer(mapper).visit(iet)
 
-        return processed, {}
+        return processed, {'includes': includes}
 
     @dle_pass
     def _node_parallelize(self, iet):
@@ -422,6 +627,8 @@ class CPU64Rewriter(PlatformRewriter):
         self._optimize_halospots(state)
         if self.params['mpi']:
             self._dist_parallelize(state)
+        if self.params['fusion']:
+            self._loop_fusion(state)
         self._loop_blocking(state)
         self._simdize(state)
         if self.params['openmp']:
@@ -488,6 +695,8 @@ class SpeculativeRewriter(CPU64Rewriter):
         self._loop_wrapping(state)
         if self.params['mpi']:
             self._dist_parallelize(state)
+        if self.params['fusion']:
+            self._loop_fusion(state)
         self._loop_blocking(state)
         self._simdize(state)
         if self.params['openmp']:
@@ -590,13 +799,32 @@ class SpeculativeRewriter(CPU64Rewriter):
         return processed, {}
 
 
+class TimeTilingRewriter(CPU64Rewriter):
+
+    def _pipeline(self, state):
+        self._avoid_denormals(state)
+        self._optimize_halospots(state)
+        if self.params['mpi']:
+            self._dist_parallelize(state)
+        if self.params['fusion']:
+            self._loop_fusion(state)
+        self._time_tiling(state)
+        self._loop_blocking(state)
+        self._simdize(state)
+        if self.params['openmp']:
+            self._node_parallelize(state)
+        self._hoist_prodders(state)
+
+
 class CustomRewriter(SpeculativeRewriter):
 
     passes_mapper = {
         'denormals': SpeculativeRewriter._avoid_denormals,
         'optcomms': SpeculativeRewriter._optimize_halospots,
         'wrapping': SpeculativeRewriter._loop_wrapping,
+        'fusion': SpeculativeRewriter._loop_fusion,
         'blocking': SpeculativeRewriter._loop_blocking,
+        'timetiling': SpeculativeRewriter._time_tiling,
         'openmp': SpeculativeRewriter._node_parallelize,
         'mpi': SpeculativeRewriter._dist_parallelize,
         'simd': SpeculativeRewriter._simdize,
@@ -10,7 +10,7 @@ from devito.parameters import configuration
 __all__ = ['dle_registry', 'modes', 'transform']
 
 
-dle_registry = ('advanced', 'speculative')
+dle_registry = ('advanced', 'speculative', 'timetiling')
 
 
 class DLEModes(OrderedDict):
@@ -40,7 +40,8 @@ class DLEModes(OrderedDict):
 
 
 modes = DLEModes()
-modes.add(Cpu64, {'advanced': CPU64Rewriter, 'speculative': CPU64Rewriter})
+modes.add(Cpu64, {'advanced': CPU64Rewriter, 'speculative': CPU64Rewriter,
+                  'timetiling': CPU64Rewriter})
 
 
 def transform(iet, mode='advanced', options=None):
@@ -61,6 +62,8 @@ def transform(iet, mode='advanced', options=None):
         - ``speculative``: Apply all of the 'advanced' transformations, plus other
                            transformations that might increase (or possibly decrease)
                            performance.
+        - ``timetiling``: Apply all of the 'advanced' transformations, plus time
+                          tiling of the time-stepping loops, if legal.
     options : dict, optional
         - ``openmp``: Enable/disable OpenMP. Defaults to `configuration['openmp']`.
         - ``mpi``: Enable/disable MPI. Defaults to `configuration['mpi']`.
@@ -70,6 +73,16 @@ def transform(iet, mode='advanced', options=None):
         - ``blockalways``: Pass True to unconditionally apply loop blocking, even when
                            the compiler heuristically thinks that it might not be
                            profitable and/or dangerous for performance.
+        - ``blocklevels``: The number of levels of hierarchical loop blocking,
+                           e.g. 2 to have each block, sized for the L3 cache,
+                           in turn blocked for the L2 cache. Defaults to 1.
+        - ``intrinsics``: Pass True to generate explicit SIMD intrinsics (SSE, AVX,
+                          AVX-512) for the innermost loops, rather than relying on
+                          the backend compiler auto-vectorization. Loops that can't
+                          be translated are left to the backend compiler.
+        - ``fusion``: Pass True to fuse adjacent loop nests, or split loop nests,
+                      based on a cost model of their memory traffic and register
+                      pressure.
     """
     assert isinstance(iet, Node)
 
@@ -77,6 +90,9 @@ def transform(iet, mode='advanced', options=None):
     params = {}
     params['blockinner'] = configuration['dle-options'].get('blockinner', False)
     params['blockalways'] = configuration['dle-options'].get('blockalways', False)
+    params['blocklevels'] = configuration['dle-options'].get('blocklevels', 1)
+    params['intrinsics'] = configuration['dle-options'].get('intrinsics', False)
+    params['fusion'] = configuration['dle-options'].get('fusion', False)
     params['openmp'] = configuration['openmp']
     params['mpi'] = configuration['mpi']
 
@@ -0,0 +1,363 @@
+from collections import OrderedDict
+from functools import reduce
+
+import cgen as c
+import numpy as np
+from sympy import Max, Mod
+
+from devito.cgen_utils import ccode
+from devito.ir.iet import Conditional, Element, Expression, List, Node, FindNodes
+from devito.symbolics import retrieve_indexed
+from devito.types import Dimension
+
+__all__ = ['Vectorizer']
+
+
+class VectorizationError(Exception):
+    pass
+
+
+class SimdKernel(object):
+
+    """
+    The body of a vectorized Iteration, as a sequence of SIMD intrinsics.
+
+    Parameters
+    ----------
+    dim : Dimension
+        The vectorized Dimension.
+    dtype : data-type
+        The type of the vector items.
+    vl : int
+        The number of items in a vector register.
+    vtype : str
+        The C type of a vector register.
+    prefix : str
+        The prefix of the intrinsics.
+    """
+
+    def __init__(self, dim, dtype, vl, vtype, prefix):
+        self.dim = dim
+        self.dtype = dtype
+        self.vl = vl
+        self.vtype = vtype
+        self.prefix = prefix
+        self.suffix = 'pd' if dtype == np.float64 else 'ps'
+
+        self.body = []
+        self.temps = set()
+        # Loaded vectors are reused as long as the loaded Function isn't written
+        self.loads = OrderedDict()
+        self.nloads = 0
+
+        # The rotated registers of each row, see ``rotate``
+        self.rows = OrderedDict()
+        self.epilogue = []
+        self.overrun = 0
+
+    def intrinsic(self, op, *args):
+        return '%s_%s_%s(%s)' % (self.prefix, op, self.suffix, ', '.join(args))
+
+    def broadcast(self, expr):
+        return self.intrinsic('set1', ccode(expr, dtype=self.dtype))
+
+    def shift(self, lo, hi, n):
+        """
+        Return the vector of the items from the ``n``-th onwards of the
+        concatenation of the vectors ``lo`` and ``hi``.
+        """
+        itemsize = np.dtype(self.dtype).itemsize
+        si = 'si%d' % (8*self.vl*itemsize)
+        cast = lambda i: '%s_cast%s_%s(%s)' % (self.prefix, self.suffix, si, i)
+        uncast = lambda i: '%s_cast%s_%s(%s)' % (self.prefix, si, self.suffix, i)
+        if self.vl*itemsize == 64:
+            op = 'alignr_epi32' if self.dtype == np.float32 else 'alignr_epi64'
+            return uncast('%s_%s(%s, %s, %d)' % (self.prefix, op, cast(hi), cast(lo), n))
+        elif self.vl*itemsize == 32:
+            # With AVX2, `alignr` shifts within 128-bit lanes, so the lanes
+            # straddling `lo` and `hi` are first gathered through a permutation
+            half = self.vl // 2
+            mid = self.intrinsic('permute2f128', lo, hi, '0x21')
+            if n == half:
+                return mid
+            elif n > half:
+                lo, n = mid, n - half
+            else:
+                hi = mid
+        args = (self.prefix, cast(hi), cast(lo), n*itemsize)
+        return uncast('%s_alignr_epi8(%s, %s, %d)' % args)
+
+    def row(self, indexed):
+        """
+        Return the row of ``indexed`` -- its Function and all of its indices
+        but the one along the vectorized Dimension -- and its offset along the
+        vectorized Dimension.
+        """
+        return (indexed.function, indexed.indices[:-1]), indexed.indices[-1] - self.dim
+
+    def rotate(self, exprs, start, nregs):
+        """
+        Keep in registers, across the iterations of the vector loop, the vectors
+        of the rows read at multiple offsets along the vectorized Dimension.
+
+        Each such row is covered by a sliding window of consecutive vectors.
+        As the vector loop advances by one vector, the window is rotated and
+        only its last vector is loaded, while the vectors at the offsets in
+        between are composed from two adjacent vectors through cross-register
+        shifts (``alignr`` and ``permute``), instead of unaligned loads. Rows
+        written within the loop are left alone, and so are the rows which
+        wouldn't fit in half of the ``nregs`` registers.
+
+        Return the declarations of the registers, initialized with the vectors
+        of the window at the first iteration ``start``, to be placed before
+        the vector loop. The latter must stop ``self.overrun`` items earlier,
+        as the last vector of a window may reach beyond the last item read
+        by the original loop.
+        """
+        writes = [e.expr.lhs for e in exprs if e.is_tensor]
+
+        offsets = OrderedDict()
+        for e in exprs:
+            for i in sorted(retrieve_indexed(e.expr.rhs), key=str):
+                try:
+                    if i.function.dtype != self.dtype or\
+                            any(self.depends(j) for j in i.indices[:-1]) or\
+                            not self.depends(i.indices[-1]):
+                        continue
+                except VectorizationError:
+                    continue
+                row, offset = self.row(i)
+                if offset.is_Integer and offsets.get(row, set()) is not None:
+                    offsets.setdefault(row, set()).add(int(offset))
+                else:
+                    offsets[row] = None
+
+        prologue = []
+        for row, v in offsets.items():
+            if not v or len(v) == 1:
+                continue
+            if any(i.function is row[0] and not self._disjoint(row[1], i.indices[:-1])
+                   for i in writes):
+                continue
+            lower, upper = min(v), max(v)
+            nblocks = -(-(upper - lower) // self.vl) + 1
+            if nblocks + sum(len(i) for _, i in self.rows.values()) > nregs // 2:
+                continue
+
+            names = ['vrow%d_%d' % (len(self.rows), i) for i in range(nblocks)]
+            for n, name in enumerate(names):
+                # All but the last vector of the window are loaded ahead of the loop
+                index = (self.dim if name is names[-1] else start) + lower + n*self.vl
+                address = ccode(row[0].indexed[row[1] + (index,)], dtype=self.dtype)
+                load = self.intrinsic('loadu', '&%s' % address)
+                load = Element(c.Initializer(c.Value(self.vtype, name), load))
+                (self.body if name is names[-1] else prologue).append(load)
+            # Rotate the window at the end of each iteration
+            self.epilogue.extend(Element(c.Assign(i, j))
+                                 for i, j in zip(names, names[1:]))
+            self.rows[row] = (lower, names)
+            self.overrun = max(self.overrun, lower + (nblocks - 1)*self.vl - upper)
+
+        return prologue
+
+    @classmethod
+    def _disjoint(cls, indices0, indices1):
+        """True if the two sequences of indices never overlap, False otherwise."""
+        for i, j in zip(indices0, indices1):
+            if (i - j).is_Integer and i != j:
+                return True
+            if isinstance(i, Dimension) and i.is_Modulo and\
+                    isinstance(j, Dimension) and j.is_Modulo and\
+                    i.parent is j.parent and i.modulo == j.modulo and\
+                    (i.offset - j.offset) % i.modulo:
+                return True
+        return False
+
+    def depends(self, expr):
+        """
+        True if ``expr`` is a unit-stride function of the vectorized Dimension,
+        False if it's invariant. Raise VectorizationError otherwise.
+        """
+        dims = {i for i in expr.free_symbols
+                if isinstance(i, Dimension) and i.root is self.dim.root}
+        if not dims:
+            return False
+        if dims != {self.dim} or self.dim in (expr - self.dim).free_symbols:
+            raise VectorizationError
+        return True
+
+    def access(self, indexed):
+        """
+        Return the vector of values accessed by ``indexed``, that is either a
+        load (unit-stride access) or a broadcast (invariant access).
+        """
+        if indexed.function.dtype != self.dtype:
+            raise VectorizationError
+        if any(self.depends(i) for i in indexed.indices[:-1]):
+            raise VectorizationError
+        if not self.depends(indexed.indices[-1]):
+            return self.broadcast(indexed)
+
+        key = (indexed.function, ccode(indexed, dtype=self.dtype))
+        if key not in self.loads:
+            row, offset = self.row(indexed)
+            if row in self.rows:
+                lower, names = self.rows[row]
+                n, shift = divmod(int(offset) - lower, self.vl)
+                if shift == 0:
+                    self.loads[key] = names[n]
+                    return names[n]
+                load = self.shift(names[n], names[n + 1], shift)
+            else:
+                load = self.intrinsic('loadu', '&%s' % key[1])
+            name = 'vload%d' % self.nloads
+            self.nloads += 1
+            self.body.append(Element(c.Initializer(c.Value(self.vtype, name), load)))
+            self.loads[key] = name
+        return self.loads[key]
+
+    def store(self, indexed, value):
+        if indexed.function.dtype != self.dtype or not self.depends(indexed.indices[-1]):
+            raise VectorizationError
+        if any(self.depends(i) for i in indexed.indices[:-1]):
+            raise VectorizationError
+        self.loads = OrderedDict((k, v) for k, v in self.loads.items()
+                                 if k[0] is not indexed.function)
+        address = '&%s' % ccode(indexed, dtype=self.dtype)
+        self.body.append(Element(c.Statement(self.intrinsic('storeu', address, value))))
+
+    def declare(self, symbol, value):
+        self.body.append(Element(c.Initializer(c.Value(self.vtype, symbol.name), value)))
+        self.temps.add(symbol.name)
+
+    def visit(self, expr):
+        if expr.is_Number:
+            return self.broadcast(expr)
+        elif expr.is_Symbol:
+            if expr.name in self.temps:
+                return expr.name
+            elif self.depends(expr):
+                # The iteration variable itself can't be used as a value
+                raise VectorizationError
+            return self.broadcast(expr)
+        elif expr.is_Indexed:
+            return self.access(expr)
+        elif expr.is_Add:
+            return reduce(lambda a, b: self.intrinsic('add', a, b),
+                          [self.visit(i) for i in expr.args])
+        elif expr.is_Mul:
+            return reduce(lambda a, b: self.intrinsic('mul', a, b),
+                          [self.visit(i) for i in expr.args])
+        elif expr.is_Pow and expr.exp.is_Integer and 0 < abs(expr.exp) <= 4:
+            base = self.visit(expr.base)
+            value = reduce(lambda a, b: self.intrinsic('mul', a, b),
+                           [base]*abs(int(expr.exp)))
+            if expr.exp < 0:
+                value = self.intrinsic('div', self.broadcast(1.), value)
+            return value
+        else:
+            raise VectorizationError
+
+
+class Vectorizer(object):
+
+    """
+    Turn the innermost Vectorizable Iterations into loops of explicit SIMD
+    intrinsics, followed by a scalar remainder loop. The instruction set (SSE,
+    AVX/AVX2 or AVX-512) is chosen based on the SIMD register size of the target
+    Platform.
+
+    Only Iterations whose body performs additions, multiplications and integer
+    powers over unit-stride or loop-invariant accesses are vectorized. All others
+    are left to the backend compiler.
+    """
+
+    isas = ('sse', 'avx', 'avx2', 'avx512')
+
+    lang = {
+        16: ('__m128', '_mm'),
+        32: ('__m256', '_mm256'),
+        64: ('__m512', '_mm512')
+    }
+    """
+    The vector type and the intrinsics prefix for each SIMD register size.
+    """
+
+    header = 'immintrin.h'
+
+    rotations = ('sse', 'avx2', 'avx512')
+    """
+    The ISAs providing the cross-register shifts for the rotation of registers
+    (see ``SimdKernel.rotate``).
+    """
+
+    def __init__(self, platform):
+        self.platform = platform
+
+    def make_simd(self, iteration):
+        """
+        Return a 2-tuple ``(vector, remainder)`` of Iterations equivalent to
+        ``iteration``, or None if ``iteration`` cannot be vectorized. If some
+        registers are rotated, ``vector`` is a Conditional embedding their
+        declarations and the vector Iteration.
+        """
+        if self.platform.isa not in self.isas:
+            return None
+        if iteration.uindices or iteration.step != 1:
+            return None
+
+        # Only sequences of Expressions can be vectorized
+        nodes = FindNodes(Node).visit(iteration.nodes)
+        if not all(i.is_Expression and not i.is_ForeignExpression or
+                   i.is_ExpressionBundle or type(i) is List for i in nodes):
+            return None
+        exprs = FindNodes(Expression).visit(iteration.nodes)
+        dtypes = {i.dtype for i in exprs}
+        if len(dtypes) != 1 or dtypes.pop() not in (np.float32, np.float64):
+            return None
+        dtype = exprs[0].dtype
+
+        vl = self.platform.simd_items_per_reg(dtype)
+        vtype, prefix = self.lang[self.platform.simd_reg_size]
+        if dtype == np.float64:
+            vtype = '%sd' % vtype
+        kernel = SimdKernel(iteration.dim, dtype, vl, vtype, prefix)
+        _min, _max = iteration.symbolic_min, iteration.symbolic_max
+        if self.platform.isa in self.rotations:
+            prologue = kernel.rotate(exprs, _min, self.platform.simd_reg_count)
+        else:
+            prologue = []
+        try:
+            for e in exprs:
+                lhs, rhs = e.expr.args
+                value = kernel.visit(rhs)
+                if lhs.is_Indexed:
+                    if e.is_Increment:
+                        value = kernel.intrinsic('add', kernel.access(lhs), value)
+                    kernel.store(lhs, value)
+                elif e.is_scalar_assign:
+                    # Scalar assignments are declared inline, hence local to
+                    # the Iteration body
+                    kernel.declare(lhs, value)
+                else:
+                    return None
+        except VectorizationError:
+            return None
+
+        overrun = kernel.overrun
+        vector = iteration._rebuild(kernel.body + kernel.epilogue,
+                                    limits=(_min, _max - (vl - 1) - overrun, vl),
+                                    offsets=(0, 0))
+        if prologue:
+            # The vector loop runs at least once iff this condition holds, which
+            # in turn keeps the loads ahead of the loop within bounds
+            vector = Conditional(_max - _min + 1 >= vl + overrun, prologue + [vector])
+        # Note: besides computing the remainder, the scalar Iteration keeps the
+        # symbols hidden in the intrinsics visible to the IET analyses
+        if overrun:
+            _min = Max(_max - overrun - Mod(_max - _min + 1 - overrun, vl) + 1, _min)
+        else:
+            _min = _max - Mod(_max - _min + 1, vl) + 1
+        remainder = iteration._rebuild(limits=(_min, _max, 1), offsets=(0, 0))
+
+        return vector, remainder
@@ -0,0 +1,215 @@
+"""
+A lean representation of JIT-compiled Operators.
+
+Pickling an Operator implies pickling its entire symbolic representation
+(equations, IET, ...), so unpickling it, for example on the workers of a
+distributed task scheduler, may take seconds of SymPy reconstruction. An
+ExecutableOperator only carries what is strictly necessary to run the generated
+code: the shared object, the C signature of the parameters, and a few numbers
+describing the default runtime arguments and their legal values.
+"""
+
+from collections import OrderedDict
+from ctypes import POINTER, Structure, byref, c_double, c_int, c_void_p
+
+from cached_property import cached_property
+import numpy as np
+
+from devito.compiler import get_jit_dir, load, save
+from devito.exceptions import InvalidArgument
+from devito.logger import perf
+from devito.types.dense import DiscreteFunction
+
+__all__ = ['ExecutableOperator']
+
+
+class ExecutableOperator(object):
+
+    """
+    A self-contained, JIT-compiled Operator, which can be executed without ever
+    touching its symbolic representation.
+
+    ExecutableOperators are built through ``Operator.executable``.
+
+    Parameters
+    ----------
+    name : str
+        The name of the C function to be called.
+    soname : str
+        Name of the shared object (w/o the suffix).
+    binary : bytes
+        The shared object.
+    compiler : Compiler
+        The toolchain used for JIT compilation.
+    parameters : list of (str, str)
+        The name and kind -- 'array', 'scalar' or 'timer' -- of each parameter
+        of the C function.
+    arrays : dict
+        The expected layout of each array parameter, that is its shape, its dtype,
+        and the metadata of the corresponding C struct.
+    scalars : dict
+        The ctype and the default value of each scalar parameter.
+    bounds : dict
+        The legal range, as a (lower, upper) 2-tuple, of the iteration bounds.
+        None stands for unbounded.
+    aliases : dict
+        The names through which the scalar parameters may be overridden
+        (e.g., `x_M`, but also `x` for `x_M`).
+    sections : list of str
+        The profiled sections.
+
+    Notes
+    -----
+    All array parameters must be provided at each call, as the data is never
+    carried by an ExecutableOperator. The arrays are modified in place. Their
+    shape and dtype must match those of the arrays used to build the
+    ExecutableOperator.
+    """
+
+    def __init__(self, name, soname, binary, compiler, parameters, arrays, scalars,
+                 bounds, aliases, sections):
+        self.name = name
+        self.soname = soname
+        self.binary = binary
+        self.compiler = compiler
+        self.parameters = parameters
+        self.arrays = arrays
+        self.scalars = scalars
+        self.bounds = bounds
+        self.aliases = aliases
+        self.sections = sections
+        self._cfunction = None
+
+    def __repr__(self):
+        return "ExecutableOperator[%s]<%s>" % (self.name, self.soname)
+
+    @property
+    def cfunction(self):
+        """The JIT-compiled C function as a ctypes.FuncPtr object."""
+        if self._cfunction is None:
+            sofile = get_jit_dir().joinpath(self.soname).with_suffix(self.compiler.so_ext)
+            if not sofile.is_file():
+                save(self.soname, self.binary, self.compiler)
+            # Note: indexing, unlike attribute access, gives a new function
+            # pointer, whose `argtypes` we are free to set
+            self._cfunction = load(self.soname)[self.name]
+            argtypes = []
+            for k, kind in self.parameters:
+                if kind == 'array':
+                    argtypes.append(DiscreteFunction._C_ctype)
+                elif kind == 'scalar':
+                    argtypes.append(self.scalars[k][0])
+                else:
+                    argtypes.append(POINTER(self._timer_type))
+            self._cfunction.argtypes = argtypes
+        return self._cfunction
+
+    @cached_property
+    def _timer_type(self):
+        return type('profiler', (Structure,), {'_fields_': [(i, c_double)
+                                                            for i in self.sections]})
+
+    def arguments(self, **kwargs):
+        """
+        Arguments to run the ExecutableOperator.
+
+        Raises
+        ------
+        InvalidArgument
+            If any of the runtime arguments is missing or illegal.
+        """
+        args = OrderedDict((k, v) for k, (_, v) in self.scalars.items())
+        for k, v in kwargs.items():
+            if k in self.arrays:
+                layout = self.arrays[k]
+                if (not isinstance(v, np.ndarray) or v.shape != layout['shape'] or
+                        v.dtype != np.dtype(layout['dtype'])):
+                    raise InvalidArgument("Expected array of shape %s and dtype %s "
+                                          "for `%s`" % (layout['shape'],
+                                                        layout['dtype'], k))
+                args[k] = v
+            elif k in self.aliases:
+                args[self.aliases[k]] = v
+            else:
+                raise InvalidArgument("Unrecognized argument %s=%s" % (k, v))
+
+        # Sanity check
+        missing = [k for k in self.arrays if k not in args]
+        if missing:
+            raise InvalidArgument("No runtime value for %s" % missing)
+        for k, (lower, upper) in self.bounds.items():
+            if (lower is not None and args[k] < lower) or \
+                    (upper is not None and args[k] > upper):
+                raise InvalidArgument("OOB detected due to %s=%d" % (k, args[k]))
+
+        # Turn arguments into a format suitable for the generated code
+        timer = byref(self._timer_type())
+        arg_values = []
+        for k, kind in self.parameters:
+            if kind == 'array':
+                arg_values.append(make_dataobj(args[k], self.arrays[k]))
+            elif kind == 'scalar':
+                arg_values.append(self.scalars[k][0](args[k]))
+            else:
+                arg_values.append(timer)
+
+        return arg_values, timer
+
+    def apply(self, **kwargs):
+        """
+        Execute the ExecutableOperator.
+
+        Parameters
+        ----------
+        **kwargs
+            The arrays, by name, as well as overrides for the default values of
+            the scalar parameters (e.g., ``time_M=10``).
+
+        Returns
+        -------
+        OrderedDict
+            The execution time of each profiled section.
+        """
+        arg_values, timer = self.arguments(**kwargs)
+
+        self.cfunction(*arg_values)
+
+        timings = OrderedDict((i, getattr(timer._obj, i)) for i in self.sections)
+        perf("ExecutableOperator `%s` run in %.2f s" % (self.name, sum(timings.values())))
+
+        return timings
+
+    def __call__(self, **kwargs):
+        return self.apply(**kwargs)
+
+    # Pickling support
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['_cfunction'] = None
+        state.pop('_timer_type', None)
+        return state
+
+
+def make_dataobj(data, layout):
+    """Build the C struct representing an array parameter."""
+    ndim = data.ndim
+    dataobj = byref(DiscreteFunction._C_ctype._type_())
+    dataobj._obj.data = data.ctypes.data_as(c_void_p)
+    dataobj._obj.size = (c_int*ndim)(*data.shape)
+    dataobj._obj.npsize = (c_int*ndim)(*layout['npsize'])
+    dataobj._obj.dsize = (c_int*ndim)(*layout['dsize'])
+    dataobj._obj.hsize = (c_int*(ndim*2))(*layout['hsize'])
+    dataobj._obj.hofs = (c_int*(ndim*2))(*layout['hofs'])
+    dataobj._obj.oofs = (c_int*(ndim*2))(*layout['oofs'])
+    return dataobj
+
+
+def read_dataobj(dataobj, ndim):
+    """The metadata carried by the C struct representing an array parameter."""
+    obj = dataobj._obj
+    return {'npsize': [obj.npsize[i] for i in range(ndim)],
+            'dsize': [obj.dsize[i] for i in range(ndim)],
+            'hsize': [obj.hsize[i] for i in range(ndim*2)],
+            'hofs': [obj.hofs[i] for i in range(ndim*2)],
+            'oofs': [obj.oofs[i] for i in range(ndim*2)]}
@@ -225,7 +225,9 @@ class Element(Node):
             return self.element.vdecl
 
         if isinstance(self.element, c.Assign):
-            return self.element.lvalue
+            # Plain strings (e.g., the rotated SIMD registers) define no symbols
+            if not isinstance(self.element.lvalue, str):
+                return self.element.lvalue
 
         return []
 
@@ -678,6 +680,20 @@ class TimedList(List):
                                "(double)(end_%(ln)s.tv_sec-start_%(ln)s.tv_sec)+" +
                                "(double)(end_%(ln)s.tv_usec-start_%(ln)s.tv_usec)" +
                                "/1000000") % {'gn': timer.name, 'ln': lname})]
+        if timer.ntraces:
+            # Also record the start time and the duration of this execution
+            mapper = {'gn': timer.name, 'ln': lname, 'n': timer.sections.index(lname)}
+            mapper['entry'] = ("%(gn)s->traces[2*(%(gn)s->ntraces*%(n)d + "
+                               "%(gn)s->%(ln)s_ntraces)" % mapper)
+            record = [c.Statement(("%(entry)s] = (double)start_%(ln)s.tv_sec+" +
+                                   "(double)start_%(ln)s.tv_usec/1000000") % mapper),
+                      c.Statement(("%(entry)s + 1] = " +
+                                   "(double)(end_%(ln)s.tv_sec-start_%(ln)s.tv_sec)+" +
+                                   "(double)(end_%(ln)s.tv_usec-start_%(ln)s.tv_usec)" +
+                                   "/1000000") % mapper)]
+            footer.extend([c.If("%(gn)s->%(ln)s_ntraces < %(gn)s->ntraces" % mapper,
+                                c.Block(record)),
+                           c.Statement("%(gn)s->%(ln)s_ntraces += 1" % mapper)])
         super(TimedList, self).__init__(header, body, footer)
 
     @property
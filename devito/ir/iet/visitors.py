@@ -17,8 +17,8 @@ from devito.tools import GenericVisitor, as_tuple, filter_sorted, flatten, dtype
 
 
 __all__ = ['FindNodes', 'FindSections', 'FindSymbols', 'MapSections', 'MapNodes',
-           'IsPerfectIteration', 'XSubs', 'printAST', 'CGen', 'Transformer',
-           'FindAdjacent']
+           'IsPerfectIteration', 'XSubs', 'printAST', 'CGen', 'CGenUnits',
+           'Transformer', 'FindAdjacent']
 
 
 class Visitor(GenericVisitor):
@@ -311,34 +311,75 @@ class CGen(Visitor):
         return c.Collection(body)
 
     def visit_Operator(self, o):
-        # Kernel signature and body
-        body = flatten(self._visit(i) for i in o.children)
-        decls = self._args_decl(o.parameters)
-        signature = c.FunctionDeclaration(c.Extern("C", c.Value(o.retval, o.name)), decls)
-        retval = [c.Statement("return 0")]
-        kernel = c.FunctionBody(signature, c.Block(body + retval))
+        kernel = self._operator_kernel(o)
 
         # Elemental functions
-        esigns = []
+        esigns = self._operator_esigns(o)
         efuncs = [blankline]
         for i in o._func_table.values():
             if i.local:
-                esigns.append(c.FunctionDeclaration(c.Value(i.root.retval, i.root.name),
-                                                    self._args_decl(i.root.parameters)))
                 efuncs.extend([i.root.ccode, blankline])
 
-        # Header files, extra definitions, ...
+        return c.Module(self._operator_preamble(o, o.parameters) +
+                        esigns + [blankline, kernel] + efuncs)
+
+    def _operator_signature(self, o):
+        """The signature of the Operator kernel."""
+        decls = self._args_decl(o.parameters)
+        return c.FunctionDeclaration(c.Extern("C", c.Value(o.retval, o.name)), decls)
+
+    def _operator_kernel(self, o):
+        """The Operator kernel, that is its signature and body."""
+        body = flatten(self._visit(i) for i in o.children)
+        retval = [c.Statement("return 0")]
+        return c.FunctionBody(self._operator_signature(o), c.Block(body + retval))
+
+    def _operator_esigns(self, o):
+        """The declarations of the local elemental functions of the Operator."""
+        return [c.FunctionDeclaration(c.Value(i.root.retval, i.root.name),
+                                      self._args_decl(i.root.parameters))
+                for i in o._func_table.values() if i.local]
+
+    def _operator_preamble(self, o, parameters):
+        """Header files, extra definitions, ..., required by the Operator."""
         header = [c.Line(i) for i in o._headers]
         includes = [c.Include(i, system=False) for i in o._includes]
         includes += [blankline]
-        cdefs = [i._C_typedecl for i in o.parameters if i._C_typedecl is not None]
+        cdefs = [i._C_typedecl for i in parameters if i._C_typedecl is not None]
         cdefs = filter_sorted(cdefs, key=lambda i: i.tpname)
         if o._compiler.src_ext == 'cpp':
-            cdefs += [c.Extern('C', signature)]
+            cdefs += [c.Extern('C', self._operator_signature(o))]
         cdefs = [i for j in cdefs for i in (j, blankline)]
+        cglobals = [i for j in o._globals for i in (j, blankline)]
+        return header + includes + cdefs + cglobals
 
-        return c.Module(header + includes + cdefs +
-                        esigns + [blankline, kernel] + efuncs)
+
+class CGenUnits(CGen):
+
+    """
+    Return a representation of an Operator as a mapper from names to translation
+    units -- one unit for the Operator kernel, and one unit for each local
+    elemental function. Each translation unit carries its own copy of headers,
+    includes, type definitions and elemental function declarations, so that
+    the units may be compiled independently of each other.
+    """
+
+    def visit_Operator(self, o):
+        parameters = list(o.parameters)
+        for i in o._func_table.values():
+            if i.local:
+                parameters.extend(i.root.parameters)
+        preamble = self._operator_preamble(o, parameters)
+        esigns = self._operator_esigns(o)
+
+        units = OrderedDict()
+        units[o.name] = c.Module(preamble + esigns + [blankline,
+                                                      self._operator_kernel(o)])
+        for i in o._func_table.values():
+            if i.local:
+                units[i.root.name] = c.Module(preamble + esigns + [blankline,
+                                                                   i.root.ccode])
+        return units
 
 
 class FindSections(Visitor):
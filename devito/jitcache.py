@@ -0,0 +1,164 @@
+"""
+A content-addressed cache of JIT-compiled shared objects, which may be shared
+by many processes running on many nodes.
+
+The cache lives in ``configuration['jit-cache-dir']``, typically a location on a
+parallel file system. Shared objects are stored by a hash of the source code and
+of the compiler command line, so that any process JIT-compiling the very same
+code with the very same toolchain can simply map the already available shared
+object. Only one process compiles a given shared object, while the others wait
+on a file lock rather than spinning.
+
+Shared objects are published through atomic renames, so readers never see
+partially written files. An index file keeps track of size and last use of
+each entry; when the cache exceeds ``configuration['jit-cache-size']`` MBs, the
+least recently used entries are evicted.
+"""
+
+from contextlib import contextmanager
+from hashlib import sha1
+from pathlib import Path
+from time import time
+import json
+import os
+import shutil
+import socket
+
+from devito.logger import debug, warning
+from devito.parameters import configuration
+from devito.tools import lock_file
+
+__all__ = ['JITCache', 'get_jit_cache']
+
+
+class JITCache(object):
+
+    """
+    A content-addressed, multi-process cache of shared objects.
+
+    Parameters
+    ----------
+    path : str
+        The cache directory.
+    maxsize : int, optional
+        The cache capacity, in MBs. If 0 (default), the cache may grow indefinitely.
+    """
+
+    _index = 'index.json'
+    _suffix = 'so'
+
+    def __init__(self, path, maxsize=0):
+        self.path = Path(path)
+        self.maxsize = maxsize*1024**2
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def key(self, code, compiler):
+        """The content hash for ``code`` JIT-compiled by ``compiler``."""
+        items = [code, str(compiler.version)] + compiler._cmdline([])
+        return sha1(''.join(items).encode()).hexdigest()
+
+    def _locked(self, name, blocking=True):
+        return lock_file(self.path.joinpath('%s.lock' % name), blocking)
+
+    @contextmanager
+    def lock(self, key):
+        """Grant exclusive access to the entry ``key``."""
+        with self._locked(key):
+            yield
+
+    def _publish(self, src, dest):
+        # Write to a process-private temporary file and then atomically rename
+        tmp = '%s.%s.%d.tmp' % (dest.name, socket.gethostname(), os.getpid())
+        tmp = dest.with_name(tmp)
+        shutil.copyfile(str(src), str(tmp))
+        os.replace(str(tmp), str(dest))
+
+    def _update_index(self, key, size=None, evict=False):
+        """
+        Update the entry ``key`` in the index, then evict the least recently used
+        entries if the cache is over capacity.
+        """
+        with self._locked(self._index):
+            path = self.path.joinpath(self._index)
+            try:
+                with open(str(path), 'r') as f:
+                    index = json.load(f)
+            except (FileNotFoundError, ValueError):
+                index = {}
+
+            entry = index.setdefault(key, {'size': 0})
+            if size is not None:
+                entry['size'] = size
+            entry['atime'] = time()
+
+            if evict and self.maxsize > 0:
+                total = sum(i['size'] for i in index.values())
+                for k in sorted(index, key=lambda i: index[i]['atime']):
+                    if total <= self.maxsize:
+                        break
+                    elif k == key:
+                        continue
+                    try:
+                        # An entry in use (e.g., being written or fetched by
+                        # another process) is not evicted
+                        with self._locked(k, blocking=False):
+                            try:
+                                self.path.joinpath('%s.%s' % (k, self._suffix)).unlink()
+                            except FileNotFoundError:
+                                pass
+                    except BlockingIOError:
+                        continue
+                    total -= index.pop(k)['size']
+                    debug("JITCache: evicted `%s`" % k)
+
+            tmp = path.with_name('%s.%d.tmp' % (path.name, os.getpid()))
+            with open(str(tmp), 'w') as f:
+                json.dump(index, f)
+            os.replace(str(tmp), str(path))
+
+    def fetch(self, key, sofile):
+        """
+        Make the shared object ``key``, if in the cache, available as ``sofile``.
+
+        Returns
+        -------
+        bool
+            True on cache hit, False otherwise.
+        """
+        entry = self.path.joinpath('%s.%s' % (key, self._suffix))
+        if not entry.is_file():
+            return False
+
+        # Simply link the cached shared object, so that it's mapped straight
+        # from the cache
+        sofile = Path(sofile)
+        tmp = sofile.with_name('%s.%d.tmp' % (sofile.name, os.getpid()))
+        try:
+            tmp.unlink()
+        except FileNotFoundError:
+            pass
+        tmp.symlink_to(entry)
+        os.replace(str(tmp), str(sofile))
+
+        self._update_index(key)
+        debug("JITCache: hit `%s`" % key)
+
+        return True
+
+    def store(self, key, sofile):
+        """Store the shared object ``sofile`` in the cache as ``key``."""
+        try:
+            self._publish(sofile, self.path.joinpath('%s.%s' % (key, self._suffix)))
+            self._update_index(key, size=os.path.getsize(str(sofile)), evict=True)
+        except OSError as e:
+            warning("Couldn't store `%s` in the JIT cache [%s]" % (sofile, e))
+            return
+        debug("JITCache: stored `%s` as `%s`" % (sofile, key))
+
+
+def get_jit_cache():
+    """The JITCache, or None if no ``configuration['jit-cache-dir']`` is set."""
+    path = configuration['jit-cache-dir']
+    if not path:
+        return None
+    return JITCache(path, configuration['jit-cache-size'])
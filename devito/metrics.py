@@ -0,0 +1,198 @@
+"""
+Export the performance metrics of Operator executions to external consumers,
+such as monitoring systems.
+
+Each execution of an Operator produces an :class:`ApplyMetrics` record, which
+is handed over to all registered metrics sinks. No record is produced at all
+when no sink is registered.
+"""
+
+from collections import OrderedDict, namedtuple
+from threading import Lock
+import abc
+import json
+import os
+
+from devito.logger import warning
+
+__all__ = ['ApplyMetrics', 'MetricsSink', 'CallbackSink', 'JSONLinesSink',
+           'PrometheusSink', 'add_metrics_sink', 'remove_metrics_sink']
+
+
+ApplyMetrics = namedtuple('ApplyMetrics', 'operator time sections gflopss gpointss '
+                          'compile_time arguments_time autotuning_time')
+"""
+The performance metrics of an Operator execution: the name of the Operator,
+the time spent in the generated code, the time spent in each profiled section,
+the achieved GFlops/s and GPts/s (None unless available from an advanced
+profiling level), and the time spent in JIT compilation, in processing the
+runtime arguments and in autotuning.
+"""
+
+
+class MetricsSink(object):
+
+    """
+    Abstract base class for a consumer of :class:`ApplyMetrics`.
+
+    Sinks may be invoked concurrently, e.g. by ``Operator.apply_batch``, so
+    they must be thread-safe.
+    """
+
+    @abc.abstractmethod
+    def __call__(self, metrics):
+        """Consume the :class:`ApplyMetrics` of an Operator execution."""
+        return
+
+
+class CallbackSink(MetricsSink):
+
+    """
+    A metrics sink forwarding each :class:`ApplyMetrics` to a user-provided
+    callable.
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def __call__(self, metrics):
+        self.callback(metrics)
+
+
+class JSONLinesSink(MetricsSink):
+
+    """
+    A metrics sink appending each :class:`ApplyMetrics`, as a JSON object, to
+    a file. One line per Operator execution.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._lock = Lock()
+
+    def __call__(self, metrics):
+        line = json.dumps(metrics._asdict())
+        with self._lock:
+            with open(self.filename, 'a') as f:
+                f.write(line + '\n')
+
+
+class PrometheusSink(MetricsSink):
+
+    """
+    A metrics sink maintaining a file in the Prometheus text exposition format,
+    e.g. for the textfile collector of the Prometheus node exporter. The file is
+    atomically rewritten after each Operator execution.
+
+    The counters are accumulated over all executions, while the gauges carry the
+    values of the most recent execution. All samples are labelled with the name
+    of the Operator.
+    """
+
+    metrics = OrderedDict([
+        ('devito_apply_total', ('counter', "Number of Operator executions")),
+        ('devito_apply_seconds_total', ('counter', "Time spent in the generated code")),
+        ('devito_section_seconds_total', ('counter', "Time spent in each section")),
+        ('devito_compile_seconds_total', ('counter', "Time spent in JIT compilation")),
+        ('devito_arguments_seconds_total', ('counter',
+                                            "Time spent processing runtime arguments")),
+        ('devito_autotuning_seconds_total', ('counter', "Time spent autotuning")),
+        ('devito_gflopss', ('gauge', "GFlops/s achieved by the last execution")),
+        ('devito_gpointss', ('gauge', "GPts/s achieved by the last execution")),
+    ])
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._samples = OrderedDict([(i, OrderedDict()) for i in self.metrics])
+        self._lock = Lock()
+
+    def __call__(self, metrics):
+        labels = (('operator', metrics.operator),)
+        with self._lock:
+            self._inc('devito_apply_total', labels, 1)
+            self._inc('devito_apply_seconds_total', labels, metrics.time)
+            for k, v in metrics.sections.items():
+                self._inc('devito_section_seconds_total', labels + (('section', k),), v)
+            self._inc('devito_compile_seconds_total', labels, metrics.compile_time)
+            self._inc('devito_arguments_seconds_total', labels, metrics.arguments_time)
+            self._inc('devito_autotuning_seconds_total', labels,
+                      metrics.autotuning_time)
+            if metrics.gflopss is not None:
+                self._samples['devito_gflopss'][labels] = metrics.gflopss
+            if metrics.gpointss is not None:
+                self._samples['devito_gpointss'][labels] = metrics.gpointss
+            self._write()
+
+    def _inc(self, metric, labels, value):
+        samples = self._samples[metric]
+        samples[labels] = samples.get(labels, 0) + value
+
+    def _write(self):
+        lines = []
+        for metric, (kind, doc) in self.metrics.items():
+            samples = self._samples[metric]
+            if not samples:
+                continue
+            lines.append('# HELP %s %s' % (metric, doc))
+            lines.append('# TYPE %s %s' % (metric, kind))
+            for labels, value in samples.items():
+                labels = ','.join('%s="%s"' % i for i in labels)
+                lines.append('%s{%s} %s' % (metric, labels, repr(float(value))))
+        tmp = '%s.%d.tmp' % (self.filename, os.getpid())
+        with open(tmp, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp, self.filename)
+
+
+metrics_sinks = []
+"""The registered metrics sinks."""
+
+
+def add_metrics_sink(sink):
+    """
+    Register a metrics sink.
+
+    Parameters
+    ----------
+    sink : MetricsSink or callable
+        The metrics sink. A callable is wrapped into a :class:`CallbackSink`.
+
+    Returns
+    -------
+    MetricsSink
+        The registered metrics sink, which may be used to unregister it.
+
+    Examples
+    --------
+    >>> from devito import Eq, Grid, TimeFunction, Operator
+    >>> records = []
+    >>> sink = add_metrics_sink(records.append)
+    >>> grid = Grid(shape=(4, 4))
+    >>> u = TimeFunction(name='u', grid=grid)
+    >>> op = Operator(Eq(u.forward, u + 1))
+    >>> summary = op.apply(time_M=2)
+    >>> records[-1].operator
+    'Kernel'
+    >>> remove_metrics_sink(sink)
+    """
+    if not isinstance(sink, MetricsSink):
+        sink = CallbackSink(sink)
+    metrics_sinks.append(sink)
+    return sink
+
+
+def remove_metrics_sink(sink):
+    """Unregister a metrics sink."""
+    metrics_sinks.remove(sink)
+
+
+def emit_metrics(metrics):
+    """
+    Hand over an :class:`ApplyMetrics` to all registered metrics sinks. A
+    failing sink only results in a warning, and never affects the execution.
+    """
+    for sink in list(metrics_sinks):
+        try:
+            sink(metrics)
+        except Exception as e:
+            warning("Metrics sink `%s` failed: %s" % (sink, e))
@@ -5,18 +5,21 @@ from functools import reduce
 from itertools import product
 from operator import mul
 
+import cgen as c
+import numpy as np
 from cached_property import cached_property
 from sympy import Integer
 
+from devito.cgen_utils import ccode
 from devito.data import CORE, OWNED, HALO, NOPAD, LEFT, CENTER, RIGHT, default_allocator
 from devito.ir.equations import DummyEq
-from devito.ir.iet import (Call, Callable, Conditional, Expression, ExpressionBundle,
-                           Iteration, LocalExpression, List, Prodder, PARALLEL,
-                           make_efunc, FindNodes, Transformer)
+from devito.ir.iet import (Call, Callable, Conditional, Element, Expression,
+                           ExpressionBundle, Iteration, LocalExpression, List, Prodder,
+                           PARALLEL, make_efunc, FindNodes, Transformer)
 from devito.mpi import MPI
 from devito.symbolics import (Byref, CondNe, FieldFromPointer, FieldFromComposite,
                               IndexedPointer, Macro)
-from devito.tools import dtype_to_mpitype, dtype_to_ctype, flatten
+from devito.tools import dtype_to_cstr, dtype_to_mpitype, dtype_to_ctype, flatten
 from devito.types import Array, Dimension, Symbol, LocalObject, CompositeObject
 
 __all__ = ['HaloExchangeBuilder']
@@ -28,7 +31,7 @@ class HaloExchangeBuilder(object):
     Build IET-based routines to implement MPI halo exchange.
     """
 
-    def __new__(cls, mode='basic'):
+    def __new__(cls, mode='basic', timer=None):
         if mode is True or mode == 'basic':
             obj = object.__new__(BasicHaloExchangeBuilder)
         elif mode == 'diag':
@@ -45,11 +48,29 @@ class HaloExchangeBuilder(object):
         obj._regions = OrderedDict()
         obj._msgs = OrderedDict()
         obj._efuncs = []
+        obj._timer = timer
         return obj
 
     @property
     def efuncs(self):
-        return self._efuncs
+        if self._timer is None:
+            return self._efuncs
+
+        # Instrument the MPI routines for communication profiling
+        timed = self._timed_efuncs
+        efuncs = []
+        for efunc in self._efuncs:
+            mapper = {}
+            for i in FindNodes(Call).visit(efunc):
+                if i.name in timed:
+                    mapper[i] = i._rebuild(arguments=i.arguments + (self._timer,))
+                elif i.name in mpi_timed:
+                    mapper[i] = self._make_timed_call(i)
+            efunc = Transformer(mapper).visit(efunc)
+            if efunc.name in timed:
+                efunc = efunc._rebuild(parameters=efunc.parameters + (self._timer,))
+            efuncs.append(efunc)
+        return efuncs
 
     @property
     def msgs(self):
@@ -112,8 +133,81 @@ class HaloExchangeBuilder(object):
         if remainder is not None:
             body.append(self._call_remainder(remainder))
 
+        # Instrument the HaloSpot for communication profiling
+        if self._timer is not None:
+            body = self._make_timed(hs, key, body)
+
         return List(body=body)
 
+    @property
+    def _timed_efuncs(self):
+        """
+        The names of the Callables performing MPI communications, either
+        directly or through other Callables.
+        """
+        efuncs = {i.name: FindNodes(Call).visit(i) for i in self._efuncs}
+        timed = set()
+        while True:
+            found = {k for k, v in efuncs.items() if k not in timed and
+                     any(i.name in timed or i.name in mpi_timed for i in v)}
+            if not found:
+                return timed
+            timed.update(found)
+
+    def _make_timed(self, hs, key, body):
+        """
+        Wrap the HaloSpot ``body`` so that the halo exchange is timed. The time
+        spent in the halo updates and waits is not overlapped with computation.
+        """
+        timer = self._timer
+        timer.comm = list(hs.fmapper)[0].grid.distributor.comm
+        index = len(timer.halospots)
+        timer.halospots.append('halospot%d' % key)
+
+        timed = self._timed_efuncs
+        updates = [i for i in body if i.is_Call and i.name.startswith('haloupdate')]
+        waits = [i for i in body if i.is_Call and i.name.startswith('halowait')]
+        others = [i for i in body if i not in updates + waits]
+        updates = [i._rebuild(arguments=i.arguments + (timer,)) if i.name in timed
+                   else i for i in updates]
+        waits = [i._rebuild(arguments=i.arguments + (timer,)) if i.name in timed
+                 else i for i in waits]
+
+        tic = lambda *m: [Element(c.Statement('%s -= MPI_Wtime()' % timer._C_metric(i)))
+                          for i in m]
+        toc = lambda *m: [Element(c.Statement('%s += MPI_Wtime()' % timer._C_metric(i)))
+                          for i in m]
+
+        ret = [Element(c.Statement('%s->current = %d' % (timer.name, index)))]
+        ret.extend(tic('span', 'exposed') + updates + toc('exposed'))
+        ret.append(others.pop(0))  # The computation over the CORE region
+        if waits:
+            ret.extend(tic('exposed') + waits + toc('exposed'))
+        ret.extend(toc('span') + others)
+        return ret
+
+    def _make_timed_call(self, call):
+        """
+        Instrument a Call to ``MPI_Isend``, ``MPI_Irecv`` or ``MPI_Wait``
+        updating the communication counters of the current HaloSpot.
+        """
+        timer = self._timer
+        if call.name == 'MPI_Wait':
+            return List(header=c.Statement('%s -= MPI_Wtime()' % timer._C_metric('wait')),
+                        body=call,
+                        footer=c.Statement('%s += MPI_Wtime()' % timer._C_metric('wait')))
+        else:
+            buf, count, datatype, rank = call.arguments[:4]
+            kind = 'sent' if call.name == 'MPI_Isend' else 'recv'
+            nbytes = '(%s)*sizeof(%s)' % (ccode(count), mpitype_to_cstr[str(datatype)])
+            msgs = timer._C_metric('msgs_%s' % kind)
+            bytes = timer._C_metric('bytes_%s' % kind)
+            update = [Element(c.Statement('%s += 1' % msgs)),
+                      Element(c.Statement('%s += %s' % (bytes, nbytes)))]
+            # No actual communication takes place with MPI.PROC_NULL
+            return List(body=[call, Conditional(CondNe(rank, Macro('MPI_PROC_NULL')),
+                                                update)])
+
     @abc.abstractmethod
     def _make_region(self, hs, key):
         """
@@ -813,6 +907,14 @@ class FullHaloExchangeBuilder(Overlap2HaloExchangeBuilder):
         return Prodder(poke.name, poke.parameters, single_thread=True, periodic=True)
 
 
+mpi_timed = ('MPI_Isend', 'MPI_Irecv', 'MPI_Wait')
+"""The MPI routines instrumented for communication profiling."""
+
+mpitype_to_cstr = {dtype_to_mpitype(i): dtype_to_cstr(i)
+                   for i in [np.int32, np.float32, np.int64, np.float64]}
+"""Map MPI datatypes to C types."""
+
+
 class MPIStatusObject(LocalObject):
 
     dtype = type('MPI_Status', (c_void_p,), {})
@@ -0,0 +1,225 @@
+"""
+A persistent, on-disk cache for lowered Operators.
+
+Building an Operator requires running the entire lowering pipeline (clustering,
+DSE, schedule tree and IET construction, DLE, ...), which for large stencils
+may take tens of seconds. The Operator cache stores the outcome of the lowering
+pipeline on disk, so that any other process building the very same Operator can
+skip it altogether.
+
+The cache key is derived from a canonical representation of the input
+expressions, from the objects they use, from the `configuration` and from the
+DSE/DLE modes. The user-provided objects carrying data (e.g., Functions,
+Constants) are never stored in the cache: they are replaced with references by
+name, which are resolved upon loading against the objects used by the
+Operator being built. Once the cache exceeds `configuration['operator-cache-size']`
+MBs, the least recently used entries are evicted.
+"""
+
+from io import BytesIO
+from pathlib import Path
+import os
+import pickle
+
+import cloudpickle
+
+from devito.jitcache import JITCache
+from devito.logger import debug, warning
+from devito.parameters import configuration
+from devito.symbolics import retrieve_functions
+from devito.tools import Signer, filter_sorted, flatten, make_tempdir, memoized_func
+from devito.types import Dimension
+
+__all__ = ['opcache_key', 'opcache_load', 'opcache_store']
+
+
+@memoized_func
+def get_default_opcache_dir():
+    """A deterministic temporary directory for cached Operators."""
+    return make_tempdir('opcache')
+
+
+def get_opcache_dir():
+    """
+    The directory for cached Operators, that is ``configuration['operator-cache-dir']``
+    if set, or a deterministic temporary directory otherwise.
+    """
+    path = configuration['operator-cache-dir']
+    if path is None:
+        return get_default_opcache_dir()
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+class OperatorCacheIndex(JITCache):
+
+    """
+    The LRU index of the Operator cache. The entries are tracked and evicted
+    exactly as in the JITCache, though they are pickled Operators rather than
+    shared objects.
+    """
+
+    _suffix = 'pkl'
+
+
+def get_opcache_index():
+    return OperatorCacheIndex(get_opcache_dir(), configuration['operator-cache-size'])
+
+
+def subdomain_key(subdomain):
+    """
+    The content of ``subdomain`` impacting the generated code; that is, beyond
+    its name, the SubDimensions it defines (and therefore their thickness).
+    """
+    if subdomain is None:
+        return None
+    return (subdomain.__class__.__name__, subdomain.name,
+            tuple((d.__class__.__name__, d._hashable_content())
+                  for d in subdomain.dimensions),
+            getattr(subdomain, 'n_domains', None))
+
+
+def carriers(expressions):
+    """
+    Map the names of the user-provided objects carrying data in ``expressions``
+    to the objects themselves.
+    """
+    mapper = {}
+    for e in expressions:
+        for i in retrieve_functions(e):
+            f = i.function
+            mapper[f.name] = f
+            for j in getattr(f, '_sub_functions', ()):
+                sf = getattr(f, j, None)
+                if sf is not None:
+                    mapper[sf.name] = sf
+        for i in e.free_symbols:
+            if getattr(i, 'is_Input', False) and not isinstance(i, Dimension):
+                mapper[i.name] = i
+    return mapper
+
+
+def opcache_key(operator, expressions, **kwargs):
+    """
+    Compute a unique, deterministic key for the Operator ``operator`` built
+    out of ``expressions``.
+    """
+    items = ['%s.%s' % (operator.__class__.__module__, operator.__class__.__name__),
+             str(kwargs.get('name', 'Kernel')),
+             str(sorted((str(k), str(v)) for k, v in kwargs.get('subs', {}).items())),
+             str(kwargs.get('dse', configuration['dse'])),
+             str(kwargs.get('dle', configuration['dle'])),
+             # The profiler is chosen at lowering time, but it doesn't impact jit
+             str(configuration['profiling']),
+             str(configuration['log-level'] == 'DEBUG')]
+
+    for e in expressions:
+        items.extend([e.__class__.__name__, str(e.lhs), str(e.rhs),
+                      str(subdomain_key(e.subdomain)),
+                      str(e.implicit_dims)])
+
+    for f in filter_sorted(carriers(expressions).values(), key=lambda i: i.name):
+        items.append(str((f.__class__.__name__, f.name, f.dtype)))
+        if f.is_Constant:
+            continue
+        items.append(str((f.dimensions, f.shape, f._size_halo, f._size_padding,
+                          getattr(f, 'staggered', None), getattr(f, 'save', None))))
+
+    dimensions = set(flatten(e.free_symbols for e in expressions))
+    dimensions.update(flatten(f.dimensions for f in carriers(expressions).values()
+                              if not f.is_Constant))
+    for d in filter_sorted([i for i in dimensions if isinstance(i, Dimension)],
+                           key=lambda i: i.name):
+        items.append(str((d.__class__.__name__, d._hashable_content())))
+
+    return Signer._digest(configuration, *items)
+
+
+class OperatorPickler(cloudpickle.CloudPickler):
+
+    """Pickle Operators replacing user-provided data carriers with references."""
+
+    def __init__(self, file, carriers):
+        super(OperatorPickler, self).__init__(file)
+        self.carriers = carriers
+
+    def persistent_id(self, obj):
+        try:
+            if self.carriers.get(obj.name) is obj:
+                return obj.name
+        except (AttributeError, TypeError):
+            pass
+        return None
+
+
+class OperatorUnpickler(pickle.Unpickler):
+
+    """Unpickle Operators resolving references to user-provided data carriers."""
+
+    def __init__(self, file, carriers):
+        super(OperatorUnpickler, self).__init__(file)
+        self.carriers = carriers
+
+    def persistent_load(self, pid):
+        try:
+            return self.carriers[pid]
+        except KeyError:
+            raise pickle.UnpicklingError("Couldn't find object `%s`" % pid)
+
+
+def opcache_store(operator, key, expressions):
+    """
+    Store the lowered Operator ``operator`` in the Operator cache.
+
+    The file is written in a temporary location and then atomically moved
+    into the cache, so concurrent readers will never see a partially written
+    entry.
+    """
+    state = dict(operator.__dict__)
+    for i in operator._opcache_exclude:
+        state.pop(i, None)
+
+    try:
+        buf = BytesIO()
+        OperatorPickler(buf, carriers(expressions)).dump(state)
+    except Exception as e:
+        warning("Couldn't store Operator `%s` in the Operator cache [%s]"
+                % (operator.name, e))
+        return
+
+    path = get_opcache_dir().joinpath('%s.pkl' % key)
+    tmp = path.with_suffix('.%d.tmp' % os.getpid())
+    with open(str(tmp), 'wb') as f:
+        f.write(buf.getvalue())
+    os.replace(str(tmp), str(path))
+    get_opcache_index()._update_index(key, size=len(buf.getvalue()), evict=True)
+    debug("Operator `%s` stored in the Operator cache as `%s`" % (operator.name, key))
+
+
+def opcache_load(operator, key, expressions):
+    """
+    Restore the lowered Operator ``operator`` from the Operator cache.
+
+    Returns
+    -------
+    bool
+        True on cache hit, False otherwise.
+    """
+    path = get_opcache_dir().joinpath('%s.pkl' % key)
+    try:
+        with open(str(path), 'rb') as f:
+            state = OperatorUnpickler(f, carriers(expressions)).load()
+    except FileNotFoundError:
+        return False
+    except Exception as e:
+        # E.g., a corrupted or stale entry
+        debug("Couldn't load `%s` from the Operator cache [%s]" % (key, e))
+        return False
+
+    for k, v in state.items():
+        setattr(operator, k, v)
+    get_opcache_index()._update_index(key)
+    debug("Operator `%s` loaded from the Operator cache" % operator.name)
+
+    return True
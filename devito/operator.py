@@ -1,29 +1,40 @@
 from collections import OrderedDict
-from functools import reduce
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy
+from functools import partial, reduce
 from operator import mul
+from os import cpu_count
+from time import time
 
 from cached_property import cached_property
 import ctypes
 
-from devito.compiler import jit_compile, load, save
-from devito.dle import transform
+import numpy as np
+
+from devito.compiler import jit_broadcast, jit_compile, jit_compile_units, load, save
+from devito.dle import NThreads, transform
 from devito.dse import rewrite
 from devito.equation import Eq
 from devito.exceptions import InvalidOperator
+from devito.executable import ExecutableOperator, read_dataobj
 from devito.logger import info, perf, warning
+from devito.metrics import ApplyMetrics, emit_metrics, metrics_sinks
+from devito.mpi import MPI
 from devito.ir.equations import LoweredEq
 from devito.ir.clusters import clusterize
-from devito.ir.iet import (Callable, MetaCall, iet_build, iet_insert_decls,
+from devito.ir.iet import (Callable, CGenUnits, MetaCall, iet_build, iet_insert_decls,
                            iet_insert_casts, derive_parameters)
 from devito.ir.stree import st_build
+from devito.opcache import opcache_key, opcache_load, opcache_store
 from devito.parameters import configuration
-from devito.profiling import create_profile
+from devito.profiling import Timer, create_profile
 from devito.symbolics import indexify
 from devito.tools import (Signer, ReducerMap, as_tuple, flatten, filter_ordered,
-                          filter_sorted, split)
+                          filter_sorted, memoized_func, split)
 from devito.types import Dimension
+from devito.types.args import ArgProvider
 
-__all__ = ['Operator']
+__all__ = ['Operator', 'precompile']
 
 
 class Operator(Callable):
@@ -47,6 +58,10 @@ class Operator(Callable):
         * dle : str
             Aggressiveness of the Devito Loop Engine for loop-level
             optimization. Defaults to ``configuration['dle']``.
+        * respecializable : bool
+            If True, keep track of the IET before specialization, so that the
+            Operator may later be respecialized through :meth:`respecialize`.
+            Defaults to False.
 
     Examples
     --------
@@ -128,6 +143,17 @@ class Operator(Callable):
     _default_includes = ['stdlib.h', 'math.h', 'sys/time.h']
     _default_globals = []
 
+    _opcache = True
+    """True if the lowered Operator may be stored in the persistent Operator cache."""
+
+    _opcache_exclude = ('_args', '_compiler', '_lib', '_cfunction', '_compiling',
+                        '_unspecialized')
+    """The attributes that are never stored in the persistent Operator cache."""
+
+    _respecialize_state = ('_headers', '_includes', '_globals', '_func_table',
+                           '_dimensions')
+    """The attributes that may be altered by the IET specialization."""
+
     def __init__(self, expressions, **kwargs):
         expressions = as_tuple(expressions)
 
@@ -148,6 +174,12 @@ class Operator(Callable):
         self._compiler = configuration['compiler']
         self._lib = None
         self._cfunction = None
+        # A pending background compilation, if any (see `precompile`)
+        self._compiling = None
+
+        # The IET before specialization, if requested (see `respecialize`)
+        self._unspecialized = None
+        respecializable = kwargs.get('respecializable', False)
 
         # References to local or external routines
         self._func_table = OrderedDict()
@@ -159,6 +191,16 @@ class Operator(Callable):
         # Form and gather any required implicit expressions
         expressions = self._add_implicit(expressions)
 
+        # If the very same Operator has already been built, possibly by another
+        # process, restore it from the persistent Operator cache, thus skipping
+        # the whole lowering pipeline
+        key = None
+        if self._opcache and configuration['operator-cache'] and not respecializable:
+            key = opcache_key(self, expressions, **kwargs)
+            if opcache_load(self, key, expressions):
+                return
+        user_expressions = expressions
+
         # Expression lowering: indexification, substitution rules, specialization
         expressions = [indexify(i) for i in expressions]
         expressions = self._apply_substitutions(expressions, subs)
@@ -180,16 +222,21 @@ class Operator(Callable):
 
         # Lower Schedule tree to an Iteration/Expression tree (IET)
         iet = iet_build(stree)
-        iet, self._profiler = self._profile_sections(iet)
-        iet = self._specialize_iet(iet, **kwargs)
 
-        # Derive all Operator parameters based on the IET
-        parameters = derive_parameters(iet, True)
+        # Keep track of the IET before specialization, so that the Operator may
+        # later be respecialized (e.g., with different DLE options) on the cheap
+        if respecializable:
+            self._unspecialized = (iet, {i: copy(getattr(self, i))
+                                         for i in self._respecialize_state})
 
-        # Finalization: introduce declarations, type casts, etc
-        iet = self._finalize(iet, parameters)
+        iet, self._profiler = self._profile_sections(iet)
 
-        super(Operator, self).__init__(self.name, iet, 'int', parameters, ())
+        self._lower_iet(iet, **kwargs)
+
+        if key is not None:
+            # Trigger code generation so that `_soname` gets cached too
+            self._soname
+            opcache_store(self, key, user_expressions)
 
     # Read-only fields exposed to the outside world
 
@@ -264,7 +311,9 @@ class Operator(Callable):
         """Instrument the IET for C-level profiling."""
         profiler = create_profile('timers')
         iet = profiler.instrument(iet)
+        self._headers.extend(profiler._default_headers)
         self._includes.extend(profiler._default_includes)
+        self._globals.extend(profiler._default_globals)
         self._func_table.update({i: MetaCall(None, False) for i in profiler._ext_calls})
         return iet, profiler
 
@@ -285,6 +334,65 @@ class Operator(Callable):
 
         return iet
 
+    def _lower_iet(self, iet, **kwargs):
+        """Specialize and finalize the IET, thus completing the lowering."""
+        iet = self._specialize_iet(iet, **kwargs)
+
+        # Derive all Operator parameters based on the IET
+        parameters = derive_parameters(iet, True)
+
+        # Finalization: introduce declarations, type casts, etc
+        iet = self._finalize(iet, parameters)
+
+        super(Operator, self).__init__(self.name, iet, 'int', parameters, ())
+
+    def respecialize(self, **kwargs):
+        """
+        Build a new Operator out of ``self``, but with different specialization
+        options. This is much quicker than building a new Operator from scratch,
+        as only the IET specialization and finalization are performed again,
+        while the outcome of all previous lowering passes (clustering, DSE,
+        schedule tree and IET construction) is reused. ``self`` must have been
+        built with ``respecializable=True``.
+
+        Parameters
+        ----------
+        **kwargs
+            The IET specialization options, such as ``dle``. Defaults to the
+            options in ``configuration``, *not* those used to build ``self``.
+
+        Examples
+        --------
+        >>> from devito import Eq, Grid, TimeFunction, Operator
+        >>> grid = Grid(shape=(4, 4))
+        >>> u = TimeFunction(name='u', grid=grid)
+        >>> op = Operator(Eq(u.forward, u + 1), dle='noop', respecializable=True)
+        >>> op2 = op.respecialize(dle=('advanced', {'openmp': True}))
+        """
+        if self._unspecialized is None:
+            raise InvalidOperator("Operator `%s` wasn't built with "
+                                  "`respecializable=True`" % self.name)
+        iet, state = self._unspecialized
+
+        op = self.__class__.__new__(self.__class__)
+        for k, v in self.__dict__.items():
+            # Anything lazily computed must be recomputed
+            if not isinstance(getattr(self.__class__, k, None), cached_property):
+                setattr(op, k, v)
+        for k, v in state.items():
+            setattr(op, k, copy(v))
+        op._lib = None
+        op._cfunction = None
+        op._compiling = None
+        op._state = {}
+
+        # Each variant gets its own profiler, and thus its own timers
+        iet, op._profiler = op._profile_sections(iet)
+
+        op._lower_iet(iet, **kwargs)
+
+        return op
+
     def _finalize(self, iet, parameters):
         iet = iet_insert_decls(iet, parameters)
         iet = iet_insert_casts(iet, parameters)
@@ -370,7 +478,9 @@ class Operator(Callable):
         args.update(kwargs.pop('backend', {}))
 
         # Execute autotuning and adjust arguments accordingly
+        tic = time()
         args = self._autotune(args, kwargs.pop('autotune', configuration['autotuning']))
+        self._state['autotuning-time'] = time() - tic
 
         # Check all user-provided keywords are known to the Operator
         if not configuration['ignore-unknowns']:
@@ -406,6 +516,14 @@ class Operator(Callable):
 
     # JIT compilation
 
+    @property
+    def ccode_units(self):
+        """
+        The generated C code, as a mapper from names to translation units -- one
+        for the Operator kernel, and one for each elemental function.
+        """
+        return CGenUnits().visit(self)
+
     @cached_property
     def _soname(self):
         """A unique name for the shared object resulting from JIT compilation."""
@@ -416,18 +534,56 @@ class Operator(Callable):
         JIT-compile the C code generated by the Operator.
 
         It is ensured that JIT compilation will only be performed once per
-        Operator, reagardless of how many times this method is invoked.
+        Operator, reagardless of how many times this method is invoked. If
+        JIT compilation was scheduled in the background (see ``precompile``),
+        this method simply waits for it to complete.
         """
         if self._lib is None:
-            jit_compile(self._soname, str(self.ccode), self._compiler)
+            if self._compiling is not None:
+                try:
+                    self._compiling.result()
+                except Exception:
+                    # The failed compilation may be attempted again
+                    self._compiling = None
+                    raise
+                return
+
+            build = self._jit_build()
+
+            # With MPI, compile on rank 0 only, then distribute the shared object
+            comm = self._comm
+            if comm is not MPI.COMM_NULL and comm.size > 1:
+                jit_broadcast(self._soname, self._compiler, comm, build)
+            else:
+                build()
+
+    def _jit_build(self):
+        """A picklable callable producing the Operator's shared object."""
+        if configuration['jit-split']:
+            units = OrderedDict((k, str(v)) for k, v in self.ccode_units.items())
+            return partial(jit_compile_units, self._soname, units, self._compiler)
+        else:
+            return partial(jit_compile, self._soname, str(self.ccode), self._compiler)
+
+    @property
+    def _comm(self):
+        """The MPI communicator over which the Operator runs, if any."""
+        if configuration['mpi']:
+            for p in self.input:
+                grid = getattr(p, 'grid', None)
+                if grid is not None:
+                    return grid.distributor.comm
+        return MPI.COMM_NULL
 
     @property
     def cfunction(self):
         """The JIT-compiled C function as a ctypes.FuncPtr object."""
         if self._lib is None:
+            tic = time()
             self._compile()
             self._lib = load(self._soname)
             self._lib.name = self._soname
+            self._state['jit-time'] = time() - tic
 
         if self._cfunction is None:
             self._cfunction = getattr(self._lib, self.name)
@@ -501,10 +657,104 @@ class Operator(Callable):
         >>> summary = op.apply(time_M=10)
         """
         # Build the arguments list to invoke the kernel function
+        tic = time()
         args = self.arguments(**kwargs)
+        elapsed = time() - tic
 
         # Invoke kernel function with args
-        arg_values = [args[p.name] for p in self.parameters]
+        self._execute([args[p.name] for p in self.parameters])
+
+        # Post-process runtime arguments
+        self._postprocess_arguments(args, **kwargs)
+
+        # Output summary of performance achieved
+        summary = self._profile_output(args)
+        self._emit_metrics(args, summary, **self._apply_timings(elapsed))
+        return summary
+
+    def executable(self, **kwargs):
+        """
+        Build an ExecutableOperator, that is a lean representation of the
+        JIT-compiled Operator. ExecutableOperators carry no symbolic objects
+        at all, so they are much cheaper to serialize than Operators.
+
+        Parameters
+        ----------
+        **kwargs
+            The runtime arguments, as in ``apply``. The runtime values of the
+            scalar parameters become the defaults of the ExecutableOperator,
+            while the arrays provide the expected data layout.
+
+        Examples
+        --------
+        >>> from devito import Eq, Grid, TimeFunction, Operator
+        >>> grid = Grid(shape=(4, 4))
+        >>> u = TimeFunction(name='u', grid=grid)
+        >>> op = Operator(Eq(u.forward, u + 1))
+        >>> exe = op.executable(time_M=2)
+        >>> timings = exe.apply(u=u.data_with_halo, time_M=3)
+        """
+        comm = self._comm
+        if comm is not MPI.COMM_NULL and comm.size > 1:
+            raise NotImplementedError("Cannot build an ExecutableOperator out of an "
+                                      "Operator running over multiple MPI ranks")
+        if self._profiler.timer.counters or self._profiler.timer.ntraces:
+            raise NotImplementedError("Cannot build an ExecutableOperator out of an "
+                                      "Operator sampling hardware counters or traces")
+
+        args = self.arguments(**kwargs)
+
+        # Make sure the shared object is available
+        self.cfunction
+        with open(self._lib._name, 'rb') as f:
+            binary = f.read()
+
+        parameters = []
+        arrays = OrderedDict()
+        scalars = OrderedDict()
+        bounds = {}
+        for p in self.parameters:
+            if p.is_DiscreteFunction:
+                shape = p._C_as_ndarray(args[p.name]).shape
+                arrays[p.name] = {'shape': shape, 'dtype': np.dtype(p.dtype).str}
+                arrays[p.name].update(read_dataobj(args[p.name], p.ndim))
+                parameters.append((p.name, 'array'))
+
+                # The iteration bounds must be such that no out-of-bounds access
+                # is performed, as in `Dimension._arg_check`
+                intervals = self._dspace[p]
+                for d, size in zip(p.indices, shape):
+                    interval = intervals[d]
+                    if d.is_Derived or not interval.is_Defined:
+                        continue
+                    lower = bounds.get(d.min_name, (None, None))[0]
+                    lower = max(-interval.lower,
+                                -interval.lower if lower is None else lower)
+                    bounds[d.min_name] = (lower, None)
+                    upper = bounds.get(d.max_name, (None, None))[1]
+                    upper = min(size - 1 - interval.upper,
+                                size - 1 - interval.upper if upper is None else upper)
+                    bounds[d.max_name] = (None, upper)
+            elif p.name == self._profiler.name:
+                parameters.append((p.name, 'timer'))
+            elif p.is_Object:
+                raise NotImplementedError("Cannot build an ExecutableOperator out of "
+                                          "an Operator using `%s`" % p.name)
+            else:
+                value = args[p.name]
+                scalars[p.name] = (p._C_ctype, getattr(value, 'item', lambda: value)())
+                parameters.append((p.name, 'scalar'))
+
+        aliases = {k: k for k in scalars}
+        aliases.update({d.name: d.max_name for d in self.dimensions
+                        if d.max_name in scalars and d.name not in scalars})
+
+        return ExecutableOperator(self.name, self._soname, binary, self._compiler,
+                                  parameters, arrays, scalars, bounds, aliases,
+                                  self._profiler.timer.sections)
+
+    def _execute(self, arg_values):
+        """Invoke the JIT-compiled C function with the given argument values."""
         try:
             self.cfunction(*arg_values)
         except ctypes.ArgumentError as e:
@@ -518,11 +768,195 @@ class Operator(Callable):
             else:
                 raise
 
-        # Post-process runtime arguments
-        self._postprocess_arguments(args, **kwargs)
+    def apply_async(self, **kwargs):
+        """
+        Execute the Operator asynchronously.
+
+        The runtime arguments are processed in the calling thread, exactly as in
+        ``apply``, while the Operator runs in a worker thread. As the generated
+        code runs without holding the GIL, the calling thread may carry on, for
+        example to prepare the next execution. Multiple executions of the same
+        Operator are serialized, in submission order.
+
+        Parameters
+        ----------
+        **kwargs
+            The runtime arguments, as in ``apply``.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            A Future whose result is the performance summary, as returned by
+            ``apply``. The post-processing of the runtime arguments (e.g., the
+            gathering of SparseFunction data) takes place before the Future
+            completes.
+
+        Notes
+        -----
+        The data of the objects used by the Operator must neither be read nor
+        written until the returned Future completes.
 
-        # Output summary of performance achieved
-        return self._profile_output(args)
+        Examples
+        --------
+        >>> from devito import Eq, Grid, TimeFunction, Operator
+        >>> grid = Grid(shape=(3, 3))
+        >>> u = TimeFunction(name='u', grid=grid, save=3)
+        >>> op = Operator(Eq(u.forward, u + 1))
+        >>> future = op.apply_async()
+        >>> summary = future.result()
+        """
+        tic = time()
+        args = self.arguments(**kwargs)
+        elapsed = time() - tic
+
+        # A Timer private to this execution, so that the performance summary
+        # isn't affected by any execution started in the meantime
+        timer = Timer(self._profiler.name, self._profiler.timer.sections,
+                      self._profiler.timer.counters, self._profiler.timer.ntraces)
+        args[timer.name] = timer.reset()
+
+        arg_values = [args[p.name] for p in self.parameters]
+
+        # Make sure JIT compilation takes place in the calling thread
+        self.cfunction
+        timings = self._apply_timings(elapsed)
+
+        def run():
+            self._execute(arg_values)
+            self._postprocess_arguments(args, **kwargs)
+            summary = self._profile_output(args)
+            self._emit_metrics(args, summary, **timings)
+            return summary
+
+        return self._executor.submit(run)
+
+    @cached_property
+    def _executor(self):
+        """The worker thread used by ``apply_async``."""
+        return ThreadPoolExecutor(max_workers=1)
+
+    def prepare(self, **kwargs):
+        """
+        Prepare the Operator for repeated execution.
+
+        The runtime arguments are derived, checked and turned into a format
+        suitable for the generated code once and for all. The returned
+        PreparedCall may then be invoked many times, each time overriding some
+        of the prepared arguments; only the overridden entries are recomputed.
+
+        Parameters
+        ----------
+        **kwargs
+            The prepared arguments, as in ``apply``.
+
+        Examples
+        --------
+        >>> from devito import Eq, Grid, TimeFunction, Operator
+        >>> grid = Grid(shape=(3, 3))
+        >>> u = TimeFunction(name='u', grid=grid, save=10)
+        >>> op = Operator(Eq(u.forward, u + 1))
+        >>> call = op.prepare(time_M=2)
+        >>> call()
+        >>> call(time_M=8)
+        """
+        return PreparedCall(self, **kwargs)
+
+    def apply_batch(self, batch, reset=None, nworkers=1, **kwargs):
+        """
+        Execute the Operator once for each set of arguments in ``batch``.
+
+        The runtime arguments are processed only once, through ``prepare``. The
+        Functions in ``reset`` are zeroed before each execution, so that the
+        same data buffers are reused throughout the batch.
+
+        Parameters
+        ----------
+        batch : list of dict
+            The per-execution arguments, as in ``apply``. These override ``kwargs``.
+        reset : list of Function, optional
+            The Functions zeroed before each execution. Defaults to the
+            TimeFunctions written by the Operator which are not overridden
+            in ``batch``.
+        nworkers : int, optional
+            The number of concurrent executions. Each worker gets its own copy
+            of the Functions in ``reset`` as well as an equal share of the
+            available threads. Defaults to 1.
+        **kwargs
+            The arguments shared by all executions, as in ``apply``.
+
+        Returns
+        -------
+        list of PerformanceSummary
+            The performance summaries, in the same order as ``batch``.
+
+        Notes
+        -----
+        With ``nworkers > 1``, upon return the Functions in ``reset`` only
+        carry the data computed by the first worker.
+
+        Examples
+        --------
+        >>> import numpy as np
+        >>> from devito import Eq, Grid, TimeFunction, SparseTimeFunction, Operator
+        >>> grid = Grid(shape=(4, 4))
+        >>> u = TimeFunction(name='u', grid=grid)
+        >>> src = SparseTimeFunction(name='src', grid=grid, npoint=1, nt=4)
+        >>> op = Operator([Eq(u.forward, u + 1)] + src.inject(u.forward, expr=src))
+        >>> shots = [SparseTimeFunction(name='src', grid=grid, npoint=1, nt=4,
+        ...                             coordinates=np.array([[i, i]]))
+        ...          for i in [0.3, 0.6]]
+        >>> summaries = op.apply_batch([{'src': i} for i in shots], time_M=2)
+        """
+        batch = [dict(i) for i in batch]
+        if reset is None:
+            overridden = set().union(*[set(i) for i in batch])
+            reset = [f for f in self.output
+                     if f.is_TimeFunction and f.name not in overridden]
+        nworkers = max(min(nworkers, len(batch)), 1)
+
+        # Disjoint subsets of threads for the workers
+        if nworkers > 1:
+            for i in self.input:
+                if isinstance(i, NThreads):
+                    kwargs.setdefault(i.name,
+                                      max(NThreads.default_value() // nworkers, 1))
+
+        calls = [self.prepare(**kwargs)]
+        if nworkers > 1:
+            for _ in range(nworkers - 1):
+                # A new Function, with its own data, for each Function in `reset`
+                buffers = {f.name: f._rebuild() for f in reset}
+                call = self.prepare(**kwargs, **buffers)
+                timer = Timer(self._profiler.name, self._profiler.timer.sections,
+                              self._profiler.timer.counters,
+                              self._profiler.timer.ntraces)
+                call._bind_timer(timer)
+                calls.append(call)
+
+        def run(call, items):
+            summaries = []
+            for i in items:
+                for f in reset:
+                    call._data[f.name].fill(0)
+                call(**i)
+                summaries.append(call.summary)
+            return summaries
+
+        if nworkers == 1:
+            return run(calls[0], batch)
+
+        # Make sure JIT compilation takes place in the calling thread
+        self.cfunction
+
+        # The kernel invocation releases the GIL, hence the workers run concurrently
+        with ThreadPoolExecutor(max_workers=nworkers) as executor:
+            futures = [executor.submit(run, call, batch[n::nworkers])
+                       for n, call in enumerate(calls)]
+            results = [i.result() for i in futures]
+        summaries = [None]*len(batch)
+        for n, i in enumerate(results):
+            summaries[n::nworkers] = i
+        return summaries
 
     def _profile_output(self, args):
         """Produce a performance summary of the profiled sections."""
@@ -537,10 +971,54 @@ class Operator(Callable):
             else:
                 name = None
             gpointss = ", %.2f GPts/s" % v.gpointss if v.gpointss else ''
+            if v.counters:
+                gpointss += ", %.2f GB/s, IPC=%.2f" % (v.counters['gbytess'],
+                                                       v.counters['ipc'])
             perf("* %s with OI=%.2f computed in %.3f s [%.2f GFlops/s%s]" %
                  (name, v.oi, v.time, v.gflopss, gpointss))
+        for k, v in summary.regions.items():
+            perf("* %s run by %d threads [imbalance=%.2f, barrier=%.3f s]" %
+                 (k, v.busy.size, v.imbalance, v.barrier))
+        for k, v in summary.halospots.items():
+            perf("* %s exchanged %d msgs, %.2f MB [wait=%.3f s (max %.3f s), "
+                 "overlap=%.2f]" % (k, v.msgs_sent, v.bytes_sent/10**6, v.wait,
+                                    v.wait_max, v.overlap))
         return summary
 
+    def _apply_timings(self, elapsed):
+        """
+        The time spent in JIT compilation and autotuning since the last call,
+        as well as in argument processing, given the ``elapsed`` time to derive
+        the runtime arguments (which includes autotuning).
+        """
+        autotuning = self._state.pop('autotuning-time', 0.)
+        return {'compile_time': self._state.pop('jit-time', 0.),
+                'arguments_time': max(elapsed - autotuning, 0.),
+                'autotuning_time': autotuning}
+
+    def _emit_metrics(self, args, summary=None, **timings):
+        """
+        Hand over the metrics of an execution to the registered metrics sinks.
+        The section timings are read straight from the Timer in ``args``, so no
+        performance summary is required.
+        """
+        if not metrics_sinks:
+            return
+        timer = args[self._profiler.name]._obj
+        sections = OrderedDict([(i, getattr(timer, i))
+                                for i in self._profiler.timer.sections])
+        total = sum(sections.values())
+
+        # GFlops/s and GPts/s are only available with advanced profiling
+        gflopss = gpointss = None
+        if summary is not None and any(v.gflopss for v in summary.values()):
+            elapsed = sum(summary.timings.values())
+            gflopss = sum(v.gflopss*v.time for v in summary.values()) / elapsed
+            gpointss = sum(v.gpointss*v.time for v in summary.values()) / elapsed
+
+        emit_metrics(ApplyMetrics(self.name, total, sections, gflopss, gpointss,
+                                  **timings))
+
     @cached_property
     def _mem_summary(self):
         """
@@ -575,8 +1053,11 @@ class Operator(Callable):
     # Pickling support
 
     def __getstate__(self):
+        state = dict(self.__dict__)
+        # The unspecialized IET is only needed to respecialize the Operator,
+        # which is therefore no longer possible once unpickled
+        state['_unspecialized'] = None
         if self._lib:
-            state = dict(self.__dict__)
             state.pop('_soname')
             # The compiled shared-object will be pickled; upon unpickling, it
             # will be restored into a potentially different temporary directory,
@@ -591,11 +1072,14 @@ class Operator(Callable):
             # (e.g., f(t, x-1), f(t, x), f(t, x+1)), which are different objects
             # with distinct `.data` fields
             state['_args'] = None
+            # Threads can't be pickled
+            state.pop('_executor', None)
             with open(self._lib._name, 'rb') as f:
                 state['binary'] = f.read()
-            return state
-        else:
-            return self.__dict__
+        elif self._compiling is not None:
+            # Futures can't be pickled
+            state['_compiling'] = None
+        return state
 
     def __setstate__(self, state):
         soname = state.pop('_soname', None)
@@ -620,6 +1104,253 @@ class Operator(Callable):
             save(self._soname, binary, self._compiler)
 
 
+class PreparedCall(object):
+
+    """
+    A callable executing an Operator with prepared runtime arguments.
+
+    Parameters
+    ----------
+    operator : Operator
+        The Operator to be executed.
+    **kwargs
+        The prepared arguments, as in ``Operator.apply``.
+
+    Notes
+    -----
+    When called, any of the prepared arguments may be overridden for the
+    duration of the call. The following overrides are processed without
+    deriving all arguments from scratch:
+
+        * the iteration interval along a non-distributed Dimension (e.g.,
+          ``time_M``);
+        * the value of a Constant;
+        * the data of a Function or SparseFunction, provided that its shape and
+          dtype are the same as the prepared ones.
+
+    Any other override triggers the standard argument processing.
+    """
+
+    def __init__(self, operator, **kwargs):
+        self.operator = operator
+        self.kwargs = kwargs
+
+        self.args = operator.arguments(**kwargs)
+        self.arg_values = [self.args[p.name] for p in operator.parameters]
+        self._last_args = None
+        self.timer = operator._profiler.timer
+
+        self._index = {p.name: n for n, p in enumerate(operator.parameters)}
+        self._parameters = {p.name: p for p in operator.parameters}
+
+        # Only a few parameters need postprocessing upon returning from the kernel
+        self._postprocess = [p for p in operator.parameters
+                             if type(p)._arg_apply is not ArgProvider._arg_apply]
+
+        # Scalar overrides that can be processed without deriving all arguments
+        grids = {getattr(p, 'grid', None) for p in operator.input} - {None}
+        distributed = {d for g in grids if g.distributor.nprocs > 1
+                       for d in g.distributor.dimensions}
+        self._aliases = {}
+        self._checks = {}
+        for d in operator.dimensions:
+            if d.is_Derived or d in distributed:
+                continue
+            self._aliases.update({d.min_name: d.min_name, d.max_name: d.max_name,
+                                  d.name: d.max_name})
+            functions = [p for p in operator.parameters
+                         if any(i.root is d for i in getattr(p, 'indices', ()))]
+            self._checks[d.min_name] = self._checks[d.max_name] = functions
+        for p in operator.input:
+            if p.is_Constant and p.name in self._index:
+                self._aliases[p.name] = p.name
+                self._checks[p.name] = [p]
+
+        # The data of the prepared data-carriers, needed for argument checking.
+        # Any data-carrier override must match their shape and dtype
+        self._data = {}
+        for p in operator.input:
+            if p.is_DiscreteFunction:
+                for k, v in p._arg_values(**kwargs).items():
+                    if isinstance(v, np.ndarray):
+                        self._data[k] = v
+
+    def __call__(self, **kwargs):
+        """
+        Execute the Operator.
+
+        Parameters
+        ----------
+        **kwargs
+            Overrides for the prepared arguments, valid for this call only.
+        """
+        tic = time()
+        if kwargs:
+            try:
+                args, patched = self._patch(**kwargs)
+                arg_values = list(self.arg_values)
+                for i in patched:
+                    if i in self._index:
+                        arg_values[self._index[i]] = args[i]
+            except ValueError:
+                # Fall back to standard argument processing
+                args = self.operator.arguments(**{**self.kwargs, **kwargs})
+                args[self.timer.name] = self.timer.value
+                arg_values = [args[p.name] for p in self.operator.parameters]
+        else:
+            args, arg_values = self.args, self.arg_values
+        elapsed = time() - tic
+
+        # Reset the profiler timers
+        self.timer.reset()
+
+        self.operator._execute(arg_values)
+
+        # Post-process runtime arguments
+        for p in self._postprocess:
+            p._arg_apply(args[p.name], kwargs.get(p.name, self.kwargs.get(p.name)))
+
+        self._last_args = args
+
+        self.operator._emit_metrics(args, **self.operator._apply_timings(elapsed))
+
+    def _bind_timer(self, timer):
+        """Profile the execution using ``timer`` rather than the Operator's Timer."""
+        self.timer = timer
+        self.args[timer.name] = timer.value
+        self.arg_values[self._index[timer.name]] = timer.value
+
+    def _patch(self, **kwargs):
+        """
+        Override the prepared arguments.
+
+        Returns
+        -------
+        args : dict
+            The updated arguments.
+        patched : set
+            The names of the overridden arguments.
+
+        Raises
+        ------
+        ValueError
+            If the overrides can't be processed without deriving all arguments
+            from scratch.
+        """
+        args = dict(self.args)
+        data = dict(self._data)
+        patched = set()
+        checks = set()
+        for k, v in kwargs.items():
+            p = self._parameters.get(k)
+            if k in self._aliases:
+                if p is not None and p.is_Constant:
+                    values = p._arg_values(**{k: v})
+                else:
+                    values = {self._aliases[k]: v}
+                args.update(values)
+                patched.update(values)
+                checks.update(self._checks[self._aliases[k]])
+            elif p is not None and p.is_DiscreteFunction:
+                values = p._arg_values(**{k: v})
+                arrays = [i for i, j in values.items() if isinstance(j, np.ndarray)]
+                if any(i not in data or data[i].shape != values[i].shape or
+                       data[i].dtype != values[i].dtype for i in arrays):
+                    raise ValueError("Layout mismatch for `%s`" % k)
+                data.update({i: values[i] for i in arrays})
+                for i in arrays:
+                    q = self._parameters.get(i)
+                    if q is None:
+                        # Not used by the generated code
+                        continue
+                    try:
+                        args.update(kwargs.get(i, q)._arg_as_ctype(values, alias=q))
+                    except AttributeError:
+                        # User-provided ndarray obviously do not have `_arg_as_ctype`
+                        args.update(q._arg_as_ctype(values, alias=q))
+                patched.update(arrays)
+            else:
+                raise ValueError("Cannot patch `%s`" % k)
+
+        # Sanity check
+        if checks:
+            check_args = {**args, **data}
+            for p in checks:
+                p._arg_check(check_args, self.operator._dspace[p])
+
+        return args, patched
+
+    @property
+    def summary(self):
+        """Performance summary of the most recent call."""
+        if self._last_args is None:
+            return None
+        return self.operator._profiler.summary(self._last_args, self.operator._dtype)
+
+
+def precompile(operators, workers=None):
+    """
+    JIT-compile a set of Operators in the background.
+
+    JIT compilation is carried out by a pool of threads, while the caller
+    carries on. An Operator will then only wait, upon its first execution,
+    if its shared object isn't ready yet.
+
+    Parameters
+    ----------
+    operators : Operator or list of Operator
+        The Operators to be JIT-compiled.
+    workers : int, optional
+        The number of worker threads. Defaults to the number of Operators
+        to be JIT-compiled, capped by the number of available cores.
+
+    Returns
+    -------
+    list of Future
+        One Future for each scheduled JIT compilation.
+
+    Notes
+    -----
+    Operators that are already compiled or whose compilation is already
+    scheduled are ignored. So are Operators running over more than one MPI
+    rank, which are JIT-compiled collectively upon first execution.
+
+    Examples
+    --------
+    >>> from devito import Eq, Grid, TimeFunction, Operator, precompile
+    >>> grid = Grid(shape=(4, 4))
+    >>> u = TimeFunction(name='u', grid=grid)
+    >>> op_fwd = Operator(Eq(u.forward, u + 1))
+    >>> op_bwd = Operator(Eq(u.backward, u - 1))
+    >>> futures = precompile([op_fwd, op_bwd])
+    >>> summary = op_fwd.apply(time_M=2)
+    """
+    operators = [op for op in as_tuple(operators)
+                 if op._lib is None and op._compiling is None and
+                 (op._comm is MPI.COMM_NULL or op._comm.size == 1)]
+    if not operators:
+        return []
+
+    # Code generation takes place in the caller, while the actual compilation
+    # is carried out by the workers. The compiler runs in a child process, hence
+    # threads are enough to drive many compilations at once
+    builds = [op._jit_build() for op in operators]
+
+    executor = get_precompile_pool(min(workers or cpu_count() or 1, len(builds)))
+    futures = []
+    for op, build in zip(operators, builds):
+        op._compiling = executor.submit(build)
+        futures.append(op._compiling)
+
+    return futures
+
+
+@memoized_func
+def get_precompile_pool(workers):
+    """The pool of threads performing background JIT compilation."""
+    return ThreadPoolExecutor(max_workers=workers)
+
+
 # Misc helpers
 
 
@@ -16,7 +16,8 @@ add_sub_configuration(ops_configuration, env_vars_mapper)
 
 # Add OPS-specific DLE modes
 modes.add(Cpu64, {'advanced': PlatformRewriter,
-                  'speculative': PlatformRewriter})
+                  'speculative': PlatformRewriter,
+                  'timetiling': PlatformRewriter})
 
 # The following used by backends.backendSelector
 from devito.ops.operator import OperatorOPS as Operator  # noqa
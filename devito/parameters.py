@@ -111,6 +111,7 @@ env_vars_mapper = {
     'DEVITO_ARCH': 'compiler',
     'DEVITO_PLATFORM': 'platform',
     'DEVITO_PROFILING': 'profiling',
+    'DEVITO_PROFILING_NTRACES': 'profiling-ntraces',
     'DEVITO_BACKEND': 'backend',
     'DEVITO_DEVELOP': 'develop-mode',
     'DEVITO_DSE': 'dse',
@@ -118,10 +119,19 @@ env_vars_mapper = {
     'DEVITO_OPENMP': 'openmp',
     'DEVITO_MPI': 'mpi',
     'DEVITO_AUTOTUNING': 'autotuning',
+    'DEVITO_AUTOTUNING_DB': 'autotuning-db',
+    'DEVITO_AUTOTUNING_DB_VALIDATE': 'autotuning-db-validate',
     'DEVITO_LOGGING': 'log-level',
     'DEVITO_FIRST_TOUCH': 'first-touch',
+    'DEVITO_AUTOPADDING': 'autopadding',
     'DEVITO_DEBUG_COMPILER': 'debug-compiler',
     'DEVITO_JIT_BACKDOOR': 'jit-backdoor',
+    'DEVITO_OPERATOR_CACHE': 'operator-cache',
+    'DEVITO_OPERATOR_CACHE_DIR': 'operator-cache-dir',
+    'DEVITO_OPERATOR_CACHE_SIZE': 'operator-cache-size',
+    'DEVITO_JIT_SPLIT': 'jit-split',
+    'DEVITO_JIT_CACHE_DIR': 'jit-cache-dir',
+    'DEVITO_JIT_CACHE_SIZE': 'jit-cache-size',
     'DEVITO_IGNORE_UNKNOWN_PARAMS': 'ignore-unknowns'
 }
 
@@ -188,25 +198,30 @@ def add_sub_configuration(sub_configuration, sub_env_vars_mapper=None):
 class switchconfig(object):
 
     """
-    Decorator to temporarily change `configuration` parameters.
+    Decorator, or context manager, to temporarily change `configuration`
+    parameters.
     """
 
     def __init__(self, **params):
         self.params = {k.replace('_', '-'): v for k, v in params.items()}
+        self.previous = {}
 
     def __call__(self, func, *args, **kwargs):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            previous = {}
-            for k, v in self.params.items():
-                previous[k] = configuration[k]
-                configuration[k] = v
-            result = func(*args, **kwargs)
-            for k, v in self.params.items():
-                configuration[k] = previous[k]
-            return result
+            with self:
+                return func(*args, **kwargs)
         return wrapper
 
+    def __enter__(self):
+        self.previous = {k: configuration[k] for k in self.params}
+        for k, v in self.params.items():
+            configuration[k] = v
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        for k, v in self.previous.items():
+            configuration[k] = v
+
 
 def print_defaults():
     """Print the environment variables accepted by Devito, their default value,
@@ -1,11 +1,17 @@
 from collections import OrderedDict, namedtuple
-from ctypes import c_double
+from ctypes import POINTER, byref, c_double, c_int
 from functools import reduce
 from operator import mul
 from pathlib import Path
+import json
 import os
+import sys
 
+import cgen as c
+import numpy as np
+import psutil
 from cached_property import cached_property
+from sympy import lambdify, sympify
 
 from devito.ir.iet import (Call, ExpressionBundle, List, TimedList, Section,
                            FindNodes, Transformer)
@@ -16,12 +22,14 @@ from devito.symbolics import estimate_cost
 from devito.tools import flatten
 from devito.types import CompositeObject
 
-__all__ = ['Timer', 'create_profile']
+__all__ = ['Timer', 'RegionTimer', 'MPITimer', 'SampledList', 'create_profile']
 
 
 class Profiler(object):
 
+    _default_headers = []
     _default_includes = []
+    _default_globals = []
     _default_libs = []
     _ext_calls = []
 
@@ -97,6 +105,43 @@ class Profiler(object):
 
 class AdvancedProfiler(Profiler):
 
+    def __init__(self, name):
+        super(AdvancedProfiler, self).__init__(name)
+        self._evaluators = OrderedDict()
+
+    def _evaluate(self, section, arguments):
+        """
+        Evaluate the symbolic metrics of ``section`` -- operation count, grid
+        points, compulsory traffic and itershapes -- for the given ``arguments``.
+
+        The metrics are compiled into a numeric callable, via SymPy's ``lambdify``,
+        upon the first evaluation, so that subsequent evaluations avoid the
+        (expensive) substitution of the run-time values into the expressions.
+        """
+        data = self._sections[section]
+        try:
+            symbols, evaluator = self._evaluators[section]
+        except KeyError:
+            exprs = [sympify(i) for i in [data.ops, data.points, data.traffic] +
+                     flatten(data.itershapes)]
+            symbols = sorted(set().union(*[i.free_symbols for i in exprs]),
+                             key=lambda i: i.name)
+            evaluator = lambdify(symbols, exprs, modules='math', dummify=True)
+            self._evaluators[section] = symbols, evaluator
+
+        values = evaluator(*[arguments[i.name] for i in symbols])
+        ops, points, traffic = values[:3]
+        values = iter(values[3:])
+        itershapes = [tuple(next(values) for _ in i) for i in data.itershapes]
+
+        return ops, points, traffic, itershapes
+
+    def __getstate__(self):
+        # The lambdified evaluators can't be pickled, but they're rebuilt on demand
+        state = dict(self.__dict__)
+        state['_evaluators'] = OrderedDict()
+        return state
+
     # Override basic summary so that arguments other than runtime are computed.
     def summary(self, arguments, dtype):
         """
@@ -116,17 +161,10 @@ class AdvancedProfiler(Profiler):
             # Time to run the section
             time = max(getattr(arguments[self.name]._obj, section.name), 10e-7)
 
-            # Number of FLOPs performed
-            ops = data.ops.subs(arguments)
-
-            # Number of grid points computed
-            points = data.points.subs(arguments)
-
-            # Compulsory traffic
-            traffic = float(data.traffic.subs(arguments)*dtype().itemsize)
-
-            # Runtime itershapes
-            itershapes = [tuple(i.subs(arguments) for i in j) for j in data.itershapes]
+            # Number of FLOPs performed, number of grid points computed,
+            # compulsory traffic and runtime itershapes
+            ops, points, traffic, itershapes = self._evaluate(section, arguments)
+            traffic = float(traffic*dtype().itemsize)
 
             # Do not show unexecuted Sections (i.e., because the loop trip count was 0)
             if ops == 0 or traffic == 0:
@@ -185,26 +223,385 @@ class AdvisorProfiler(AdvancedProfiler):
         return iet
 
 
+class PerfEventProfiler(AdvancedProfiler):
+
+    """
+    Rely on the Linux ``perf_event`` interface to sample, in each profiled
+    section, the hardware counters of all threads executing it.
+
+    The last level cache misses are used to derive the memory traffic actually
+    generated by a section, hence its measured operational intensity and the
+    achieved memory bandwidth. Only cache line fills are accounted for, so
+    the write-back traffic is not included.
+    """
+
+    _api_sample = 'perf_sample'
+
+    _counters = OrderedDict([('cycles', 'PERF_COUNT_HW_CPU_CYCLES'),
+                             ('instructions', 'PERF_COUNT_HW_INSTRUCTIONS'),
+                             ('llc_misses', 'PERF_COUNT_HW_CACHE_MISSES')])
+
+    _cacheline = 64
+
+    _default_headers = ['#define _GNU_SOURCE']
+    _default_includes = ['string.h', 'unistd.h', 'sys/syscall.h', 'linux/perf_event.h']
+
+    def __init__(self, name):
+        if locate_perf_events():
+            super(PerfEventProfiler, self).__init__(name)
+        else:
+            self.initialized = False
+
+    @property
+    def _default_globals(self):
+        return [c.Line(perf_sample_template % {
+            'name': self._api_sample,
+            'ncounters': len(self._counters),
+            'configs': ', '.join(self._counters.values())
+        })]
+
+    def instrument(self, iet):
+        iet = super(PerfEventProfiler, self).instrument(iet)
+
+        # Sample the hardware counters right before and after each TimedList
+        mapper = {}
+        for i in FindNodes(TimedList).visit(iet):
+            # The counters of a section are contiguous in the Timer struct
+            counts = '&%s->%s_%s' % (self.timer.name, i.name, list(self._counters)[0])
+            mapper[i] = SampledList(i, self._api_sample, counts)
+        iet = Transformer(mapper).visit(iet)
+
+        return iet
+
+    def summary(self, arguments, dtype):
+        """
+        Return a :class:`PerformanceSummary` of the profiled sections, in which
+        the operational intensity is measured rather than modelled. For each
+        section, the raw hardware counters are available too, along with the
+        derived instructions per cycle (``ipc``) and memory bandwidth, in
+        GB/s (``gbytess``).
+        """
+        summary = super(PerfEventProfiler, self).summary(arguments, dtype)
+        for section, data in self._sections.items():
+            if section.name not in summary:
+                continue
+            entry = summary[section.name]
+
+            counters = OrderedDict([(i, getattr(arguments[self.name]._obj,
+                                                '%s_%s' % (section.name, i)))
+                                    for i in self._counters])
+            if not any(counters.values()):
+                # The counters couldn't be opened (e.g., in some containers)
+                continue
+
+            # Derived metrics
+            traffic = counters['llc_misses']*self._cacheline
+            counters['ipc'] = counters['instructions']/max(counters['cycles'], 1)
+            counters['gbytess'] = traffic/10**9/entry.time
+            ops = self._evaluate(section, arguments)[0]
+            oi = float(ops)/traffic if traffic else entry.oi
+
+            summary[section.name] = entry._replace(oi=oi, counters=counters)
+
+        return summary
+
+    @cached_property
+    def timer(self):
+        return Timer(self.name, [i.name for i in self._sections], list(self._counters))
+
+
+class SampledList(List):
+
+    """
+    Wrap a Node with the sampling of the hardware counters of the threads
+    executing it (see :class:`PerfEventProfiler`).
+
+    Parameters
+    ----------
+    body : Node or list of Node
+        The SampledList body.
+    api : str
+        The C routine sampling the hardware counters.
+    counts : str
+        The C address of the sampled counters.
+    nthreads : NThreads, optional
+        The number of threads executing ``body``. Defaults to None, that is
+        ``body`` is executed sequentially.
+    """
+
+    def __init__(self, body, api, counts, nthreads=None):
+        self.api = api
+        self.counts = counts
+        self.nthreads = nthreads
+        nt = nthreads.name if nthreads is not None else 1
+        header = c.Statement('%s(%s, -1, %s)' % (api, counts, nt))
+        footer = c.Statement('%s(%s, 1, %s)' % (api, counts, nt))
+        super(SampledList, self).__init__(header=header, body=body, footer=footer)
+
+    @property
+    def functions(self):
+        return (self.nthreads,) if self.nthreads is not None else ()
+
+
+class TracingProfiler(AdvancedProfiler):
+
+    """
+    Record, besides the total time spent in each profiled section, the start
+    time and the duration of each of its executions -- typically, one per
+    timestep. The traces are stored in a C buffer preallocated by the Timer,
+    which can accommodate ``configuration['profiling-ntraces']`` executions
+    per section; any further execution is accounted for in the total time,
+    but not traced.
+    """
+
+    def summary(self, arguments, dtype):
+        """
+        Return a :class:`PerformanceSummary` of the profiled sections, in which
+        each section carries its trace as a NumPy structured array, with fields
+        ``start`` (the wall-clock time, in seconds since the Epoch) and ``time``.
+        """
+        summary = super(TracingProfiler, self).summary(arguments, dtype)
+
+        timer = arguments[self.name]._obj
+        buf = np.ctypeslib.as_array(timer.traces, (len(self._sections), timer.ntraces, 2))
+        for n, section in enumerate(self._sections):
+            if section.name not in summary:
+                continue
+            ntraces = getattr(timer, '%s_ntraces' % section.name)
+            if ntraces > timer.ntraces:
+                warning("Trace buffer full; dropped %d executions of `%s`"
+                        % (ntraces - timer.ntraces, section.name))
+            trace = np.zeros(min(ntraces, timer.ntraces), dtype=trace_dtype)
+            trace['start'] = buf[n, :len(trace), 0]
+            trace['time'] = buf[n, :len(trace), 1]
+            summary[section.name] = summary[section.name]._replace(trace=trace)
+
+        return summary
+
+    @cached_property
+    def timer(self):
+        return Timer(self.name, [i.name for i in self._sections],
+                     ntraces=configuration['profiling-ntraces'])
+
+
+class ThreadProfiler(AdvancedProfiler):
+
+    """
+    Along with the profiled sections, profile the load balance of the OpenMP
+    parallel regions. Each thread times the work it performs in a parallel
+    region, while the time it then spends in the implicit barrier at the end
+    of the region is derived from that of the slowest thread. The parallel
+    regions are instrumented at loop-optimization time, through a
+    :class:`RegionTimer`.
+    """
+
+    def summary(self, arguments, dtype):
+        """
+        Return a :class:`PerformanceSummary` of the profiled sections, which
+        also carries, in ``regions``, a :class:`RegionEntry` for each parallel
+        region.
+        """
+        summary = super(ThreadProfiler, self).summary(arguments, dtype)
+
+        rtimers = [v._obj for v in arguments.values()
+                   if isinstance(getattr(v, '_obj', None), RegionTimer._C_struct)]
+        for obj in rtimers:
+            for name, busy in zip(obj._regions, obj._busy):
+                # Only the threads in the team have been timed
+                busy = busy[busy > 0]
+                if busy.size == 0:
+                    continue
+                summary.regions[name] = RegionEntry(busy, busy.max()/busy.mean(),
+                                                    busy.max() - busy.mean())
+
+        return summary
+
+
+class MPIProfiler(AdvancedProfiler):
+
+    """
+    Along with the profiled sections, profile the halo exchanges. For each
+    HaloSpot, the generated MPI routines count the messages and the bytes sent
+    and received, and time the ``MPI_Wait``s as well as the portion of the
+    halo exchange not overlapped with computation. The HaloSpots are
+    instrumented at loop-optimization time, through an :class:`MPITimer`.
+    """
+
+    def summary(self, arguments, dtype):
+        """
+        Return a :class:`PerformanceSummary` of the profiled sections, which
+        also carries, in ``halospots``, a :class:`HaloSpotEntry` for each
+        HaloSpot. The entries are aggregated across all MPI ranks.
+        """
+        summary = super(MPIProfiler, self).summary(arguments, dtype)
+
+        mtimers = [v._obj for v in arguments.values()
+                   if isinstance(getattr(v, '_obj', None), MPITimer._C_struct)]
+        for obj in mtimers:
+            if obj._comm is not None:
+                data = np.stack(obj._comm.allgather(obj._data))
+            else:
+                data = obj._data[np.newaxis]
+            metrics = dict(zip(MPITimer.metrics, np.moveaxis(data, -1, 0)))
+            for n, name in enumerate(obj._halospots):
+                span = metrics['span'][:, n].mean()
+                exposed = metrics['exposed'][:, n].mean()
+                if span == 0:
+                    # Never executed
+                    continue
+                summary.halospots[name] = HaloSpotEntry(
+                    int(metrics['msgs_sent'][:, n].sum()),
+                    int(metrics['msgs_recv'][:, n].sum()),
+                    int(metrics['bytes_sent'][:, n].sum()),
+                    int(metrics['bytes_recv'][:, n].sum()),
+                    metrics['wait'][:, n].mean(),
+                    metrics['wait'][:, n].max(),
+                    max(1 - exposed/span, 0.)
+                )
+
+        return summary
+
+
 class Timer(CompositeObject):
 
-    def __init__(self, name, sections):
-        super(Timer, self).__init__(name, 'profiler', [(i, c_double) for i in sections])
+    def __init__(self, name, sections, counters=None, ntraces=0):
+        self._sections = list(sections)
+        self._counters = list(counters or [])
+        self._ntraces = ntraces
+        fields = [(i, c_double) for i in self._sections]
+        fields.extend([('%s_%s' % (i, j), c_double)
+                       for i in self._sections for j in self._counters])
+        if ntraces > 0:
+            fields.extend([('%s_ntraces' % i, c_int) for i in self._sections])
+            fields.extend([('traces', POINTER(c_double)), ('ntraces', c_int)])
+        super(Timer, self).__init__(name, 'profiler', fields)
+
+        if ntraces > 0:
+            # The trace buffer lives as long as the underlying struct does
+            obj = self.value._obj
+            obj._traces = np.zeros((len(self._sections), ntraces, 2))
+            obj.traces = obj._traces.ctypes.data_as(POINTER(c_double))
+            obj.ntraces = ntraces
 
     def reset(self):
         for i in self.fields:
-            setattr(self.value._obj, i, 0.0)
+            if i in ('traces', 'ntraces'):
+                continue
+            setattr(self.value._obj, i, 0)
         return self.value
 
     @property
     def total(self):
-        return sum(getattr(self.value._obj, i) for i in self.fields)
+        return sum(getattr(self.value._obj, i) for i in self.sections)
 
     @property
     def sections(self):
-        return self.fields
+        return self._sections
+
+    @property
+    def counters(self):
+        return self._counters
+
+    @property
+    def ntraces(self):
+        return self._ntraces
 
     # Pickling support
-    _pickle_args = ['name', 'sections']
+    _pickle_args = ['name', 'sections', 'counters', 'ntraces']
+
+
+class RegionTimer(CompositeObject):
+
+    """
+    The per-thread timers of a set of OpenMP parallel regions.
+
+    The timers live in a buffer allocated whenever the runtime arguments are
+    derived, with room for as many threads as logical cores; any further thread
+    is not timed.
+
+    Parameters
+    ----------
+    name : str
+        The name of the RegionTimer.
+    regions : list of str, optional
+        The names of the timed parallel regions. More may be appended as the
+        parallel regions are instrumented.
+    """
+
+    _C_struct = CompositeObject._generate_unique_dtype(
+        'regions', [('busy', POINTER(c_double)), ('maxthreads', c_int)])._type_
+
+    def __init__(self, name, regions=None):
+        self.regions = list(regions or [])
+        super(RegionTimer, self).__init__(name, 'regions', self._C_struct._fields_,
+                                          value=self._allocate)
+
+    def _allocate(self):
+        maxthreads = max(psutil.cpu_count(), int(os.environ.get('OMP_NUM_THREADS', 1)))
+        obj = self._C_struct()
+        obj._busy = np.zeros((len(self.regions), maxthreads))
+        obj._regions = list(self.regions)
+        obj.busy = obj._busy.ctypes.data_as(POINTER(c_double))
+        obj.maxthreads = maxthreads
+        return byref(obj)
+
+    # Pickling support
+    _pickle_args = ['name', 'regions']
+
+
+class MPITimer(CompositeObject):
+
+    """
+    The communication counters and timers of a set of HaloSpots.
+
+    For each HaloSpot, the counters live in a row of a buffer allocated whenever
+    the runtime arguments are derived. The HaloSpot being executed is tracked
+    by the ``current`` field, so that the MPI routines shared by multiple
+    HaloSpots may update the right row.
+
+    Parameters
+    ----------
+    name : str
+        The name of the MPITimer.
+    halospots : list of str, optional
+        The names of the instrumented HaloSpots. More may be appended as the
+        HaloSpots are instrumented.
+    comm : MPI communicator, optional
+        The communicator across which the counters are aggregated.
+    """
+
+    metrics = ['span', 'exposed', 'wait', 'msgs_sent', 'msgs_recv', 'bytes_sent',
+               'bytes_recv']
+    """
+    The per-HaloSpot metrics: the time from the beginning to the end of the halo
+    exchange, the time not overlapped with computation, the time in ``MPI_Wait``,
+    the number of messages and bytes sent and received.
+    """
+
+    _C_struct = CompositeObject._generate_unique_dtype(
+        'mpitimers', [('data', POINTER(c_double)), ('current', c_int)])._type_
+
+    def __init__(self, name, halospots=None, comm=None):
+        self.halospots = list(halospots or [])
+        self.comm = comm
+        super(MPITimer, self).__init__(name, 'mpitimers', self._C_struct._fields_,
+                                       value=self._allocate)
+
+    def _allocate(self):
+        obj = self._C_struct()
+        obj._data = np.zeros((len(self.halospots), len(self.metrics)))
+        obj._halospots = list(self.halospots)
+        obj._comm = self.comm
+        obj.data = obj._data.ctypes.data_as(POINTER(c_double))
+        return byref(obj)
+
+    def _C_metric(self, metric):
+        """The C-level lvalue of ``metric`` for the current HaloSpot."""
+        return '%s->data[%d*%s->current + %d]' % (self.name, len(self.metrics),
+                                                  self.name, self.metrics.index(metric))
+
+    # Pickling support
+    _pickle_args = ['name', 'halospots']
 
 
 class PerformanceSummary(OrderedDict):
@@ -213,8 +610,15 @@ class PerformanceSummary(OrderedDict):
     A special dictionary to track and quickly access performance data.
     """
 
-    def add(self, key, time, gflopss, gpointss, oi, ops, itershapes):
-        self[key] = PerfEntry(time, gflopss, gpointss, oi, ops, itershapes)
+    def __init__(self, *args, **kwargs):
+        super(PerformanceSummary, self).__init__(*args, **kwargs)
+        self.regions = OrderedDict()
+        self.halospots = OrderedDict()
+
+    def add(self, key, time, gflopss, gpointss, oi, ops, itershapes, counters=None,
+            trace=None):
+        self[key] = PerfEntry(time, gflopss, gpointss, oi, ops, itershapes, counters,
+                              trace)
 
     @property
     def gflopss(self):
@@ -228,15 +632,96 @@ class PerformanceSummary(OrderedDict):
     def timings(self):
         return OrderedDict([(k, v.time) for k, v in self.items()])
 
+    @property
+    def counters(self):
+        return OrderedDict([(k, v.counters) for k, v in self.items()])
+
+    @property
+    def traces(self):
+        return OrderedDict([(k, v.trace) for k, v in self.items()])
+
+    def to_json(self, filename=None):
+        """
+        Export the performance data as JSON.
+
+        Parameters
+        ----------
+        filename : str, optional
+            The file the JSON document is written to. If not provided, the JSON
+            document is returned as a string.
+        """
+        data = OrderedDict()
+        fields = ['time', 'gflopss', 'gpointss', 'oi']
+        for k, v in self.items():
+            entry = OrderedDict((i, getattr(v, i)) for i in fields)
+            entry['ops'] = str(v.ops)
+            entry['itershapes'] = [[str(i) for i in j] for j in v.itershapes]
+            entry['counters'] = v.counters
+            if v.trace is not None:
+                entry['trace'] = OrderedDict([(i, v.trace[i].tolist())
+                                              for i in v.trace.dtype.names])
+            data[k] = entry
+        return dump_json(data, filename)
+
+    def to_chrome_trace(self, filename=None, pid=0):
+        """
+        Export the traced executions of the profiled sections in the Chrome
+        trace event format, as understood by ``chrome://tracing`` or Perfetto.
+
+        Parameters
+        ----------
+        filename : str, optional
+            The file the trace is written to. If not provided, the trace is
+            returned as a string.
+        pid : int, optional
+            The process identifier of the events, e.g. the MPI rank, so that
+            the traces of multiple processes may be merged. Defaults to 0.
+        """
+        traces = OrderedDict([(k, v) for k, v in self.traces.items() if v is not None])
+        if not traces:
+            raise ValueError("No traces available; profile with `profiling='trace'`")
+        origin = min((v['start'].min() for v in traces.values() if len(v)), default=0)
+
+        events = []
+        for k, v in traces.items():
+            for start, time in v:
+                events.append({'name': k, 'ph': 'X', 'pid': pid, 'tid': 0,
+                               'ts': (start - origin)*10**6, 'dur': time*10**6})
+        events.sort(key=lambda i: i['ts'])
+        return dump_json({'traceEvents': events, 'displayTimeUnit': 'ms'}, filename)
+
 
 SectionData = namedtuple('SectionData', 'ops sops points traffic itershapes')
 """Metadata for a profiled code section."""
 
 
-PerfEntry = namedtuple('PerfEntry', 'time gflopss gpointss oi ops itershapes')
+PerfEntry = namedtuple('PerfEntry',
+                       'time gflopss gpointss oi ops itershapes counters trace')
 """Runtime profiling data for a :class:`Section`."""
 
 
+RegionEntry = namedtuple('RegionEntry', 'busy imbalance barrier')
+"""
+Runtime load-balance data for an OpenMP parallel region: the time each thread
+spent working, the ratio of the maximum to the mean of such times, and the
+mean time spent by a thread in the implicit barrier at the end of the region.
+"""
+
+
+HaloSpotEntry = namedtuple('HaloSpotEntry', 'msgs_sent msgs_recv bytes_sent '
+                           'bytes_recv wait wait_max overlap')
+"""
+Runtime communication data for a HaloSpot, aggregated across MPI ranks: the
+total number of messages and bytes sent and received, the mean and maximum
+time spent by a rank in ``MPI_Wait``, and the fraction of the halo exchange
+overlapped with computation.
+"""
+
+
+trace_dtype = np.dtype([('start', np.float64), ('time', np.float64)])
+"""The data type of the per-execution traces of a :class:`Section`."""
+
+
 def create_profile(name):
     """Create a new :class:`Profiler`."""
     if configuration['log-level'] == 'DEBUG':
@@ -258,7 +743,11 @@ def create_profile(name):
 profiler_registry = {
     'basic': Profiler,
     'advanced': AdvancedProfiler,
-    'advisor': AdvisorProfiler
+    'advisor': AdvisorProfiler,
+    'perf': PerfEventProfiler,
+    'trace': TracingProfiler,
+    'threads': ThreadProfiler,
+    'mpi': MPIProfiler
 }
 """Profiling levels."""
 
@@ -275,3 +764,73 @@ def locate_intel_advisor():
     except KeyError:
         warning("Requested `advisor` profiler, but ADVISOR_HOME isn't set")
         return None
+
+
+def dump_json(data, filename=None):
+    if filename is None:
+        return json.dumps(data)
+    with open(filename, 'w') as f:
+        json.dump(data, f)
+    return filename
+
+
+def locate_perf_events():
+    if not sys.platform.startswith('linux'):
+        warning("Requested `perf` profiler, but `perf_event` is only available on Linux")
+        return False
+    try:
+        with open('/proc/sys/kernel/perf_event_paranoid') as f:
+            paranoid = int(f.read())
+    except (OSError, ValueError):
+        warning("Requested `perf` profiler, but couldn't locate `perf_event` support")
+        return False
+    # User-space measurements of a process by itself require `paranoid <= 2`
+    if paranoid > 2:
+        warning("Requested `perf` profiler, but `perf_event_paranoid` is %d" % paranoid)
+        return False
+    return True
+
+
+perf_sample_template = """\
+static void %(name)s_thread(double *counts, const double sign)
+{
+  static const unsigned long long configs[%(ncounters)d] = {%(configs)s};
+  static __thread int fds[%(ncounters)d];
+  static __thread int opened = 0;
+  if (!opened)
+  {
+    for (int i = 0; i < %(ncounters)d; i++)
+    {
+      struct perf_event_attr attr;
+      memset(&attr, 0, sizeof(attr));
+      attr.type = PERF_TYPE_HARDWARE;
+      attr.size = sizeof(attr);
+      attr.config = configs[i];
+      attr.exclude_kernel = 1;
+      attr.exclude_hv = 1;
+      fds[i] = syscall(__NR_perf_event_open, &attr, 0, -1, -1, 0);
+    }
+    opened = 1;
+  }
+  for (int i = 0; i < %(ncounters)d; i++)
+  {
+    long long value;
+    if (fds[i] >= 0 && read(fds[i], &value, sizeof(value)) == sizeof(value))
+    {
+#ifdef _OPENMP
+      #pragma omp atomic
+#endif
+      counts[i] += sign*value;
+    }
+  }
+}
+
+static void %(name)s(double *counts, const double sign, const int nthreads)
+{
+  /* Counters are per-thread, so each thread in the team samples its own */
+#ifdef _OPENMP
+  #pragma omp parallel num_threads(nthreads)
+#endif
+  %(name)s_thread(counts, sign);
+}"""
+"""C-level sampling of the hardware counters of the calling threads."""
@@ -1,8 +1,12 @@
-import os
+from contextlib import contextmanager
 from pathlib import Path
 from tempfile import gettempdir
+import errno
+import fcntl
+import os
+import threading
 
-__all__ = ['change_directory', 'make_tempdir']
+__all__ = ['change_directory', 'make_tempdir', 'lock_file']
 
 
 class change_directory(object):
@@ -34,3 +38,45 @@ def make_tempdir(prefix=None):
     tmpdir = Path(gettempdir()).joinpath(name)
     tmpdir.mkdir(parents=True, exist_ok=True)
     return tmpdir
+
+
+_lock_file_mutexes = {}
+_lock_file_mutexes_guard = threading.Lock()
+
+
+@contextmanager
+def lock_file(path, blocking=True):
+    """
+    Context manager granting exclusive access to the lock file ``path``. If
+    ``blocking=False`` and the lock is held by someone else, BlockingIOError
+    is raised rather than waiting for the lock to be released.
+    """
+    # POSIX record locks are owned by the process, so they don't exclude the
+    # threads of the same process from each other. Moreover, closing any file
+    # descriptor of the lock file would release all of the locks the process
+    # holds on it. Thus, the threads are serialized through a per-path mutex,
+    # so that a single file descriptor per path is open while the lock is held
+    key = os.path.realpath(str(path))
+    with _lock_file_mutexes_guard:
+        mutex = _lock_file_mutexes.setdefault(key, threading.Lock())
+    if not mutex.acquire(blocking):
+        raise BlockingIOError(errno.EAGAIN, "`%s` is locked" % path)
+    try:
+        # Note: POSIX record locks, unlike `flock`, are honoured by NFS and
+        # by most parallel file systems
+        with open(str(path), 'a') as f:
+            if blocking:
+                fcntl.lockf(f, fcntl.LOCK_EX)
+            else:
+                try:
+                    fcntl.lockf(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError as e:
+                    if e.errno in (errno.EACCES, errno.EAGAIN):
+                        raise BlockingIOError(e.errno, "`%s` is locked" % path)
+                    raise
+            try:
+                yield
+            finally:
+                fcntl.lockf(f, fcntl.LOCK_UN)
+    finally:
+        mutex.release()
@@ -814,6 +814,16 @@ class DiscreteFunction(AbstractCachedFunction, ArgProvider):
         key = alias or self
         return ReducerMap({key.name: self._C_make_dataobj(args[key.name])})
 
+    def _rebuild(self, **kwargs):
+        """
+        Create a new DiscreteFunction with the same properties as ``self``,
+        except for those overridden through ``kwargs``. Unlike the objects
+        returned by the symbol cache, the new DiscreteFunction has its own data.
+        """
+        args, kw = self.__getnewargs_ex__()
+        kw.update(kwargs)
+        return self._pickle_reconstruct(*args, **kw)
+
     # Pickling support
     _pickle_kwargs = AbstractCachedFunction._pickle_kwargs +\
         ['grid', 'staggered', 'initializer']
@@ -857,7 +867,8 @@ class Function(DiscreteFunction, Differentiable):
         Define how the Function is staggered.
     padding : int or tuple of ints, optional
         Allocate extra grid points to maximize data access alignment. When a tuple
-        of ints, one int per Dimension should be provided.
+        of ints, one int per Dimension should be provided. Defaults to no padding,
+        or to SIMD-aligned rows if ``configuration['autopadding']`` is set.
     initializer : callable or any object exposing the buffer interface, optional
         Data initializer. If a callable is provided, data is allocated lazily.
     allocator : MemoryAllocator, optional
@@ -991,7 +1002,11 @@ class Function(DiscreteFunction, Differentiable):
             return tuple(halo if i.is_Space else (0, 0) for i in self.indices)
 
     def __padding_setup__(self, **kwargs):
-        padding = kwargs.get('padding', 0)
+        padding = kwargs.get('padding')
+        if padding is None:
+            if configuration['autopadding']:
+                return self.__padding_simd__(**kwargs)
+            padding = 0
         if isinstance(padding, int):
             return tuple((0, padding) if i.is_Space else (0, 0) for i in self.indices)
         elif isinstance(padding, tuple) and len(padding) == self.ndim:
@@ -999,6 +1014,24 @@ class Function(DiscreteFunction, Differentiable):
         else:
             raise TypeError("`padding` must be int or %d-tuple of ints" % self.ndim)
 
+    def __padding_simd__(self, **kwargs):
+        """
+        The padding aligning, along the innermost Dimension, the first domain
+        point to the SIMD register size and the allocated size to a multiple of
+        the SIMD vector length. Thus, the domain of each row starts at an aligned
+        address.
+        """
+        padding = [(0, 0) for i in self.indices]
+        vl = configuration['platform'].simd_items_per_reg(self.dtype)
+        if vl <= 1 or not self.indices[-1].is_Space:
+            return tuple(padding)
+        left, right = self._halo[-1]
+        size = self._shape[-1] - self.__staggered_setup__(**kwargs)[-1]
+        lpad = -left % vl
+        rpad = -(lpad + left + size + right) % vl
+        padding[-1] = (lpad, rpad)
+        return tuple(padding)
+
     @property
     def space_order(self):
         """The space order."""
@@ -1101,7 +1134,8 @@ class TimeFunction(Function):
         Define how the Function is staggered.
     padding : int or tuple of ints, optional
         Allocate extra grid points to maximize data access alignment. When a tuple
-        of ints, one int per Dimension should be provided.
+        of ints, one int per Dimension should be provided. Defaults to no padding,
+        or to SIMD-aligned rows if ``configuration['autopadding']`` is set.
     initializer : callable or any object exposing the buffer interface, optional
         Data initializer. If a callable is provided, data is allocated lazily.
     allocator : MemoryAllocator, optional
@@ -101,7 +101,8 @@ add_sub_configuration(yask_configuration, env_vars_mapper)
 
 # Add YASK-specific DLE modes
 modes.add(Cpu64, {'advanced': YaskRewriter,
-                  'speculative': YaskRewriter})
+                  'speculative': YaskRewriter,
+                  'timetiling': YaskRewriter})
 
 # The following used by backends.backendSelector
 from devito.types import SparseFunction, SparseTimeFunction  # noqa
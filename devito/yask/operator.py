@@ -31,6 +31,9 @@ class OperatorYASK(Operator):
     _default_headers = Operator._default_headers + ['#define restrict __restrict']
     _default_includes = Operator._default_includes + ['yask_kernel_api.hpp']
 
+    # YASK solutions are process-local objects, so they can't be cached
+    _opcache = False
+
     def __init__(self, expressions, **kwargs):
         super(OperatorYASK, self).__init__(expressions, **kwargs)
         # Each YASK Operator needs to have its own compiler (hence the copy()
@@ -39,6 +42,13 @@ class OperatorYASK(Operator):
         self._compiler = configuration.yask['compiler'].copy()
         self._compiler.libraries.extend([i.soname for i in self.yk_solns.values()])
 
+    def respecialize(self, **kwargs):
+        op = super(OperatorYASK, self).respecialize(**kwargs)
+        # The YASK solutions have been rebuilt, so a new compiler is needed too
+        op._compiler = configuration.yask['compiler'].copy()
+        op._compiler.libraries.extend([i.soname for i in op.yk_solns.values()])
+        return op
+
     def _specialize_exprs(self, expressions):
         # Align data accesses to the computational domain if not a yask.Function
         key = lambda i: i.is_DiscreteFunction and not i.from_YASK
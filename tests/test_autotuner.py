@@ -1,4 +1,6 @@
 from functools import reduce
+from itertools import product
+from math import log2
 from operator import mul
 
 import pytest
@@ -6,8 +8,8 @@ import numpy as np
 from unittest.mock import patch
 
 from conftest import skipif
-from devito import (Grid, Function, TimeFunction, Eq, Operator, configuration,
-                    switchconfig)
+from devito import (Grid, Function, TimeFunction, TimeDimension, Eq, Operator,
+                    configuration, switchconfig)
 from devito.data import LEFT
 
 pytestmark = skipif(['yask', 'ops'], whole_module=True)
@@ -16,7 +18,11 @@ pytestmark = skipif(['yask', 'ops'], whole_module=True)
 # a backend reinitialization would be triggered via `devito/core/.__init__.py`,
 # thus invalidating all of the future tests. This is guaranteed by the
 # `pytestmark` above
-from devito.core.autotuning import options  # noqa
+from devito.core.autotuning import (options, FootprintModel, guided_search,  # noqa
+                                    generate_block_shapes)
+from devito.dle import BlockDimension  # noqa
+from devito.ir.iet import retrieve_iteration_tree  # noqa
+from devito.core.tuningdb import TuningDB  # noqa
 
 
 @switchconfig(log_level='DEBUG')
@@ -150,6 +156,109 @@ def test_mode_destructive():
     assert np.all(f.data == 131)
 
 
+def test_guided():
+    """
+    Test that the `guided` level times fewer variants than `max`, which explores
+    the same space exhaustively.
+    """
+    grid = Grid(shape=(64, 64, 64))
+
+    v = TimeFunction(name='v', grid=grid)
+
+    op = Operator(Eq(v.forward, v + 1), dle=('blocking', {'openmp': True}))
+    op.apply(time_M=0, autotune='guided')
+    assert 0 < op._state['autotuning'][0]['runs'] < 60
+    assert op._state['autotuning'][0]['tpr'] == options['squeezer'] + 1
+    assert len(op._state['autotuning'][0]['tuned']) == 3
+
+
+def test_guided_search():
+    """
+    Test that the model-guided search finds the optimum of a synthetic cost
+    function while timing only a fraction of the candidates.
+    """
+    grid = Grid(shape=(256, 256))
+    f = TimeFunction(name='f', grid=grid, space_order=4)
+
+    op = Operator(Eq(f.forward, f.laplace + 1.), dle='noop')
+    tree = retrieve_iteration_tree(op.body)[0]
+    args = op.arguments(time=0)
+
+    blockable = [BlockDimension(d, name='%s0_blk' % d.name) for d in grid.dimensions]
+    tunable = list(product(generate_block_shapes(blockable, args, 'aggressive'),
+                           [((None, 1),)]))
+    optimum = (('x0_blk_size', 32), ('y0_blk_size', 64))
+
+    attempts = []
+
+    def attempt(bs, nt):
+        attempts.append(bs)
+        return sum(abs(log2(v) - log2(o)) for (_, v), (_, o) in zip(bs, optimum))
+
+    # With a tiny cache, the largest block shapes are deemed least promising
+    with patch.dict(options, {'cache_size': 4*(32 + 4)*(128 + 4)}):
+        model = FootprintModel(tree, blockable, args)
+        assert model.footprint(optimum) == 4*(32 + 4)*(64 + 4)
+        assert model.rank([optimum, (('x0_blk_size', 256), ('y0_blk_size', 256))])[0] \
+            == optimum
+
+        best = guided_search(attempt, lambda: True, model, tunable)
+
+    assert best == (optimum, ((None, 1),))
+    assert len(set(attempts)) < len(tunable) // 2
+
+
+def test_tuning_db(tmpdir):
+    """Test that autotuning outcomes are recorded and reused across runs."""
+    grid = Grid(shape=(64, 64, 64))
+    f = TimeFunction(name='f', grid=grid)
+
+    op = Operator(Eq(f.forward, f + 1.), dle=('advanced', {'openmp': False}))
+
+    with switchconfig(autotuning_db=str(tmpdir.join('at.json'))):
+        op.apply(time=0, autotune='basic')
+        assert op._state['autotuning'][0]['runs'] == 6
+        tuned = op._state['autotuning'][0]['tuned']
+
+        # The stored outcome is reused straight away
+        op.apply(time=0, autotune='basic')
+        assert op._state['autotuning'][1]['runs'] == 0
+        assert op._state['autotuning'][1]['cached'] is True
+        assert op._state['autotuning'][1]['tuned'] == tuned
+
+        # But not by a more aggressive autotuning session
+        op.apply(time=0, autotune='aggressive')
+        assert op._state['autotuning'][2]['runs'] > 6
+        assert 'cached' not in op._state['autotuning'][2]
+
+        # A stale outcome is detected, invalidated and retuned
+        db = TuningDB(configuration['autotuning-db'])
+        key = db.key(op, op.arguments(time=0))
+        db.store(key, tuned, 1e-12, 'max')
+        with switchconfig(autotuning_db_validate=0.5):
+            op.apply(time=0, autotune='basic')
+        assert op._state['autotuning'][3]['runs'] == 6
+        assert db.lookup(key, 'basic')['time'] > 1e-12
+
+
+def test_tuning_db_entries(tmpdir):
+    db = TuningDB(str(tmpdir.join('at.json')))
+
+    db.store('key', {'x0_blk0_size': 8, 'y0_blk0_size': 16}, 1., 'aggressive')
+    assert 'key' in db
+    assert dict(db.lookup('key', 'basic')['best']) == {'x0_blk0_size': 8,
+                                                       'y0_blk0_size': 16}
+    assert db.lookup('key', 'aggressive') is not None
+    assert db.lookup('key', 'max') is None
+    assert db.lookup('other', 'basic') is None
+
+    # Entries are visible to any other TuningDB using the same file
+    assert 'key' in TuningDB(str(tmpdir.join('at.json')))
+
+    db.invalidate('key')
+    assert 'key' not in db
+
+
 def test_blocking_only():
     grid = Grid(shape=(64, 64, 64))
     f = TimeFunction(name='f', grid=grid)
@@ -310,3 +419,56 @@ def test_multiple_threads():
     assert op._state['autotuning'][0]['runs'] == 60  # Would be 30 with `aggressive`
     assert op._state['autotuning'][0]['tpr'] == options['squeezer'] + 1
     assert len(op._state['autotuning'][0]['tuned']) == 3
+
+
+@switchconfig(profiling='advanced')
+def test_multiple_time_loops():
+    """
+    Test autotuning in runtime mode when the blocked trees are embedded in
+    different time loops.
+    """
+    grid = Grid(shape=(64, 64, 64))
+    grid2 = Grid(shape=(64, 64, 64),
+                 time_dimension=TimeDimension(name='t2', spacing=grid.time_dim.spacing))
+
+    u = TimeFunction(name='u', grid=grid)
+    v = TimeFunction(name='v', grid=grid2)
+
+    op = Operator([Eq(u.forward, u + 1.), Eq(v.forward, v + 1.)],
+                  dle=('advanced', {'openmp': False}))
+    op.apply(time_M=100, t2_M=100, autotune=('basic', 'runtime'))
+
+    # AT is expected to have attempted 6 block shapes for each tree
+    assert op._state['autotuning'][0]['runs'] == 12
+    assert op._state['autotuning'][0]['tpr'] == options['squeezer'] + 1
+    assert len(op._state['autotuning'][0]['tuned']) == 4
+
+    # Both time loops must have executed all timesteps exactly once
+    assert np.all(u.data[0] == 100)
+    assert np.all(u.data[1] == 101)
+    assert np.all(v.data[0] == 100)
+    assert np.all(v.data[1] == 101)
+
+
+def test_nested_block_shapes():
+    """Test the block shapes attempted with hierarchical blocking."""
+    grid = Grid(shape=(64, 64))
+    x, y = grid.dimensions
+
+    outer = [BlockDimension(d, name='%s0_blk0' % d.name) for d in grid.dimensions]
+    inner = [BlockDimension(d, name='%s0_blk1' % d.root.name) for d in outer]
+    args = {'x_m': 0, 'x_M': 63, 'y_m': 0, 'y_M': 63}
+
+    block_shapes = generate_block_shapes(outer + inner, args, 'basic')
+
+    # Each outer block shape is attempted along with a number of nested ones
+    assert len({i[:2] for i in block_shapes}) == 6
+    assert len(block_shapes) > 6
+    assert ((('x0_blk0_size', 32), ('y0_blk0_size', 32),
+             ('x0_blk1_size', 8), ('y0_blk1_size', 8)) in block_shapes)
+
+    # Nested blocks never exceed the enclosing ones
+    for bs in block_shapes:
+        bs = dict(bs)
+        assert bs['x0_blk1_size'] <= bs['x0_blk0_size']
+        assert bs['y0_blk1_size'] <= bs['y0_blk0_size']
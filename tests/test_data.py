@@ -3,7 +3,8 @@ import numpy as np
 
 from conftest import skipif
 from devito import (Grid, Function, TimeFunction, SparseTimeFunction, Dimension, # noqa
-                    Eq, Operator, ALLOC_GUARD, ALLOC_FLAT)
+                    Eq, Operator, ALLOC_GUARD, ALLOC_FLAT, configuration,
+                    switchconfig)
 from devito.data import LEFT, RIGHT, Decomposition
 
 pytestmark = skipif('ops')
@@ -236,6 +237,32 @@ class TestDataBasic(object):
         assert u3._offset_halo == ((1, 6), (2, 7), (3, 8))
         assert u3._offset_owned == ((2, 5), (3, 6), (4, 7))
 
+    def test_autopadding(self):
+        """
+        Test that autopadding aligns the domain rows to the SIMD vector length,
+        while being transparent to both data access and Operators.
+        """
+        vl = configuration['platform'].simd_items_per_reg(np.float32)
+        if vl <= 1:
+            pytest.skip("Unknown SIMD vector length")
+        grid = Grid(shape=(11, 13))
+
+        u0 = TimeFunction(name='u0', grid=grid, space_order=2)
+        with switchconfig(autopadding=1):
+            u1 = TimeFunction(name='u1', grid=grid, space_order=2)
+            u2 = TimeFunction(name='u2', grid=grid, space_order=2, padding=0)
+
+        assert u1.shape == u0.shape
+        assert u1._size_padding[:-1] == ((0, 0), (0, 0))
+        assert u1._offset_domain[-1] % vl == 0
+        assert u1.shape_allocated[-1] % vl == 0
+        assert u2._size_padding == u0._size_padding
+
+        for u in [u0, u1]:
+            u.data[0, :] = np.arange(11*13, dtype=np.float32).reshape(11, 13)
+            Operator(Eq(u.forward, u + u.laplace)).apply(time_M=3)
+        assert np.all(u0.data == u1.data)
+
     def test_indexing_into_sparse(self):
         """
         Test indexing into SparseFunctions.
@@ -703,6 +730,5 @@ def test_oob_guard():
 
 
 if __name__ == "__main__":
-    from devito import configuration
     configuration['mpi'] = True
     TestDataDistributed().test_misc_data()
@@ -3,15 +3,20 @@ from operator import mul
 
 import numpy as np
 import pytest
+from sympy import Max, Min
 
 from conftest import EVAL, skipif
-from devito import Grid, Function, TimeFunction, SparseTimeFunction, Eq, Operator, solve
-from devito.dle import NThreads, transform
+from devito import (Grid, Function, TimeFunction, SparseTimeFunction, Eq, Operator, solve,
+                    configuration, switchconfig)
+from devito.cgen_utils import ccode
+from devito.dle import NThreads, TileDimension, Vectorizer, transform
 from devito.dle.parallelizer import nhyperthreads
 from devito.ir.equations import DummyEq
 from devito.ir.iet import (Call, Expression, Iteration, Conditional, FindNodes,
-                           iet_analyze, retrieve_iteration_tree)
+                           ExpressionBundle, Section, iet_analyze,
+                           retrieve_iteration_tree)
 from devito.tools import as_tuple
+from devito.types import Array, Scalar
 from unittest.mock import patch
 
 pytestmark = skipif(['yask', 'ops'])
@@ -200,6 +205,233 @@ def test_cache_blocking_edge_cases_highorder(shape, blockshape):
     assert np.equal(wo_blocking.data, w_blocking.data).all()
 
 
+@pytest.mark.parametrize("shape,blocksizes", [
+    ((20, 33), {'x0_blk0_size': 16, 'x0_blk1_size': 3}),
+    ((25, 25, 46), {'x0_blk0_size': 8, 'y0_blk0_size': 8,
+                    'x0_blk1_size': 4, 'y0_blk1_size': 4}),
+    ((25, 25, 46), {'x0_blk0_size': 16, 'y0_blk0_size': 7,
+                    'x0_blk1_size': 5, 'y0_blk1_size': 3}),
+    ((25, 25, 46), {'x0_blk0_size': 7, 'y0_blk0_size': 9,
+                    'x0_blk1_size': 16, 'y0_blk1_size': 16})
+])
+def test_cache_blocking_hierarchical(shape, blocksizes):
+    wo_blocking, _ = _new_operator2(shape, time_order=2, dle='noop')
+
+    grid = Grid(shape=shape, dtype=np.int32)
+    infield = TimeFunction(name='infield', grid=grid, time_order=2)
+    infield.data[:] = np.arange(reduce(mul, shape), dtype=np.int32).reshape(shape)
+    outfield = TimeFunction(name='outfield', grid=grid, time_order=2)
+
+    stencil = Eq(outfield.forward.indexify(),
+                 outfield.indexify() + infield.indexify()*3.0)
+    op = Operator(stencil, dle=('blocking', {'blocklevels': 2}))
+    op(infield=infield, outfield=outfield, t=10, **blocksizes)
+
+    # Two blocking levels over all but the innermost Dimension
+    trees = retrieve_iteration_tree(op._func_table['bf0'].root)
+    assert len(trees) == 1
+    assert len(trees[0]) == 3*len(shape) - 2
+
+    assert np.equal(wo_blocking.data, outfield.data).all()
+
+
+def _new_operator4(shape, tileshape=None, dle=None):
+    tileshape = as_tuple(tileshape)
+    grid = Grid(shape=shape)
+    u = TimeFunction(name='u', grid=grid, space_order=4)
+    u.data[0, :] = np.linspace(-1., 1., num=reduce(mul, shape)).reshape(shape)
+
+    op = Operator(Eq(u.forward, u + 0.1*u.laplace), dle=dle)
+
+    dims = (grid.time_dim,) + grid.dimensions
+    tilesizes = {'%s0_tile_size' % d: v for d, v in zip(dims, tileshape)}
+    tilesizes = {k: v for k, v in tilesizes.items() if k in op._known_arguments}
+    op.apply(time_M=10, **tilesizes)
+
+    return u, op
+
+
+@pytest.mark.parametrize("shape,tileshape", [
+    ((20, 33), ()),
+    ((20, 33), (1, 20)),
+    ((20, 33), (4, 7)),
+    ((20, 33), (9, 3, 5)),
+    ((17, 15, 23), (3, 4, 5)),
+    ((17, 15, 23), (5, 17, 2, 23))
+])
+@pytest.mark.parametrize("blockinner", [False, True])
+def test_time_tiling(shape, tileshape, blockinner):
+    wo_tiling, _ = _new_operator4(shape, dle='noop')
+    w_tiling, op = _new_operator4(shape, tileshape,
+                                  dle=('timetiling', {'blockinner': blockinner}))
+
+    iterations = FindNodes(Iteration).visit(op)
+    tiles = [i for i in iterations if isinstance(i.dim, TileDimension)]
+    assert len(tiles) == len(shape) + blockinner
+    assert np.allclose(wo_tiling.data, w_tiling.data, rtol=1e-6)
+
+
+def test_time_tiling_illegal():
+    grid = Grid(shape=(11, 11))
+    u = TimeFunction(name='u', grid=grid, space_order=2)
+    src = SparseTimeFunction(name='src', grid=grid, npoint=1, nt=10)
+
+    # The sparse injection lives in a separate nest within the time loop
+    eqns = [Eq(u.forward, u + u.laplace)] + src.inject(field=u.forward, expr=src)
+    op = Operator(eqns, dle='timetiling')
+
+    iterations = FindNodes(Iteration).visit(op)
+    assert not any(isinstance(i.dim, TileDimension) for i in iterations)
+
+
+def test_time_tiling_minmax():
+    _, op = _new_operator4((20, 33), (4, 7), dle='timetiling')
+
+    # The skewed loop bounds are integer, hence printed as ternaries
+    assert 'fmax' not in str(op)
+    assert 'fmin' not in str(op)
+
+    grid = Grid(shape=(4, 4, 4))
+    x, y, z = grid.dimensions
+    f = Function(name='f', grid=grid)
+    assert ccode(Max(x, y + 1)) == '((x) > (y + 1) ? (x) : (y + 1))'
+    assert ccode(Max(x, f[x, y, z])).startswith('fmax')
+
+    # Pairwise nesting, rather than a left fold duplicating the partial results
+    code = ccode(Min(*[Scalar(name=i, dtype=np.int32) for i in 'abcd']))
+    assert all(code.count(i) == 4 for i in 'abcd')
+
+
+@pytest.mark.parametrize("shape,dtype", [
+    ((21, 33), np.float32),
+    ((21, 33), np.float64),
+    ((11, 13, 29), np.float32),
+])
+def test_simd_intrinsics(shape, dtype):
+    results = []
+    for dle in ['noop', ('advanced', {'intrinsics': True})]:
+        grid = Grid(shape=shape, dtype=dtype)
+        u = TimeFunction(name='u', grid=grid, space_order=2)
+        u.data[0, :] = np.linspace(-1., 1., num=reduce(mul, shape)).reshape(shape)
+
+        op = Operator(Eq(u.forward, u + 0.1*u.laplace + u**2), dle=dle)
+        op.apply(time_M=5)
+        results.append(u.data.copy())
+
+    assert np.allclose(results[0], results[1], rtol=1e-5)
+
+
+@pytest.mark.parametrize("platform", ['snb', 'hsw', 'skx'])
+@pytest.mark.parametrize("shape,dtype", [
+    ((21, 33), np.float32),
+    ((21, 33), np.float64),
+    ((11, 13, 29), np.float32),
+])
+def test_simd_intrinsics_codegen(platform, shape, dtype):
+    """
+    Test the shape of the SIMD intrinsics generated for a given platform. The
+    Operator isn't compiled, so the test doesn't depend on the host ISA.
+    """
+    with switchconfig(platform=platform):
+        grid = Grid(shape=shape, dtype=dtype)
+        u = TimeFunction(name='u', grid=grid, space_order=2)
+        op = Operator(Eq(u.forward, u + 0.1*u.laplace + u**2),
+                      dle=('advanced', {'intrinsics': True}))
+
+        isa = configuration['platform'].isa
+        vl = configuration['platform'].simd_items_per_reg(dtype)
+
+    assert '_mm' in str(op)
+    assert '#include "%s"' % Vectorizer.header in str(op)
+
+    vector = [i for i in FindNodes(Iteration).visit(op) if i.step == vl]
+    assert len(vector) == 1
+    if isa in Vectorizer.rotations:
+        # One load per row and iteration, as the vectors at the other offsets along
+        # the vectorized Dimension are composed from the rotated registers
+        assert str(vector[0]).count('loadu') == 2*len(shape) - 1
+        assert 'alignr' in str(vector[0])
+    else:
+        # One load per distinct access
+        assert str(vector[0]).count('loadu') == 2*len(shape) + 1
+        assert 'alignr' not in str(vector[0])
+
+
+def test_loop_fusion():
+    results = []
+    ntrees = []
+    for dle in ['noop', 'fusion']:
+        grid = Grid(shape=(16, 16))
+        u = TimeFunction(name='u', grid=grid)
+        v = TimeFunction(name='v', grid=grid)
+        v.data[:] = np.linspace(-1., 1., num=v.data.size).reshape(v.shape)
+
+        # The anti-dependence along time prevents the Clusters from being
+        # grouped, but it's carried by the time loop, so the nests can be fused
+        op = Operator([Eq(u.forward, v.forward + 1), Eq(v, u.forward + 1)], dle=dle)
+        op.apply(time_M=4)
+        results.append(v.data.copy())
+        ntrees.append(len(retrieve_iteration_tree(op)))
+
+    assert ntrees == [2, 1]
+    assert np.all(results[0] == results[1])
+
+
+def test_loop_fission(fc, fd, iters):
+    """
+    Test that a nest made of two independent chains of expressions, each using
+    many scalar temporaries and reading its own field, is split into one nest
+    per chain, as together the chains don't fit in the SIMD registers.
+    """
+    x, y = fc.function.indices
+    ga = Array(name='ga', shape=(3, 5), dimensions=(x, y)).indexed
+    gb = Array(name='gb', shape=(3, 5), dimensions=(x, y)).indexed
+    ntemps = configuration['platform'].simd_reg_count // 2 + 1
+
+    exprs = []
+    for f, g, name in [(fc, ga, 'r'), (fd, gb, 's')]:
+        temps = [Scalar(name='%s%d' % (name, i)) for i in range(ntemps)]
+        exprs.extend([Expression(DummyEq(r, (i + 1)*f[x, y]))
+                      for i, r in enumerate(temps)])
+        exprs.append(Expression(DummyEq(g[x, y], sum(temps))))
+    bundle = ExpressionBundle((3, 5), 0, {}, body=exprs)
+    iet = iet_analyze(Section('section0', iters[6](iters[7](bundle))))
+
+    iet, _ = transform(iet, mode='fusion')
+
+    trees = retrieve_iteration_tree(iet)
+    assert len(trees) == 2
+    for tree, g in zip(trees, [ga, gb]):
+        exprs = FindNodes(Expression).visit(tree[-1])
+        assert len(exprs) == ntemps + 1
+        assert exprs[-1].write is g.function
+
+
+def test_loop_no_fission():
+    results = []
+    ntrees = []
+    for dle in ['noop', 'fusion']:
+        grid = Grid(shape=(16, 16))
+        x, y = grid.dimensions
+        f = Function(name='f', grid=grid, space_order=3)
+        f.data[:] = np.linspace(-1., 1., num=f.data.size).reshape(f.shape)
+        g = [Function(name='g%d' % i, grid=grid) for i in range(3)]
+
+        # The same 49 values are read by all expressions, so the register
+        # pressure is beyond the number of SIMD registers. However, a fission
+        # would have each of the resulting nests reload all of them
+        stencil = sum(f.subs({x: x + i, y: y + j})
+                      for i in range(-3, 4) for j in range(-3, 4))
+        op = Operator([Eq(i, n*stencil) for n, i in enumerate(g, 1)],
+                      dse='noop', dle=dle)
+        op.apply()
+        results.append([i.data.copy() for i in g])
+        ntrees.append(len(retrieve_iteration_tree(op)))
+
+    assert ntrees == [1, 1]
+    assert all(np.all(i == j) for i, j in zip(*results))
+
+
 class TestNodeParallelism(object):
 
     @pytest.mark.parametrize('exprs,expected', [
@@ -281,6 +513,28 @@ class TestNodeParallelism(object):
         assert op.arguments(time=0)['nthreads'] == NThreads.default_value()
         assert op.arguments(time=0, nthreads=123)['nthreads'] == 123  # user supplied
 
+    @pytest.mark.parametrize('dle', ['openmp', ('advanced', {'openmp': True})])
+    @switchconfig(profiling='threads')
+    def test_load_balance_profiling(self, dle):
+        """
+        Test that the OpenMP parallel regions are instrumented with per-thread
+        timers, also when they live within elemental functions.
+        """
+        grid = Grid(shape=(16, 16, 16))
+        f = TimeFunction(name='f', grid=grid)
+
+        op = Operator(Eq(f.forward, f + 1.), dle=dle)
+        assert 'nowait' in str(op.ccode)
+
+        summary = op.apply(time_M=1, nthreads=2)
+        assert np.all(f.data[0] == 2.)
+
+        assert list(summary.regions) == ['region0']
+        entry = summary.regions['region0']
+        assert entry.busy.size <= 2
+        assert entry.imbalance >= 1.
+        assert entry.barrier >= 0.
+
     @pytest.mark.parametrize('eq,expected,blocking', [
         ('Eq(f, 2*f)', [2, 0, 0], False),
         ('Eq(u, 2*u)', [0, 2, 0, 0], False),
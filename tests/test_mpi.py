@@ -480,6 +480,30 @@ class TestOperatorSimple(object):
             assert np.all(f.data_ro_domain[0, :-1, -1:] == side)
             assert np.all(f.data_ro_domain[0, -1:, :-1] == side)
 
+    @pytest.mark.parallel(mode=[(2, 'basic'), (2, 'diag'), (2, 'overlap')])
+    def test_communication_profiling(self):
+        grid = Grid(shape=(32,))
+        x = grid.dimensions[0]
+        t = grid.stepping_dim
+
+        f = TimeFunction(name='f', grid=grid)
+        f.data_with_halo[:] = 1.
+
+        with switchconfig(profiling='mpi'):
+            op = Operator(Eq(f.forward, f[t, x-1] + f[t, x+1] + 1))
+            summary = op.apply(time=1)
+
+        assert np.all(f.data_ro_domain[1] == 3.)
+
+        # One single HaloSpot, executed at each of the two timesteps. Each rank
+        # only has one neighbour, and exchanges with it one float per timestep
+        assert len(summary.halospots) == 1
+        entry = list(summary.halospots.values())[0]
+        assert entry.msgs_sent == entry.msgs_recv == 4
+        assert entry.bytes_sent == entry.bytes_recv == 4*f.dtype().itemsize
+        assert 0. <= entry.wait <= entry.wait_max
+        assert 0. <= entry.overlap <= 1.
+
     @pytest.mark.parallel(mode=[(8, 'basic'), (8, 'diag'), (8, 'overlap'),
                                 (8, 'overlap2'), (8, 'full')])
     def test_trivial_eq_3d(self):
@@ -569,6 +593,19 @@ class TestOperatorSimple(object):
         assert np.all(f1.data == 1.)
         assert np.all(f2.data == 1.)
 
+    @pytest.mark.parallel(mode=[2, 4])
+    def test_jit_broadcast(self):
+        grid = Grid(shape=(16, 16))
+        f = TimeFunction(name='f', grid=grid)
+
+        # Only rank 0 compiles, while all other ranks receive the shared object
+        op = Operator(Eq(f.forward, f + 1.))
+        op.apply(time_M=1)
+
+        assert np.all(f.data_ro_domain[0] == 2.)
+        assert op._lib is not None
+        assert op._comm is grid.distributor.comm
+
 
 class TestCodeGeneration(object):
 
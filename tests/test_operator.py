@@ -1,13 +1,20 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+import json
+
 import numpy as np
 import pytest
 
 from conftest import skipif, EVAL, time, x, y, z
 from devito import (clear_cache, Grid, Eq, Operator, Constant, Function, TimeFunction,
                     SparseFunction, SparseTimeFunction, Dimension, error, SpaceDimension,
-                    NODE, CELL, configuration)
+                    NODE, CELL, JSONLinesSink, PrometheusSink, add_metrics_sink,
+                    SubDomain, configuration, precompile, remove_metrics_sink,
+                    switchconfig)
+from devito.exceptions import InvalidArgument, InvalidOperator
 from devito.ir.iet import (Expression, Iteration, FindNodes, IsPerfectIteration,
                            retrieve_iteration_tree)
 from devito.ir.support import Any, Backward, Forward
+from devito.jitcache import JITCache
 from devito.symbolics import indexify, retrieve_indexed
 from devito.tools import flatten
 from devito.types import Scalar
@@ -55,6 +62,37 @@ class TestCodeGen(object):
         assert op.parameters[4].is_Scalar
         assert 'a_dense[x + 1] = 2.0F*constant + a_dense[x + 1]' in str(op)
 
+    def test_respecialize(self):
+        """
+        Test that respecializing an Operator produces the same code as building
+        it from scratch with the same DLE options, and leaves ``self`` untouched.
+        """
+        grid = Grid(shape=(4, 4))
+        u = TimeFunction(name='u', grid=grid)
+        eqn = Eq(u.forward, u + 1)
+
+        with pytest.raises(InvalidOperator):
+            Operator(eqn, dle='noop').respecialize()
+
+        op0 = Operator(eqn, dle='noop', respecializable=True)
+        ccode0 = str(op0.ccode)
+
+        dle = ('advanced', {'openmp': True})
+        op1 = op0.respecialize(dle=dle)
+        assert op1._profiler is not op0._profiler
+        assert str(op1.ccode) == str(Operator(eqn, dle=dle).ccode)
+        assert str(op1.ccode) != ccode0
+        assert 'omp.h' in op1._includes
+        assert str(op0.ccode) == ccode0
+        assert 'omp.h' not in op0._includes
+
+        op2 = op1.respecialize(dle='noop')
+        assert str(op2.ccode) == ccode0
+        assert op2._soname == op0._soname
+
+        op2.apply(time_M=1)
+        assert np.all(u.data[0] == 2.)
+
     @pytest.mark.parametrize('expr, so, to, expected', [
         ('Eq(u.forward,u+1)', 0, 1, 'Eq(u[t+1,x,y,z],u[t,x,y,z]+1)'),
         ('Eq(u.forward,u+1)', 1, 1, 'Eq(u[t+1,x+1,y+1,z+1],u[t,x+1,y+1,z+1]+1)'),
@@ -968,6 +1006,122 @@ class TestArguments(object):
         except:
             assert False
 
+    def test_prepare(self):
+        """
+        Test that a PreparedCall produces the same results as ``apply``, and that
+        overrides only apply to a single call.
+        """
+        grid = Grid(shape=(4, 4))
+        c = Constant(name='c', value=1.)
+        u = TimeFunction(name='u', grid=grid, save=10)
+
+        op = Operator(Eq(u.forward, u + c))
+        call = op.prepare(time_M=2)
+
+        call()
+        assert np.all(u.data[3] == 3.)
+        assert np.all(u.data[4] == 0.)
+
+        call(time_M=4, c=2.)
+        assert np.all(u.data[3] == 6.)
+        assert np.all(u.data[5] == 10.)
+
+        # Data-carrier override with same shape, hence processed by patching
+        u1 = TimeFunction(name='u', grid=grid, save=10)
+        call(u=u1)
+        assert np.all(u1.data[3] == 3.)
+        assert np.all(u1.data[4] == 0.)
+
+        # Data-carrier override with different shape, hence processed from scratch
+        u2 = TimeFunction(name='u', grid=grid, save=5)
+        call(u=u2)
+        assert np.all(u2.data[3] == 3.)
+
+        # Overrides are checked
+        with pytest.raises(InvalidArgument):
+            call(time_M=10)
+
+    def test_prepare_sparse(self):
+        """Test PreparedCall with SparseFunction overrides."""
+        grid = Grid(shape=(4, 4))
+        u = TimeFunction(name='u', grid=grid, save=5)
+        src0 = SparseTimeFunction(name='src', grid=grid, npoint=1, nt=5,
+                                  coordinates=np.array([[0.5, 0.5]]))
+        src1 = SparseTimeFunction(name='src', grid=grid, npoint=1, nt=5,
+                                  coordinates=np.array([[0.5, 0.5]]))
+        src0.data[:] = 1.
+        src1.data[:] = 2.
+
+        op = Operator(src0.inject(u.forward, expr=src0))
+        call = op.prepare(time_M=0)
+
+        call()
+        assert np.isclose(np.sum(u.data[1]), 1.)
+        call(src=src1)
+        assert np.isclose(np.sum(u.data[1]), 3.)
+
+    def test_apply_async(self):
+        """
+        Test that ``apply_async`` produces the same results as ``apply``, and
+        that multiple executions run in submission order.
+        """
+        grid = Grid(shape=(4, 4))
+        u = TimeFunction(name='u', grid=grid, save=10)
+        rec = SparseTimeFunction(name='rec', grid=grid, npoint=1, nt=10,
+                                 coordinates=np.array([[0.5, 0.5]]))
+
+        op = Operator([Eq(u.forward, u + 1)] + rec.interpolate(u))
+
+        future = op.apply_async(time_M=4)
+        summary = future.result()
+        assert np.all(u.data[5] == 5.)
+        assert np.allclose(rec.data[:5, 0], [0., 1., 2., 3., 4.])
+        assert set(summary) == set(op.apply(time_M=4))
+
+        f0 = op.apply_async(time_M=2, u=u)
+        f1 = op.apply_async(time_m=3, time_M=3)
+        f0.result()
+        f1.result()
+        assert np.all(u.data[3] == 3.)
+        assert np.all(u.data[4] == 4.)
+
+    @pytest.mark.parametrize('nworkers', [1, 2])
+    def test_apply_batch(self, nworkers):
+        """
+        Test that ``apply_batch`` produces the same results as a sequence
+        of ``apply`` on freshly zeroed wavefields.
+        """
+        grid = Grid(shape=(8, 8))
+        u = TimeFunction(name='u', grid=grid, space_order=2)
+        src = SparseTimeFunction(name='src', grid=grid, npoint=1, nt=6)
+        rec = SparseTimeFunction(name='rec', grid=grid, npoint=1, nt=6)
+
+        op = Operator([Eq(u.forward, u + 0.1*u.laplace)] +
+                      src.inject(u.forward, expr=src) + rec.interpolate(u))
+
+        batch = []
+        for i in range(3):
+            src = SparseTimeFunction(name='src', grid=grid, npoint=1, nt=6,
+                                     coordinates=np.array([[0.3*i, 0.5]]))
+            src.data[:] = 1.
+            rec = SparseTimeFunction(name='rec', grid=grid, npoint=1, nt=6,
+                                     coordinates=np.array([[0.5, 0.5]]))
+            batch.append({'src': src, 'rec': rec})
+
+        expected = []
+        for i in batch:
+            u.data_with_halo[:] = 0.
+            op.apply(time_M=4, **i)
+            expected.append(i['rec'].data.copy())
+            i['rec'].data[:] = 0.
+
+        u.data_with_halo[:] = 1.
+        summaries = op.apply_batch(batch, nworkers=nworkers, time_M=4)
+
+        assert len(summaries) == len(batch)
+        for i, v in zip(batch, expected):
+            assert np.allclose(i['rec'].data, v)
+
 
 class TestDeclarator(object):
 
@@ -1458,3 +1612,358 @@ class TestLoopScheduler(object):
         trees = retrieve_iteration_tree(op)
         assert len(trees) == 4
         assert all(trees[0][0] is i[0] for i in trees)
+
+
+class TestJIT(object):
+
+    @switchconfig(jit_split=1)
+    def test_split_units(self):
+        """
+        Test JIT compilation of an Operator as separate translation units.
+        """
+        grid = Grid(shape=(4, 4))
+        u = TimeFunction(name='u', grid=grid)
+
+        op = Operator(Eq(u.forward, u + 1))
+
+        units = op.ccode_units
+        assert list(units) == [op.name] + [i.root.name for i in
+                                           op._func_table.values() if i.local]
+
+        op.apply(time_M=2)
+        assert np.all(u.data[0] == 2.)
+        assert np.all(u.data[1] == 3.)
+
+    def test_precompile(self):
+        """
+        Test background JIT compilation of a set of Operators.
+        """
+        grid = Grid(shape=(4, 4))
+        u = TimeFunction(name='u', grid=grid)
+        v = TimeFunction(name='v', grid=grid)
+
+        op0 = Operator(Eq(u.forward, u + 1))
+        op1 = Operator(Eq(v.forward, v + 2))
+
+        futures = precompile([op0, op1], workers=2)
+        assert len(futures) == 2
+        assert op0._compiling is futures[0]
+        assert op1._compiling is futures[1]
+        # Already scheduled, hence ignored
+        assert precompile(op0) == []
+
+        op0.apply(time_M=2)
+        assert futures[0].done()
+        assert np.all(u.data[0] == 2.)
+
+        futures[1].result()
+        op1.apply(time_M=2)
+        assert np.all(v.data[0] == 4.)
+        # Already compiled, hence ignored
+        assert precompile(op1) == []
+
+    def test_precompile_failure(self):
+        """
+        Test that a failed background JIT compilation is reported upon first
+        execution, and then attempted again.
+        """
+        grid = Grid(shape=(4, 4))
+        u = TimeFunction(name='u', grid=grid)
+        op = Operator(Eq(u.forward, u + 1))
+
+        future = Future()
+        future.set_exception(RuntimeError("Compilation failed"))
+        op._compiling = future
+        with pytest.raises(RuntimeError):
+            op.apply(time_M=2)
+        assert op._compiling is None
+
+        op.apply(time_M=2)
+        assert np.all(u.data[0] == 2.)
+
+
+class TestJITCache(object):
+
+    def test_shared_cache(self, tmpdir):
+        """
+        Test that JIT-compiled shared objects are stored in, and then mapped
+        from, the shared JIT cache.
+        """
+        grid = Grid(shape=(4, 4))
+        u = TimeFunction(name='u', grid=grid)
+        op = Operator(Eq(u.forward, u + 1))
+
+        with switchconfig(jit_cache_dir=str(tmpdir)):
+            key = JITCache(str(tmpdir)).key(str(op.ccode), op._compiler)
+            op.apply(time_M=1)
+            assert tmpdir.join('%s.so' % key).check()
+            assert key in json.loads(tmpdir.join('index.json').read())
+
+            # Another process would find the shared object in the JIT cache
+            sofile = tmpdir.join('local.so')
+            assert JITCache(str(tmpdir)).fetch(key, str(sofile))
+            assert sofile.islink()
+        assert np.all(u.data[0] == 2.)
+
+    def test_eviction(self, tmpdir):
+        """Test LRU eviction from the shared JIT cache."""
+        sofile = tmpdir.join('tmp.so')
+        sofile.write('0'*1024)
+
+        # A cache that can only accommodate two 1KB entries
+        cache = JITCache(str(tmpdir.join('cache')), maxsize=2.5/1024)
+        for key in ['a', 'b', 'c']:
+            cache.store(key, str(sofile))
+        assert not tmpdir.join('cache', 'a.so').check()
+        assert tmpdir.join('cache', 'b.so').check()
+        assert tmpdir.join('cache', 'c.so').check()
+
+        # Now `b` is the most recently used entry
+        assert cache.fetch('b', str(tmpdir.join('b.so')))
+        cache.store('d', str(sofile))
+        assert tmpdir.join('cache', 'b.so').check()
+        assert not tmpdir.join('cache', 'c.so').check()
+
+    def test_thread_exclusion(self, tmpdir):
+        """
+        Test that an entry locked by a thread can't be locked by another thread
+        of the same process, even though POSIX record locks are per-process.
+        """
+        cache = JITCache(str(tmpdir))
+
+        def try_lock():
+            try:
+                with cache._locked('a', blocking=False):
+                    return True
+            except BlockingIOError:
+                return False
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            with cache.lock('a'):
+                assert not executor.submit(try_lock).result()
+            assert executor.submit(try_lock).result()
+
+
+class TestOperatorCache(object):
+
+    def test_reuse(self, tmpdir):
+        """
+        Test that an Operator restored from the Operator cache produces the
+        same code as the original one, and that it computes using the objects
+        of the Operator being built rather than those stored in the cache.
+        """
+        grid = Grid(shape=(4, 4))
+        c = Constant(name='c')
+        u = TimeFunction(name='u', grid=grid)
+
+        eqn = Eq(u.forward, u + c)
+
+        with switchconfig(operator_cache=1, operator_cache_dir=str(tmpdir)):
+            op0 = Operator(eqn)
+            assert len(tmpdir.listdir('*.pkl')) == 1
+
+            c1 = Constant(name='c', value=2.)
+            u1 = TimeFunction(name='u', grid=grid)
+            op1 = Operator(Eq(u1.forward, u1 + c1))
+
+        assert str(op0.ccode) == str(op1.ccode)
+        assert op0._soname == op1._soname
+
+        op1.apply(time_M=0)
+        assert np.all(u1.data[1] == 2.)
+        assert np.all(u.data == 0.)
+
+    def test_subdomain(self, tmpdir):
+        """
+        Test that SubDomains with the same name but a different definition
+        lead to different entries in the Operator cache.
+        """
+        def make_subdomain(thickness):
+            class Inner(SubDomain):
+                name = 'inner'
+
+                def define(self, dimensions):
+                    return {d: ('middle', thickness, thickness) for d in dimensions}
+            return Inner()
+
+        ops = []
+        with switchconfig(operator_cache=1, operator_cache_dir=str(tmpdir)):
+            for thickness in [1, 2]:
+                grid = Grid(shape=(8, 8), subdomains=(make_subdomain(thickness),))
+                u = Function(name='u', grid=grid)
+                ops.append(Operator(Eq(u, u + 1, subdomain=grid.subdomains['inner'])))
+                ops[-1].apply()
+                assert np.sum(u.data) == (8 - 2*thickness)**2
+        assert len(tmpdir.listdir('*.pkl')) == 2
+
+    def test_eviction(self, tmpdir):
+        """Test LRU eviction from the Operator cache."""
+        grid = Grid(shape=(4, 4))
+        u = TimeFunction(name='u', grid=grid)
+
+        with switchconfig(operator_cache=1, operator_cache_dir=str(tmpdir)):
+            Operator(Eq(u.forward, u + 1))
+            size = tmpdir.listdir('*.pkl')[0].size()
+
+        # A cache that can only accommodate one entry
+        with switchconfig(operator_cache=1, operator_cache_dir=str(tmpdir),
+                          operator_cache_size=1.5*size/1024**2):
+            Operator(Eq(u.forward, u + 2))
+        assert len(tmpdir.listdir('*.pkl')) == 1
+
+
+class TestProfiling(object):
+
+    @switchconfig(profiling='perf')
+    def test_perf_counters(self):
+        """
+        Test that the `perf` profiler samples the hardware counters of each
+        profiled section, and derives the measured operational intensity.
+        """
+        grid = Grid(shape=(32, 32))
+        u = TimeFunction(name='u', grid=grid)
+        op = Operator(Eq(u.forward, u + 1))
+
+        if not op._profiler.timer.counters:
+            pytest.skip("`perf_event` unavailable")
+        assert 'perf_sample' in str(op.ccode)
+
+        summary = op.apply(time_M=9)
+        assert np.all(u.data[0] == 10.)
+
+        for counters in summary.counters.values():
+            if counters is None:
+                # The counters couldn't be opened in this environment
+                continue
+            assert counters['cycles'] > 0
+            assert counters['instructions'] > 0
+            assert counters['ipc'] == counters['instructions']/counters['cycles']
+
+    @switchconfig(profiling='perf')
+    def test_perf_counters_nthreads(self):
+        """
+        Test that the `perf` profiler samples the hardware counters of as many
+        threads as those executing the profiled section.
+        """
+        grid = Grid(shape=(32, 32))
+        u = TimeFunction(name='u', grid=grid)
+
+        op0 = Operator(Eq(u.forward, u + 1), dle=('advanced', {'openmp': False}))
+        if not op0._profiler.timer.counters:
+            pytest.skip("`perf_event` unavailable")
+        assert 'perf_sample(&timers->section0_cycles, -1, 1)' in str(op0.ccode)
+
+        op1 = Operator(Eq(u.forward, u + 1), dle=('advanced', {'openmp': True}))
+        assert 'perf_sample(&timers->section0_cycles, -1, nthreads)' in str(op1.ccode)
+        assert 'nthreads' in [i.name for i in op1.parameters]
+
+    @switchconfig(profiling='trace')
+    def test_traces(self, tmpdir):
+        """
+        Test that the `trace` profiler records each execution of the profiled
+        sections, and that the traces can be exported.
+        """
+        grid = Grid(shape=(4, 4))
+        u = TimeFunction(name='u', grid=grid)
+        op = Operator(Eq(u.forward, u + 1))
+
+        summary = op.apply(time_M=9)
+        assert np.all(u.data[0] == 10.)
+
+        traces = [i for i in summary.traces.values() if i is not None]
+        assert len(traces) == 1
+        assert len(traces[0]) == 10
+        assert np.all(traces[0]['time'] >= 0)
+        assert np.all(np.diff(traces[0]['start']) >= 0)
+        assert np.isclose(traces[0]['time'].sum(), list(summary.timings.values())[0])
+
+        data = json.loads(summary.to_json())
+        assert len(list(data.values())[0]['trace']['time']) == 10
+
+        filename = summary.to_chrome_trace(str(tmpdir.join('trace.json')))
+        events = json.loads(tmpdir.join('trace.json').read())['traceEvents']
+        assert filename == str(tmpdir.join('trace.json'))
+        assert len(events) == 10
+        assert all(i['ph'] == 'X' for i in events)
+
+    @switchconfig(profiling='trace', profiling_ntraces=4)
+    def test_traces_overflow(self):
+        """Test that the executions exceeding the trace buffer are not traced."""
+        grid = Grid(shape=(4, 4))
+        u = TimeFunction(name='u', grid=grid)
+        op = Operator(Eq(u.forward, u + 1))
+
+        summary = op.apply(time_M=9)
+        assert np.all(u.data[0] == 10.)
+
+        traces = [i for i in summary.traces.values() if i is not None]
+        assert len(traces[0]) == 4
+
+    @pytest.mark.parametrize('profiling', ['basic', 'advanced'])
+    def test_metrics_sinks(self, profiling, tmpdir):
+        """
+        Test that the metrics of each execution are handed over to the
+        registered metrics sinks.
+        """
+        grid = Grid(shape=(4, 4))
+        u = TimeFunction(name='u', grid=grid)
+
+        records = []
+        prom = tmpdir.join('devito.prom')
+        sinks = [add_metrics_sink(records.append),
+                 add_metrics_sink(JSONLinesSink(str(tmpdir.join('devito.jsonl')))),
+                 add_metrics_sink(PrometheusSink(str(prom)))]
+        try:
+            with switchconfig(profiling=profiling):
+                op = Operator(Eq(u.forward, u + 1), name='Sinked')
+                op.apply(time_M=1)
+                call = op.prepare(time_M=1)
+                call()
+                call(time_M=3)
+        finally:
+            for i in sinks:
+                remove_metrics_sink(i)
+
+        assert len(records) == 3
+        assert all(i.operator == 'Sinked' for i in records)
+        assert all(i.time == sum(i.sections.values()) for i in records)
+        assert records[0].compile_time > 0
+        assert records[1].compile_time == records[2].compile_time == 0
+        if profiling == 'advanced':
+            assert records[0].gflopss > 0
+        else:
+            assert records[0].gflopss is None
+        # PreparedCalls don't compute a performance summary
+        assert records[1].gflopss is None
+
+        lines = tmpdir.join('devito.jsonl').readlines()
+        assert len(lines) == 3
+        assert json.loads(lines[0])['operator'] == 'Sinked'
+
+        assert 'devito_apply_total{operator="Sinked"} 3.0' in prom.read()
+        assert '# TYPE devito_section_seconds_total counter' in prom.read()
+
+    @switchconfig(profiling='advanced')
+    def test_cached_summary(self):
+        """
+        Test that the numeric evaluation of the section metrics, compiled upon
+        the first summary, matches the symbolic one for any runtime argument.
+        """
+        grid = Grid(shape=(16, 16))
+        u = TimeFunction(name='u', grid=grid, space_order=2)
+        op = Operator(Eq(u.forward, u.dx + u.dy + 1))
+
+        for time_M, x_M in [(1, 15), (5, 7), (3, 11)]:
+            args = op.arguments(time_M=time_M, x_M=x_M)
+            op._profiler.timer.reset()
+            summary = op._profiler.summary(args, op._dtype)
+            for section, data in op._profiler._sections.items():
+                ops, points, traffic, itershapes = op._profiler._evaluate(section, args)
+                assert ops == data.ops.subs(args)
+                assert points == data.points.subs(args)
+                assert traffic == data.traffic.subs(args)
+                assert itershapes == [tuple(i.subs(args) for i in j)
+                                      for j in data.itershapes]
+                if section.name in summary:
+                    assert summary[section.name].itershapes == itershapes
+        assert len(op._profiler._evaluators) == len(op._profiler._sections)
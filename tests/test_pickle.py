@@ -6,6 +6,7 @@ import cloudpickle as pickle
 from conftest import skipif
 from devito import (Constant, Eq, Function, TimeFunction, SparseFunction, Grid,
                     TimeDimension, SteppingDimension, Operator)
+from devito.exceptions import InvalidArgument
 from devito.mpi.routines import MPIStatusObject, MPIRequestObject
 from devito.types import Symbol as dSymbol, Scalar
 from devito.profiling import Timer
@@ -164,6 +165,13 @@ def test_timers():
     assert new_obj.value._obj.sec0 == timer.value._obj.sec0 == 0.0
     assert new_obj.value._obj.sec1 == timer.value._obj.sec1 == 0.0
 
+    timer = Timer('timer', ['sec0', 'sec1'], ['cycles'])
+    pkl_obj = pickle.dumps(timer)
+    new_obj = pickle.loads(pkl_obj)
+    assert new_obj.sections == timer.sections == ['sec0', 'sec1']
+    assert new_obj.counters == timer.counters == ['cycles']
+    assert new_obj.value._obj.sec0_cycles == timer.value._obj.sec0_cycles == 0.0
+
 
 def test_operator_parameters():
     grid = Grid(shape=(3, 3, 3))
@@ -254,6 +262,37 @@ def test_operator_timefunction_w_preallocation():
     assert np.all(f.data[2] == 2)
 
 
+@skipif('yask')
+def test_executable_operator():
+    grid = Grid(shape=(3, 3))
+    f = TimeFunction(name='f', grid=grid, save=3)
+    c = Constant(name='c', value=1.)
+
+    op = Operator(Eq(f.forward, f + c))
+
+    exe = op.executable(time_M=0)
+    pkl_exe = pickle.dumps(exe)
+    # No symbolic objects are carried around
+    assert b'sympy' not in pkl_exe
+    assert len(pkl_exe) < len(pickle.dumps(op))
+    new_exe = pickle.loads(pkl_exe)
+
+    data = f.data_with_halo.copy()
+    new_exe.apply(f=data)
+    new_exe.apply(f=data, time_m=1, time=1, c=2.)
+    op.apply(time_M=0)
+    op.apply(time_m=1, time_M=1, c=2.)
+    assert np.all(data == f.data_with_halo)
+    assert np.all(f.data[2] == 3)
+
+    with pytest.raises(InvalidArgument):
+        new_exe.apply(f=data, time_M=2)
+    with pytest.raises(InvalidArgument):
+        new_exe.apply(f=data[1:])
+    with pytest.raises(InvalidArgument):
+        new_exe.apply()
+
+
 @skipif(['yask', 'nompi'])
 @pytest.mark.parallel(mode=[1])
 def test_mpi_objects():